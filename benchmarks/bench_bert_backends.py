@@ -0,0 +1,84 @@
+"""
+Compare les backends d'inférence BERT (pytorch fp32, int8 quantifié, ONNX Runtime)
+sur l'échantillon de validation : débit et accord des labels avec le modèle fp32.
+
+Un backend n'est validé que si son taux d'accord avec fp32 atteint le seuil.
+
+Utilisation :
+    python benchmarks/bench_bert_backends.py [--backends quantized onnx] [--threads 4]
+                                             [--threshold 0.95] [--json resultats.json]
+"""
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.extract_sentiment import (
+    analyze_sentiment_bert_batch, configure_bert_backend, get_bert_analyzer, BERT_BACKENDS, BERT_BATCH_SIZE
+)
+
+VALIDATION_FILE = os.path.join("data", "echantillon_validation_test.csv")
+
+
+# Analyse l'échantillon avec un backend ; le chargement du modèle n'est pas chronométré
+def run_backend(backend, texts, threads, batch_size):
+    """
+    :return: Tuple (labels, probabilités, rapport de débit)
+    """
+    configure_bert_backend(backend, threads)
+    get_bert_analyzer()
+    results, report = analyze_sentiment_bert_batch(texts, batch_size=batch_size)
+    return [label for label, _ in results], [prob for _, prob in results], report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", default=VALIDATION_FILE, help="Fichier d'avis nettoyés (colonne Content)")
+    parser.add_argument("--backends", nargs="+", default=["quantized", "onnx"],
+                        choices=[b for b in BERT_BACKENDS if b != "pytorch"], help="Backends comparés à fp32")
+    parser.add_argument("--threads", type=int, default=None, help="Nombre de threads intra-op")
+    parser.add_argument("--batch-size", type=int, default=BERT_BATCH_SIZE, help="Taille des lots BERT")
+    parser.add_argument("--threshold", type=float, default=0.95, help="Accord minimal avec fp32 (0-1)")
+    parser.add_argument("--json", help="Fichier JSON où enregistrer le rapport")
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.file)["Content"].astype(str).tolist()
+    reference, reference_probs, reference_report = run_backend("pytorch", texts, args.threads, args.batch_size)
+
+    results = {"pytorch": {**reference_report, "agreement": 1.0, "mean_prob_delta": 0.0, "accepted": True}}
+    for backend in args.backends:
+        try:
+            labels, probs, report = run_backend(backend, texts, args.threads, args.batch_size)
+        except ImportError as e:
+            print(f"{backend}: ignoré ({e})")
+            continue
+        agreement = sum(a == b for a, b in zip(labels, reference)) / len(texts)
+        prob_delta = sum(
+            abs(a - b) for a, b in zip(probs, reference_probs) if a is not None and b is not None
+        ) / len(texts)
+        results[backend] = {
+            **report,
+            "agreement": round(agreement, 4),
+            "mean_prob_delta": round(prob_delta, 2),
+            "speedup": round(reference_report["elapsed_sec"] / report["elapsed_sec"], 2),
+            "accepted": agreement >= args.threshold
+        }
+
+    print(f"{'backend':<10} {'avis/s':>8} {'accélération':>13} {'accord':>8} {'Δ prob':>8}  validé")
+    for backend, row in results.items():
+        print(
+            f"{backend:<10} {row['reviews_per_sec']:>8} {row.get('speedup', 1.0):>12}x "
+            f"{row['agreement']:>8.1%} {row['mean_prob_delta']:>8}  {'oui' if row['accepted'] else 'NON'}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"threshold": args.threshold, "n_reviews": len(texts), "backends": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare le nettoyage ligne par ligne (apply) et le nettoyage vectorisé.
+
+Utilisation :
+    python benchmarks/bench_clean_data.py [--rows 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_scraped_reviews
+from utils.clean_data import clean_text, format_date, clean_text_series, format_date_series
+
+TEXT_COLUMNS = ["Username", "Title", "Content"]
+
+
+# Ancienne implémentation ligne par ligne, utilisée comme référence
+def clean_rowwise(df):
+    out = df.copy()
+    for column in TEXT_COLUMNS:
+        out[column] = out[column].apply(clean_text)
+    out["Date"] = out["Date"].apply(format_date)
+    return out
+
+
+def clean_vectorized(df):
+    out = df.copy()
+    for column in TEXT_COLUMNS:
+        out[column] = clean_text_series(out[column])
+    out["Date"] = format_date_series(out["Date"])
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Nombre d'avis synthétiques")
+    args = parser.parse_args()
+
+    df = make_scraped_reviews(args.rows)
+
+    start = time.perf_counter()
+    expected = clean_rowwise(df)
+    rowwise = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = clean_vectorized(df)
+    vectorized = time.perf_counter() - start
+
+    for column in TEXT_COLUMNS + ["Date"]:
+        same = expected[column].fillna("<NA>").equals(result[column].fillna("<NA>"))
+        assert same, f"Résultat différent pour la colonne {column}"
+
+    print(f"{args.rows} avis")
+    print(f"ligne par ligne : {rowwise:8.2f} s")
+    print(f"vectorisé       : {vectorized:8.2f} s  (x{rowwise / vectorized:.1f})")
+
+
+if __name__ == "__main__":
+    main()
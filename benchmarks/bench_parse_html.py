@@ -0,0 +1,56 @@
+"""
+Compare l'extraction des avis depuis le JSON __NEXT_DATA__ et l'analyse du
+balisage HTML (BeautifulSoup), sur les pages enregistrées et sur des pages
+synthétiques de taille réelle.
+
+Utilisation :
+    python benchmarks/bench_parse_html.py [--pages 200] [--per-page 20]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_review_pages
+from utils.scrape_data import parse_reviews_page, parse_reviews_markup, HTML_PARSER
+
+FIXTURES_PATTERN = os.path.join("data", "fixtures", "trustpilot_page_*.html")
+
+
+# Temps moyen d'analyse d'une page, en millisecondes
+def time_per_page(parse, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            parse(page)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200, help="Nombre de pages synthétiques")
+    parser.add_argument("--per-page", type=int, default=20, help="Nombre d'avis par page synthétique")
+    parser.add_argument("--repeat", type=int, default=5, help="Nombre de passes sur les pages enregistrées")
+    args = parser.parse_args()
+
+    fixtures = []
+    for path in sorted(glob.glob(FIXTURES_PATTERN)):
+        with open(path, "rb") as f:
+            fixtures.append(f.read())
+    synthetic = [page.encode("utf-8") for page in make_review_pages(args.pages * args.per_page, args.per_page)]
+
+    for label, pages, repeat in (("pages enregistrées", fixtures, args.repeat), ("pages synthétiques", synthetic, 1)):
+        for page in pages:
+            assert parse_reviews_page(page) == parse_reviews_markup(page), "Résultats différents entre JSON et HTML"
+        json_ms = time_per_page(parse_reviews_page, pages, repeat)
+        markup_ms = time_per_page(parse_reviews_markup, pages, repeat)
+        print(f"{label} ({len(pages)})")
+        print(f"  HTML ({HTML_PARSER:<11}) : {markup_ms:8.3f} ms/page")
+        print(f"  __NEXT_DATA__      : {json_ms:8.3f} ms/page  (x{markup_ms / json_ms:.1f})")
+
+
+if __name__ == "__main__":
+    main()
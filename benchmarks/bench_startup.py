@@ -0,0 +1,72 @@
+"""
+Mesure le temps d'import de chaque module du pipeline.
+
+Chaque import est mesuré dans un interpréteur neuf (aucun cache de modules) et
+répété plusieurs fois ; on retient la médiane.
+
+Utilisation :
+    python benchmarks/bench_startup.py [--repeat 5] [--json resultats.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules mesurés, dans l'ordre d'import du pipeline
+MODULES = [
+    "utils.clean_data",
+    "utils.sentiment_cache",
+    "utils.scrape_data",
+    "utils.extract_sentiment",
+    "process_data",
+]
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SNIPPET = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t)"
+)
+
+
+# Temps d'import d'un module dans un interpréteur neuf
+def measure_import(module, repeat=5):
+    """
+    :param module: Nom du module à importer
+    :param repeat: Nombre de mesures
+    :return: Médiane du temps d'import en secondes, ou None si l'import échoue
+    """
+    timings = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", _SNIPPET.format(module=module)],
+            cwd=ROOT_DIR, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            print(f"{module}: échec de l'import\n{result.stderr.strip().splitlines()[-1]}")
+            return None
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Nombre de mesures par module")
+    parser.add_argument("--json", help="Fichier JSON où enregistrer les résultats")
+    args = parser.parse_args()
+
+    results = {}
+    for module in MODULES:
+        results[module] = measure_import(module, args.repeat)
+        if results[module] is not None:
+            print(f"{module:<28} {results[module] * 1000:8.1f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
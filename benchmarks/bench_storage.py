@@ -0,0 +1,46 @@
+"""
+Compare la taille et le temps de chargement des sorties en CSV et en Parquet.
+
+Le chargement mesuré est celui du dashboard : colonnes utiles uniquement, dates
+et labels typés.
+
+Utilisation :
+    python benchmarks/bench_storage.py [--rows 1000000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_analyzed_reviews
+from utils.storage import BACKENDS, dataset_path, save_frame, load_frame
+
+DASHBOARD_COLUMNS = ["Date", "Rating", "Sentiment_BERT_Label", "Sentiment_TextBlob", "Sentiment_VADER"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Nombre d'avis synthétiques")
+    args = parser.parse_args()
+
+    df = make_analyzed_reviews(args.rows)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for fmt in BACKENDS:
+            path = dataset_path(tmp_dir, "sentiments_analyze", fmt)
+            start = time.perf_counter()
+            save_frame(df, path)
+            write_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            load_frame(path, columns=DASHBOARD_COLUMNS)
+            read_time = time.perf_counter() - start
+
+            size_mb = os.path.getsize(path) / 1e6
+            print(f"{fmt:<8} taille {size_mb:8.1f} Mo  écriture {write_time:6.2f} s  lecture {read_time:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
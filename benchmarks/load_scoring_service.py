@@ -0,0 +1,113 @@
+"""
+Générateur de charge pour le service d'analyse des sentiments (scoring_service.py).
+
+Envoie des requêtes /score concurrentes avec des avis synthétiques (ou ceux d'un
+fichier), puis affiche le débit et les percentiles de latence côté client, ainsi
+que les statistiques du service (tailles de lots, profondeur de file).
+
+Utilisation :
+    python scoring_service.py &
+    python benchmarks/load_scoring_service.py [--url http://127.0.0.1:8502] [--concurrency 16]
+                                              [--requests 500] [--texts-per-request 1]
+                                              [--file data/clean_data.csv] [--json resultats.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_scraped_reviews
+
+DEFAULT_URL = "http://127.0.0.1:8502"
+
+
+# Textes envoyés au service
+def load_texts(path=None, n_texts=1000):
+    if path:
+        return pd.read_csv(path)["Content"].dropna().astype(str).tolist()
+    return make_scraped_reviews(n_texts)["Content"].astype(str).tolist()
+
+
+# Envoie les requêtes avec `concurrency` clients simultanés
+def run_load(url, texts, n_requests, concurrency, texts_per_request):
+    """
+    :return: Dictionnaire (débit, percentiles de latence en ms, erreurs par statut)
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+
+    def send(i):
+        batch = [texts[(i * texts_per_request + k) % len(texts)] for k in range(texts_per_request)]
+        sent = time.perf_counter()
+        try:
+            response = session.post(url + "/score", json={"texts": batch}, timeout=120)
+            status = response.status_code
+        except requests.RequestException:
+            status = "connexion"
+        return time.perf_counter() - sent, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(send, range(n_requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([latency for latency, status in outcomes if status == 200]) * 1000
+    errors = {}
+    for _, status in outcomes:
+        if status != 200:
+            errors[str(status)] = errors.get(str(status), 0) + 1
+    report = {
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "texts_per_request": texts_per_request,
+        "elapsed_sec": round(elapsed, 3),
+        "requests_per_sec": round(n_requests / elapsed, 2),
+        "texts_per_sec": round(len(latencies) * texts_per_request / elapsed, 2),
+        "errors": errors,
+        "latency_ms": None
+    }
+    if latencies.size:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        report["latency_ms"] = {"p50": round(float(p50), 2), "p95": round(float(p95), 2),
+                                "p99": round(float(p99), 2), "max": round(float(latencies.max()), 2)}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DEFAULT_URL, help="Adresse du service")
+    parser.add_argument("--concurrency", type=int, default=16, help="Nombre de clients simultanés")
+    parser.add_argument("--requests", type=int, default=500, help="Nombre total de requêtes")
+    parser.add_argument("--texts-per-request", type=int, default=1, help="Nombre de textes par requête")
+    parser.add_argument("--file", help="Fichier d'avis (colonne Content) ; avis synthétiques par défaut")
+    parser.add_argument("--json", help="Fichier JSON où enregistrer le rapport")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    texts = load_texts(args.file)
+    client = run_load(url, texts, args.requests, args.concurrency, args.texts_per_request)
+    service = requests.get(url + "/stats", timeout=10).json()
+
+    latency = client["latency_ms"] or {}
+    print(f"{client['requests']} requêtes en {client['elapsed_sec']} s "
+          f"({client['requests_per_sec']} req/s, {client['texts_per_sec']} textes/s), erreurs : {client['errors'] or 0}")
+    print(f"latence client (ms) : p50 {latency.get('p50')}  p95 {latency.get('p95')}  p99 {latency.get('p99')}")
+    print(f"service : lot moyen {service['mean_batch_size']}, file max {service['max_queue_depth']}, "
+          f"attente en file p95 {(service['queue_wait_ms'] or {}).get('p95')} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"client": client, "service": service}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Suite de benchmarks du pipeline : chaque étape est mesurée sur des avis
+synthétiques de 1 000 à 1 000 000 lignes, et les résultats peuvent être
+enregistrés comme référence puis comparés à une exécution ultérieure.
+
+Étapes mesurées : nettoyage, mots-clés, TextBlob, VADER, BERT (petit modèle
+aléatoire : on mesure le code du pipeline, pas le modèle), analyse des pages
+HTML et filtres du dashboard.
+
+Utilisation :
+    python benchmarks/run_benchmarks.py run [--sizes 1000 10000 100000] [--only clean keywords]
+                                            [--repeat 3] [--output resultats.json]
+                                            [--baseline reference.json] [--tolerance 0.2]
+    python benchmarks/run_benchmarks.py compare reference.json resultats.json [--tolerance 0.2]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import WORDS, make_scraped_reviews, make_analyzed_reviews, make_review_pages
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_TOLERANCE = 0.2
+
+
+# --- Étapes mesurées : setup(n) prépare les données (non chronométré), run(state) renvoie le nombre de lignes ---
+
+def _setup_clean(n_rows):
+    return make_scraped_reviews(n_rows)
+
+def _run_clean(df):
+    from utils.clean_data import clean_and_structure_frame
+    return len(clean_and_structure_frame(df.copy()))
+
+
+def _setup_cleaned(n_rows):
+    from utils.clean_data import clean_and_structure_frame
+    return clean_and_structure_frame(make_scraped_reviews(n_rows))
+
+def _run_keywords(df):
+    from utils.extract_sentiment import extract_keywords_sparse
+    matrix, _ = extract_keywords_sparse(df)
+    return matrix.shape[0]
+
+def _run_textblob(df):
+    from utils.extract_sentiment import analyze_sentiment_textblob
+    return len([analyze_sentiment_textblob(text) for text in df['Content']])
+
+def _run_vader(df):
+    from utils.extract_sentiment import analyze_sentiment_vader
+    return len([analyze_sentiment_vader(text) for text in df['Content']])
+
+
+# Petit modèle BERT aléatoire (2 couches, vocabulaire synthétique) à la place du modèle nlptown
+def _tiny_bert_analyzer():
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast, pipeline
+    from utils.extract_sentiment import label2emotion
+
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + sorted(set(WORDS))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        vocab_path = os.path.join(tmp_dir, "vocab.txt")
+        with open(vocab_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(vocab))
+        tokenizer = BertTokenizerFast(vocab_file=vocab_path, do_lower_case=True)
+    labels = list(label2emotion)
+    config = BertConfig(
+        vocab_size=len(vocab), hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+        intermediate_size=64, num_labels=len(labels),
+        id2label=dict(enumerate(labels)), label2id={label: i for i, label in enumerate(labels)}
+    )
+    model = BertForSequenceClassification(config).eval()
+    return pipeline(task='text-classification', model=model, tokenizer=tokenizer, device=-1)
+
+def _setup_bert(n_rows):
+    from utils import extract_sentiment
+    analyzer = _tiny_bert_analyzer()
+    extract_sentiment.get_bert_analyzer = lambda: analyzer
+    return _setup_cleaned(n_rows)
+
+def _run_bert(df):
+    from utils.extract_sentiment import analyze_sentiment_bert_batch
+    results, _ = analyze_sentiment_bert_batch(df['Content'])
+    return len(results)
+
+
+def _setup_parse_html(n_rows):
+    return make_review_pages(n_rows)
+
+def _run_parse_html(pages):
+    from utils.scrape_data import parse_reviews_page
+    return sum(len(parse_reviews_page(page)) for page in pages)
+
+
+def _setup_analyzed(n_rows):
+    df = make_analyzed_reviews(n_rows)
+    df['Date'] = df['Date'].astype('datetime64[ns]')
+    return df
+
+def _run_dashboard_cube(df):
+    from utils.dashboard_data import build_cube
+    build_cube(df)
+    return len(df)
+
+def _setup_dashboard_filter(n_rows):
+    from utils.dashboard_data import build_cube
+    df = _setup_analyzed(n_rows)
+    return df, build_cube(df)
+
+def _run_dashboard_filter(state):
+    from utils.dashboard_data import (
+        filter_cube, compute_kpis, rating_distribution, sentiment_distribution, monthly_trend, model_comparison
+    )
+    df, cube = state
+    filtered = filter_cube(cube, df['Date'].min(), df['Date'].max(), ['positif', 'négatif', 'neutre'], (2, 5))
+    compute_kpis(cube)
+    rating_distribution(filtered)
+    sentiment_distribution(filtered)
+    monthly_trend(filtered)
+    model_comparison(filtered)
+    return len(df)
+
+
+# Étapes disponibles ; max_rows borne les tailles des étapes trop lentes pour 1M lignes
+BENCHMARKS = {
+    'clean': {'setup': _setup_clean, 'run': _run_clean, 'max_rows': None},
+    'keywords': {'setup': _setup_cleaned, 'run': _run_keywords, 'max_rows': None},
+    'textblob': {'setup': _setup_cleaned, 'run': _run_textblob, 'max_rows': 100_000},
+    'vader': {'setup': _setup_cleaned, 'run': _run_vader, 'max_rows': 100_000},
+    'bert': {'setup': _setup_bert, 'run': _run_bert, 'max_rows': 10_000},
+    'parse_html': {'setup': _setup_parse_html, 'run': _run_parse_html, 'max_rows': 100_000},
+    'dashboard_cube': {'setup': _setup_analyzed, 'run': _run_dashboard_cube, 'max_rows': None},
+    'dashboard_filter': {'setup': _setup_dashboard_filter, 'run': _run_dashboard_filter, 'max_rows': None},
+}
+
+
+# Mesure une étape pour une taille donnée
+def run_benchmark(name, n_rows, repeat=3):
+    """
+    :param name: Nom de l'étape (clé de BENCHMARKS)
+    :param n_rows: Nombre d'avis synthétiques
+    :param repeat: Nombre de mesures (on retient la médiane)
+    :return: Dictionnaire (seconds, min_seconds, rows, rows_per_sec)
+    """
+    benchmark = BENCHMARKS[name]
+    state = benchmark['setup'](n_rows)
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = benchmark['run'](state)
+        timings.append(time.perf_counter() - start)
+    seconds = statistics.median(timings)
+    return {
+        'seconds': round(seconds, 4),
+        'min_seconds': round(min(timings), 4),
+        'rows': rows,
+        'rows_per_sec': round(rows / seconds, 1) if seconds > 0 else None
+    }
+
+
+# Exécute toutes les étapes demandées pour toutes les tailles
+def run_suite(names, sizes, repeat=3):
+    """
+    :return: Dictionnaire {meta, results: {étape: {taille: mesures}}}
+    """
+    results = {}
+    for name in names:
+        results[name] = {}
+        max_rows = BENCHMARKS[name]['max_rows']
+        for n_rows in sizes:
+            if max_rows and n_rows > max_rows:
+                print(f"{name:<18} {n_rows:>9} ignoré (au-delà de {max_rows} lignes)")
+                continue
+            try:
+                measure = run_benchmark(name, n_rows, repeat)
+            except ImportError as e:
+                print(f"{name:<18} ignoré ({e})")
+                break
+            results[name][str(n_rows)] = measure
+            print(f"{name:<18} {n_rows:>9} {measure['seconds']:>9.3f} s {measure['rows_per_sec']:>12} lignes/s")
+    return {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+
+# Compare deux exécutions de la suite
+def compare_results(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """
+    :param baseline: Résultats de référence (dictionnaire de run_suite)
+    :param current: Nouveaux résultats
+    :param tolerance: Ralentissement relatif toléré (0.2 : +20 %)
+    :return: Liste de (étape, taille, secondes de référence, secondes actuelles, ratio, régression)
+    """
+    rows = []
+    for name, sizes in current['results'].items():
+        for size, measure in sizes.items():
+            reference = baseline['results'].get(name, {}).get(size)
+            if reference is None:
+                continue
+            ratio = measure['seconds'] / reference['seconds'] if reference['seconds'] else float('inf')
+            rows.append((name, size, reference['seconds'], measure['seconds'], ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def print_comparison(rows, tolerance):
+    print(f"{'étape':<18} {'taille':>9} {'référence':>10} {'actuel':>10} {'ratio':>7}")
+    for name, size, reference, current, ratio, regression in rows:
+        flag = "  RÉGRESSION" if regression else ""
+        print(f"{name:<18} {size:>9} {reference:>9.3f}s {current:>9.3f}s {ratio:>6.2f}x{flag}")
+    regressions = sum(row[-1] for row in rows)
+    print(f"{regressions} régression(s) au-delà de +{tolerance:.0%}")
+    return regressions
+
+
+def _load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Exécuter la suite")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Nombres d'avis synthétiques")
+    run_parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                            help="Étapes à mesurer")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Nombre de mesures par étape et par taille")
+    run_parser.add_argument("--output", help="Fichier JSON où enregistrer les résultats")
+    run_parser.add_argument("--baseline", help="Résultats de référence auxquels comparer cette exécution")
+    run_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Ralentissement toléré")
+
+    compare_parser = commands.add_parser("compare", help="Comparer deux fichiers de résultats")
+    compare_parser.add_argument("baseline", help="Résultats de référence")
+    compare_parser.add_argument("current", help="Nouveaux résultats")
+    compare_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Ralentissement toléré")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        current = run_suite(args.only, args.sizes, args.repeat)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(current, f, indent=2)
+        if not args.baseline:
+            return
+        baseline = _load_json(args.baseline)
+    else:
+        baseline, current = _load_json(args.baseline), _load_json(args.current)
+
+    regressions = print_comparison(compare_results(baseline, current, args.tolerance), args.tolerance)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Générateur d'avis synthétiques pour les benchmarks.
+
+Les avis imitent les données scrapées (scrape_data.csv) : ponctuation, emojis,
+textes longs à tronquer, valeurs manquantes et quelques dates mal formées.
+Les pages HTML imitent les pages d'avis Trustpilot (voir data/fixtures).
+"""
+import html
+import json
+import random
+
+import numpy as np
+import pandas as pd
+
+WORDS = (
+    "car tesla service delivery model customer experience app charging battery "
+    "autopilot range great terrible never again love hate waited weeks month "
+    "support phone email refund paint quality drive smooth quiet fast software "
+    "update centre appointment technician replaced broken excellent awful best "
+    "worst happy disappointed recommend price cheap expensive warranty tyres"
+).split()
+PUNCTUATION = [".", ",", "!", "?", "...", " :)", " 😡", " 👍", " - ", " & ", "’"]
+NAMES = ["Jonathan", "Patrick", "Adam", "Ralph", "Michael", "Sarah", "Tom", "Inès", "Lucas", "Emma", "O'Neil"]
+
+
+# Génère un texte aléatoire de n_words mots
+def _random_text(rng, n_words):
+    parts = []
+    for _ in range(n_words):
+        parts.append(rng.choice(WORDS))
+        if rng.random() < 0.12:
+            parts[-1] += rng.choice(PUNCTUATION)
+    return " ".join(parts)
+
+
+# Génère un DataFrame d'avis au format de scrape_data.csv
+def make_scraped_reviews(n_rows, seed=42, pool_size=5000):
+    """
+    :param n_rows: Nombre d'avis à générer
+    :param seed: Graine aléatoire (résultats reproductibles)
+    :param pool_size: Nombre de textes de base combinés pour produire les avis
+    :return: DataFrame (Username, Title, Content, Rating, Date)
+    """
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+
+    # Textes de base : majorité courts, ~5 % dépassant 512 caractères
+    lengths = [rng.choice([8, 20, 45, 120]) if rng.random() < 0.95 else 160 for _ in range(pool_size)]
+    pool = np.array([_random_text(rng, n) for n in lengths], dtype=object)
+    titles = np.array([_random_text(rng, rng.randint(2, 8)) for _ in range(pool_size)], dtype=object)
+
+    idx = np_rng.integers(0, pool_size, size=n_rows)
+    suffix_idx = np_rng.integers(0, pool_size, size=n_rows)
+    contents = pool[idx] + " " + titles[suffix_idx]
+    timestamps = pd.Timestamp("2015-01-01") + pd.to_timedelta(np_rng.integers(0, 10 * 365 * 86400, size=n_rows), unit="s")
+    dates = pd.Series(timestamps.strftime("%Y-%m-%dT%H:%M:%S.000Z"), dtype=object)
+
+    df = pd.DataFrame({
+        "Username": np.array(NAMES, dtype=object)[np_rng.integers(0, len(NAMES), size=n_rows)],
+        "Title": titles[np_rng.integers(0, pool_size, size=n_rows)],
+        "Content": contents,
+        "Rating": np_rng.integers(1, 6, size=n_rows).astype(str).astype(object),
+        "Date": dates,
+    })
+
+    # Quelques valeurs manquantes ou mal formées, comme dans les données réelles
+    for column, rate in (("Title", 0.01), ("Content", 0.005), ("Rating", 0.002)):
+        df.loc[np_rng.random(n_rows) < rate, column] = None
+    df.loc[np_rng.random(n_rows) < 0.002, "Date"] = "2024-13-01T00:00:00.000Z"
+    df.loc[np_rng.random(n_rows) < 0.002, "Date"] = "2024-3-1T10:00:00.5Z"
+    return df
+
+
+# Génère un DataFrame d'avis analysés au format de sentiments_analyze.csv
+def make_analyzed_reviews(n_rows, seed=42):
+    """
+    :param n_rows: Nombre d'avis à générer
+    :param seed: Graine aléatoire
+    :return: DataFrame nettoyé avec les colonnes de scores et de labels
+    """
+    from utils.clean_data import clean_and_structure_frame
+
+    np_rng = np.random.default_rng(seed)
+    df = clean_and_structure_frame(make_scraped_reviews(n_rows, seed)).reset_index(drop=True)
+    n = len(df)
+    labels = np.array(["très négatif", "négatif", "neutre", "positif", "très positif"], dtype=object)
+    bins = [-0.6, -0.2, 0.2, 0.6]
+    for model in ("TextBlob", "VADER"):
+        scores = np.round(np_rng.uniform(-1, 1, size=n), 4)
+        df[f"Sentiment_{model}"] = scores
+        df[f"Sentiment_{model}_label"] = labels[np.digitize(scores, bins)]
+    df["Sentiment_BERT_Label"] = labels[np.clip(df["Rating"].to_numpy(dtype=int) - 1 + np_rng.integers(-1, 2, size=n), 0, 4)]
+    df["Sentiment_BERT_Prob"] = np.round(np_rng.uniform(20, 99, size=n), 2)
+    return df
+
+
+# Balisage d'un avis, identique à celui des pages Trustpilot (data/fixtures)
+_ARTICLE = (
+    '<article class="paper_paper__1PY90 paper_outline__lwsUX card_card__lQWDv styles_reviewCard__hcAvl" '
+    'data-service-review-card-paper="true">\n'
+    '<aside class="styles_consumerInfoWrapper__KP3Ra"><a href="/users/{id}" name="consumer-profile">'
+    '<span class="typography_heading-xxs__QKBS8 typography_appearance-default__AAY17" '
+    'data-consumer-name-typography="true">{username}</span></a></aside>\n'
+    '<section class="styles_reviewContentwrapper__zH_9M"><div class="styles_reviewHeader__iU9Px" '
+    'data-service-review-rating="{rating}"><div class="star-rating_starRating__4rrcf">'
+    '<img alt="Rated {rating} out of 5 stars"></div><div class="typography_body-m__xgxZ_">'
+    '<time datetime="{date}" data-service-review-date-time-ago="true">{day}</time></div></div>\n'
+    '<div class="styles_reviewContent__0Q2Tg" aria-hidden="false"><a href="/reviews/{id}" '
+    'data-review-title-typography="true"><h2 class="typography_heading-s__f7029 typography_appearance-default__AAY17" '
+    'data-service-review-title-typography="true">{title}</h2></a><p class="typography_body-l__KUYFJ '
+    'typography_appearance-default__AAY17 typography_color-black__5LYEn" '
+    'data-service-review-text-typography="true">{content}</p></div></section>\n'
+    '</article>\n'
+)
+
+
+# Génère des pages HTML d'avis au format Trustpilot (balisage et données __NEXT_DATA__)
+def make_review_pages(n_reviews, reviews_per_page=20, seed=42):
+    """
+    :param n_reviews: Nombre total d'avis
+    :param reviews_per_page: Nombre d'avis par page
+    :param seed: Graine aléatoire
+    :return: Liste de pages HTML (chaînes)
+    """
+    df = make_scraped_reviews(n_reviews, seed).fillna({"Title": "", "Content": "", "Rating": "3"})
+    df = df[df["Date"].str.match(r"^\d{4}-\d{2}-\d{2}T")]
+    total_pages = -(-len(df) // reviews_per_page)
+    pages = []
+    for page in range(total_pages):
+        chunk = df.iloc[page * reviews_per_page:(page + 1) * reviews_per_page]
+        articles = []
+        reviews = []
+        for i, row in enumerate(chunk.itertuples(index=False)):
+            review_id = f"{page:08x}{i:04x}"
+            articles.append(_ARTICLE.format(
+                id=review_id, username=html.escape(row.Username), rating=row.Rating, date=row.Date,
+                day=row.Date[:10], title=html.escape(row.Title), content=html.escape(row.Content)
+            ))
+            reviews.append({
+                "id": review_id, "title": row.Title, "text": row.Content, "rating": int(row.Rating),
+                "dates": {"publishedDate": row.Date}, "consumer": {"displayName": row.Username}
+            })
+        next_data = {
+            "props": {"pageProps": {
+                "reviews": reviews,
+                "filters": {"pagination": {"currentPage": page + 1, "totalPages": total_pages}}
+            }}
+        }
+        pages.append(
+            '<!DOCTYPE html><html lang="en"><head><meta charSet="utf-8"/><title>Tesla Reviews</title></head>\n'
+            '<body><div id="__next"><main class="styles_main__Y8zDm"><section class="styles_reviewsContainer__3_GQw">\n'
+            + "".join(articles)
+            + '</section></main></div>\n<script id="__NEXT_DATA__" type="application/json">'
+            + json.dumps(next_data).replace("</", "<\\/")
+            + '</script></body></html>\n'
+        )
+    return pages
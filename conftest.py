@@ -0,0 +1,24 @@
+import pytest
+from unittest.mock import patch
+
+
+def _fake_analyze(data_frame, **kwargs):
+    data_frame['Sentiment_TextBlob'] = data_frame['Content'].str.len().astype(float)
+    data_frame['Sentiment_TextBlob_label'] = "neutre"
+    data_frame['Sentiment_VADER'] = 0.0
+    data_frame['Sentiment_VADER_label'] = "neutre"
+    data_frame['Sentiment_BERT_Label'] = data_frame['Content']
+    data_frame['Sentiment_BERT_Prob'] = 50.0
+    return data_frame
+
+@pytest.fixture
+def fake_analyze():
+    """Remplaçant déterministe d'analyze_sentiments, sans modèle (label BERT = contenu)."""
+    return _fake_analyze
+
+@pytest.fixture
+def patch_analyze(fake_analyze):
+    """Remplace analyze_sentiments dans un module : with patch_analyze("utils.dedup") as analyze: ..."""
+    def patcher(module, side_effect=fake_analyze):
+        return patch(f"{module}.analyze_sentiments", side_effect=side_effect)
+    return patcher
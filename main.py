@@ -1,19 +1,71 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
 import plotly.express as px
+import os
+from utils.keywords_io import load_keywords, keyword_means
+from utils.storage import find_dataset, load_frame
+from utils.dashboard_data import (
+    build_cube, filter_cube, compute_kpis, rating_distribution, sentiment_distribution,
+    monthly_trend, model_comparison as compute_model_comparison, agreement_matrix, AGREEMENT_PAIRS,
+    MODEL_AGREEMENT_FILE
+)
+from utils.render_cache import RenderCache, cached_wordcloud_png
+from utils.review_store import ReviewStore
+
+# Colonnes utilisées par le dashboard (seules celles-ci sont lues)
+DASHBOARD_COLUMNS = ["Date", "Rating", "Sentiment_BERT_Label", "Sentiment_TextBlob", "Sentiment_VADER"]
+
+# Répertoire des images rendues mises en cache sur disque
+RENDER_CACHE_DIR = "./data/render_cache"
+
+# Avis partitionnés par mois, écrits par process_data
+REVIEW_STORE_DIR = "./data/reviews_store"
+
+# Aperçu des avis correspondant aux filtres
+REVIEW_PREVIEW_COLUMNS = ["Date", "Rating", "Sentiment_BERT_Label", "Title", "Content"]
+REVIEW_PREVIEW_ROWS = 100
+
+# Matrice d'accord entre la note et les modèles, précalculée par process_data
+model_agreement_path = os.path.join("./data", MODEL_AGREEMENT_FILE)
+
+# Charger les données (Parquet si disponible, sinon CSV)
+file_path = find_dataset("./data", "sentiments_analyze")  # Mettez à jour ce chemin si nécessair
+keywords_file_path = "./data/keywords_data.npz"  # Mettez à jour ce chemin si nécessaire
+if not os.path.exists(keywords_file_path):
+    keywords_file_path = "./data/keywords_data.csv"  # Ancien format dense
+
 
-# Charger les données
-file_path = "./data/sentiments_analyze.csv"  # Mettez à jour ce chemin si nécessair
-keywords_file_path = "./data/keywords_data.csv"  # Mettez à jour ce chemin si nécessaire
+# Chargement partagé entre les sessions, invalidé quand le fichier change (mtime)
+@st.cache_data(show_spinner=False)
+def load_sentiment_cube(path, mtime):
+    data = load_frame(path, columns=DASHBOARD_COLUMNS)
+    return build_cube(data)
 
-data = pd.read_csv(file_path)
-keywords_data = pd.read_csv(keywords_file_path)
+@st.cache_data(show_spinner=False)
+def load_store_cube(directory, mtime):
+    return ReviewStore(directory).cube()
 
-# Préparer les données des sentiments
-data['Date'] = pd.to_datetime(data['Date'])
-data['Month_Year'] = data['Date'].dt.to_period('M')
+@st.cache_data(show_spinner=False)
+def load_model_agreement(path, mtime):
+    return pd.read_csv(path, encoding='utf-8-sig')
+
+@st.cache_data(show_spinner=False)
+def load_keyword_means(path, mtime):
+    keywords_matrix, keywords_terms = load_keywords(path)
+    return keyword_means(keywords_matrix, keywords_terms)
+
+# Cache des images rendues (nuage de mots), partagé entre les sessions
+@st.cache_resource
+def get_render_cache():
+    return RenderCache(directory=RENDER_CACHE_DIR)
+
+# Préparer les données des sentiments : cube d'agrégats jour x sentiment x note
+# (assemblé depuis les cubes mensuels du stockage partitionné s'il existe)
+review_store = ReviewStore(REVIEW_STORE_DIR)
+if review_store.exists():
+    cube = load_store_cube(REVIEW_STORE_DIR, os.path.getmtime(review_store.manifest_path))
+else:
+    cube = load_sentiment_cube(file_path, os.path.getmtime(file_path))
 
 # Configuration de la page
 st.set_page_config(
@@ -30,50 +82,56 @@ st.markdown("<h3 style='text-align: center;'>Explorez les avis, sentiments et mo
 st.markdown("## 🧮 Indicateurs Clés de Performance")
 kpi_col1, kpi_col2, kpi_col3 = st.columns(3)
 
+total_reviews, avg_rating, common_sentiment = compute_kpis(cube)
+
 with kpi_col1:
-    total_reviews = len(data)
     st.metric(label="Total des Avis", value=total_reviews)
 
 with kpi_col2:
-    avg_rating = round(data['Rating'].mean(), 2)
     st.metric(label="Note Moyenne", value=avg_rating)
 
 with kpi_col3:
-    common_sentiment = data['Sentiment_BERT_Label'].mode()[0]
     st.metric(label="Sentiment Dominant", value=common_sentiment)
 
 # Filtres
 st.sidebar.title("Filtres")
 start_date, end_date = st.sidebar.date_input(
     "Filtrer par plage de dates",
-    [data['Date'].min().date(), data['Date'].max().date()]
+    [cube['Day'].min().date(), cube['Day'].max().date()]
 )
+sentiment_options = list(cube['Sentiment_BERT_Label'].unique())
 selected_sentiment = st.sidebar.multiselect(
     "Filtrer par sentiment",
-    options=data['Sentiment_BERT_Label'].unique(),
-    default=data['Sentiment_BERT_Label'].unique()
+    options=sentiment_options,
+    default=sentiment_options
 )
 selected_rating = st.sidebar.slider("Filtrer par notes", 1, 5, (1, 5))
 
-# Appliquer les filtres
-filtered_data = data[
-    (data['Date'] >= pd.Timestamp(start_date)) &
-    (data['Date'] <= pd.Timestamp(end_date)) &
-    (data['Sentiment_BERT_Label'].isin(selected_sentiment)) &
-    (data['Rating'].between(*selected_rating))
-]
+# Appliquer les filtres (sur le cube, pas sur les avis)
+filtered_cube = filter_cube(cube, start_date, end_date, selected_sentiment, selected_rating)
+
+# Aperçu des avis filtrés : seules les partitions des mois sélectionnés sont lues
+if review_store.exists():
+    with st.expander("Derniers avis correspondant aux filtres"):
+        st.dataframe(
+            review_store.query(
+                start_date, end_date, selected_sentiment, selected_rating,
+                columns=REVIEW_PREVIEW_COLUMNS, limit=REVIEW_PREVIEW_ROWS, newest_first=True
+            ),
+            use_container_width=True
+        )
 
 # Section : Visualisations principales
 st.markdown("## 📊 Visualisations des Avis et Sentiments")
 
 # Visualisation 1 : Répartition des notes
 st.markdown("### Répartition des Notes")
-fig = px.histogram(
-    filtered_data,
-    x="Rating",
-    nbins=5,
+ratings_count = rating_distribution(filtered_cube)
+fig = px.bar(
+    x=ratings_count.index,
+    y=ratings_count.values,
     title="Répartition des Notes",
-    labels={"Rating": "Notes", "count": "Nombre d'Avis"},
+    labels={"x": "Notes", "y": "Nombre d'Avis"},
     color_discrete_sequence=["#636EFA"]
 )
 st.plotly_chart(fig, use_container_width=True)
@@ -83,9 +141,10 @@ st.write("""
 
 # Visualisation 2 : Distribution des sentiments
 st.markdown("### Distribution des Sentiments")
+sentiments_count = sentiment_distribution(filtered_cube)
 fig = px.pie(
-    filtered_data,
-    names="Sentiment_BERT_Label",
+    names=sentiments_count.index,
+    values=sentiments_count.values,
     title="Distribution des Sentiments",
     color_discrete_sequence=px.colors.qualitative.Set3
 )
@@ -96,7 +155,7 @@ st.write("""
 
 # Visualisation 3 : Évolution des notes dans le temps
 st.markdown("### Évolution des Notes dans le Temps")
-ratings_over_time = filtered_data.groupby('Month_Year')['Rating'].mean()
+ratings_over_time = monthly_trend(filtered_cube)
 fig = px.line(
     x=ratings_over_time.index.astype(str),
     y=ratings_over_time.values,
@@ -112,29 +171,7 @@ st.write("""
 # Comparaison des modèles de sentiment
 st.markdown("## 🧠 Comparaison des Modèles de Sentiment")
 
-model_comparison = pd.DataFrame({
-    "Modèle": ["BERT", "TextBlob", "VADER"],
-    "Positif": [
-        (filtered_data['Sentiment_BERT_Label'] == 'positif').sum(),
-        (filtered_data['Sentiment_TextBlob'] > 0).sum(),
-        (filtered_data['Sentiment_VADER'] > 0).sum()
-    ],
-    "Négatif": [
-        (filtered_data['Sentiment_BERT_Label'] == 'négatif').sum(),
-        (filtered_data['Sentiment_TextBlob'] < 0).sum(),
-        (filtered_data['Sentiment_VADER'] < 0).sum()
-    ],
-    "Très positif": [
-        (filtered_data['Sentiment_BERT_Label'] == 'très positif').sum(),
-        0,  # TextBlob et VADER n'ont pas de catégorie "très positif"
-        0
-    ],
-    "Très négatif": [
-        (filtered_data['Sentiment_BERT_Label'] == 'très négatif').sum(),
-        0,  # TextBlob et VADER n'ont pas de catégorie "très négatif"
-        0
-    ]
-})
+model_comparison = compute_model_comparison(filtered_cube)
 
 model_comparison_melted = model_comparison.melt(
     id_vars="Modèle", var_name="Sentiment", value_name="Nombre"
@@ -154,22 +191,39 @@ st.write("""
 **Observation :** Le modèle BERT détecte des sentiments extrêmes ("très positif" et "très négatif"), ce qui le rend plus granulaire. TextBlob et VADER sont plus limités mais offrent une vue simplifiée.
 """)
 
+# Accord entre les modèles (matrice précalculée sur l'ensemble des avis)
+if os.path.exists(model_agreement_path):
+    st.markdown("### Accord entre les Modèles")
+    model_agreement = load_model_agreement(model_agreement_path, os.path.getmtime(model_agreement_path))
+    reference, compared = st.selectbox(
+        "Comparer", AGREEMENT_PAIRS, format_func=lambda pair: f"{pair[0]} / {pair[1]}"
+    )
+    matrix = agreement_matrix(model_agreement, reference, compared)
+    fig = px.imshow(
+        matrix,
+        text_auto=True,
+        color_continuous_scale="Viridis",
+        labels={"y": reference, "x": compared, "color": "Nombre d'Avis"},
+        title=f"Accord entre {reference} et {compared}"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("Matrice calculée sur l'ensemble des avis analysés : les filtres ne s'y appliquent pas.")
+
 # Section : Visualisations des mots-clés
 st.markdown("## ☁️ Visualisations des Mots-Clés")
 
 # Nuage de mots
 st.markdown("### Nuage de Mots")
-keywords_mean = data.mean().sort_values(ascending=False)
-wordcloud = WordCloud(
+keywords_mean = load_keyword_means(keywords_file_path, os.path.getmtime(keywords_file_path))
+wordcloud_png = cached_wordcloud_png(
+    get_render_cache(),
+    keywords_mean,
     width=800,
     height=400,
     background_color="white",
     colormap="coolwarm"
-).generate_from_frequencies(keywords_mean)
-fig, ax = plt.subplots(figsize=(10, 6))
-ax.imshow(wordcloud, interpolation="bilinear")
-ax.axis("off")
-st.pyplot(fig)
+)
+st.image(wordcloud_png, use_column_width=True)
 st.write("""
 **Observation :** Les mots les plus fréquents, tels que "car" et "service", sont probablement liés à l'expérience directe des utilisateurs avec Tesla.
 """)
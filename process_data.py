@@ -1,59 +1,377 @@
 import os
+import argparse
+import contextlib
+import functools
 import pandas as pd
 import logging
-from utils.clean_data import clean_and_structure_data
-from utils.extract_sentiment import extract_keywords, analyze_sentiments
-from utils.scrape_data import scrape_trustpilot_reviews
+from utils.clean_data import clean_and_structure_data, clean_and_structure_frame
+from utils.extract_sentiment import (
+    extract_keywords_chunked, analyze_sentiments, model_signature,
+    configure_bert_backend, BERT_BACKENDS, BERT_CHUNK_STRIDE
+)
+from utils.keywords_io import save_keywords_npz
+from utils.keyword_model import extract_keywords_incremental
+from utils.review_store import ReviewStore
+from utils.dashboard_data import model_agreement, merge_agreement, MODEL_AGREEMENT_FILE
+from utils.checkpoint import RunCheckpoint, analyze_sentiments_checkpointed
+from scipy import sparse
+from utils.sentiment_cache import SentimentCache
+from utils.scrape_data import (
+    scrape_trustpilot_reviews_resumable, scrape_trustpilot_reviews_incremental, iter_review_pages,
+    load_scrape_state, save_scrape_state, state_from_reviews, merge_reviews, REVIEW_COLUMNS
+)
+from utils.streaming import CsvAppendSink, HoldbackSink, rechunk, run_pipeline, STREAM_CHUNK_SIZE, STREAM_QUEUE_SIZE
+from utils.storage import (
+    BACKENDS, DEFAULT_FORMAT, save_frame, load_frame, find_dataset, dataset_path, append_sink, iter_frame_chunks
+)
+from utils.metrics import RunMetrics, measure
+from utils.dedup import analyze_sentiments_deduplicated, DEDUP_THRESHOLD
+from utils.scheduler import run_companies, DEFAULT_PARALLEL_COMPANIES
 from datetime import datetime
 
 # Configuration du logger
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Fonction pour sauvegarder les DataFrames
-def save_dataframe(df, file_name):
+# Répertoire des données et cache persistant des résultats de sentiment
+DATA_DIR = '.\\data'
+SENTIMENT_CACHE_FILE = 'sentiment_cache.sqlite'
+SCRAPE_STATE_FILE = 'scrape_state.json'
+
+# Modèle TF-IDF persistant (vocabulaire, fréquences documentaires, comptes par avis)
+KEYWORD_MODEL_FILE = 'keyword_model.npz'
+
+# Avis analysés partitionnés par mois, lus par le dashboard
+REVIEW_STORE_DIR = 'reviews_store'
+
+# Point de reprise de la dernière exécution (pages scrapées, chunks analysés)
+CHECKPOINT_DIR = 'checkpoint'
+
+# Rapport d'exécution (mesures par étape) écrit à la fin de chaque traitement
+RUN_REPORT_FILE = 'run_report.json'
+
+# Nombre d'avis réservés à l'échantillon de validation
+VALIDATION_SIZE = 50
+
+# Fonction pour sauvegarder les DataFrames (format déduit de l'extension : .parquet, .csv)
+def save_dataframe(df, file_name, typed=True):
     try:
-        file_path = os.path.join('.\\data', file_name)
-        df.to_csv(file_path, index=False, encoding='utf-8-sig')
+        file_path = os.path.join(DATA_DIR, file_name)
+        save_frame(df, file_path, typed=typed)
         logger.info(f"Fichier sauvegardé : {file_path}")
-    except Exception as e:
-        logger.error(f"Erreur lors de la sauvegarde du fichier {file_name}: {e}")
+    except Exception:
+        logger.exception(f"Erreur lors de la sauvegarde du fichier {file_name}")
+
+# Scraping incrémental fusionné avec les avis déjà stockés
+def scrape_incremental():
+    """
+    Ne récupère que les avis publiés depuis la dernière exécution et les fusionne
+    (sans doublons) avec les avis déjà stockés (scrape_data).
+    :return: Tuple (avis fusionnés, nouvel état, nombre de nouveaux avis)
+    """
+    scrape_path = find_dataset(DATA_DIR, 'scrape_data')
+    stored = load_frame(scrape_path, typed=False) if scrape_path else None
+
+    state = load_scrape_state(os.path.join(DATA_DIR, SCRAPE_STATE_FILE))
+    if state is None and stored is not None:
+        state = state_from_reviews(stored)
+
+    new_reviews, state = scrape_trustpilot_reviews_incremental(state)
+    return merge_reviews(stored, new_reviews), state, len(new_reviews)
 
 # Fonction principale de traitement
-def process_data():
+def process_data(use_cache=True, incremental=False, workers=None, storage_format=DEFAULT_FORMAT, long_reviews=False,
+                 prometheus_path=None, profile_dir=None, dedup_threshold=None, resume=False):
+    """
+    :param dedup_threshold: Si renseigné, seul un avis par groupe de quasi-doublons est analysé
+    :param prometheus_path: Fichier où écrire les mesures au format Prometheus (optionnel)
+    :param profile_dir: Répertoire où écrire un profil cProfile par étape (optionnel)
+    :param resume: Reprendre l'exécution interrompue à partir de son point de reprise
+                   (pages scrapées et chunks analysés déjà enregistrés)
+    """
+    metrics = RunMetrics(profile_dir)
+    chunk_stride = BERT_CHUNK_STRIDE if long_reviews else None
+    checkpoint = RunCheckpoint(os.path.join(DATA_DIR, CHECKPOINT_DIR), {
+        'incremental': incremental, 'storage_format': storage_format, 'long_reviews': long_reviews,
+        'dedup_threshold': dedup_threshold, 'models': model_signature(bert_chunk_stride=chunk_stride)
+    })
     try:
-      
-        # Scraper les données
-        scrape_data = scrape_trustpilot_reviews()
-        if scrape_data.empty:
-            logger.warning("Aucune donnée récupérée lors du scraping.")
-            return
-        save_dataframe(scrape_data, f'scrape_data.csv')
+        ext = BACKENDS[storage_format]['extension']
+        checkpoint.start(resume)
+
+        # Scraper les données (étape sautée si elle était terminée lors de l'exécution reprise)
+        if checkpoint.is_done('scrape'):
+            scrape_data = load_frame(os.path.join(DATA_DIR, f'scrape_data{ext}'), typed=False)
+            logger.info(f"Scraping déjà terminé : {len(scrape_data)} avis repris.")
+        else:
+            with measure(metrics, 'scrape') as record:
+                if incremental:
+                    scrape_data, scrape_state, n_new = scrape_incremental()
+                    record['rows_out'] = n_new
+                else:
+                    scrape_data = scrape_trustpilot_reviews_resumable(checkpoint)
+                    record['rows_out'] = len(scrape_data)
+            if incremental and n_new == 0:
+                logger.info("Aucun nouvel avis depuis la dernière exécution.")
+                return
+            if scrape_data.empty:
+                logger.warning("Aucune donnée récupérée lors du scraping.")
+                return
+            save_dataframe(scrape_data, f'scrape_data{ext}', typed=False)
+            if incremental:
+                save_scrape_state(os.path.join(DATA_DIR, SCRAPE_STATE_FILE), scrape_state)
+            checkpoint.complete('scrape')
  
         # Nettoyage des données
-        clean_data = clean_and_structure_data(file_path='.\\data\\scrape_data.csv')
-        if clean_data.empty:
+        with measure(metrics, 'clean', rows_in=len(scrape_data)) as record:
+            clean_data = clean_and_structure_data(
+                file_path=os.path.join(DATA_DIR, f'scrape_data{ext}'), truncate=not long_reviews
+            )
+            record['rows_out'] = 0 if clean_data is None else len(clean_data)
+        if clean_data is None or clean_data.empty:
             logger.warning("Aucune donnée nettoyée.")
             return
         
-        df_model= clean_data.iloc[:-50]
-        df_test=clean_data.iloc[-50:]
-        save_dataframe(df_model, f'clean_data.csv')
+        df_model= clean_data.iloc[:-VALIDATION_SIZE]
+        df_test=clean_data.iloc[-VALIDATION_SIZE:]
+        save_dataframe(df_model, f'clean_data{ext}')
         df_test.to_csv(".\\data\\echantillon_validation_test.csv", index=False, encoding='utf-8-sig')
 
 
-        # Extraction des mots-clés
-        keywords_data = extract_keywords(df=clean_data)
-        save_dataframe(keywords_data, f'keywords_data.csv')
+        # Extraction des mots-clés (en incrémental, seuls les nouveaux avis sont tokenisés)
+        with measure(metrics, 'keywords', rows_in=len(clean_data)) as record:
+            keywords_matrix, keywords_terms = extract_keywords_incremental(
+                clean_data, os.path.join(DATA_DIR, KEYWORD_MODEL_FILE), rebuild=not incremental
+            )
+            record['rows_out'] = 0 if keywords_matrix is None else keywords_matrix.shape[0]
+        if keywords_matrix is not None:
+            save_keywords_npz(os.path.join(DATA_DIR, 'keywords_data.npz'), keywords_matrix, keywords_terms)
 
-        # Analyse des sentiments
-        sentiments_analyze = analyze_sentiments(data_frame=clean_data)
-        save_dataframe(sentiments_analyze, f'sentiments_analyze.csv')
+        # Analyse des sentiments (avis longs : fenêtres BERT au lieu de la troncature),
+        # chunk par chunk : chaque chunk analysé est enregistré dans le point de reprise
+        with contextlib.ExitStack() as stack:
+            cache = None
+            if use_cache:
+                signature = model_signature(bert_chunk_stride=chunk_stride)
+                cache = stack.enter_context(SentimentCache(os.path.join(DATA_DIR, SENTIMENT_CACHE_FILE), signature))
+            kwargs = {'cache': cache, 'workers': workers, 'bert_chunk_stride': chunk_stride, 'metrics': metrics}
+            analyze = functools.partial(analyze_sentiments_checkpointed, checkpoint=checkpoint)
+            if dedup_threshold:
+                # Un seul avis analysé par groupe de quasi-doublons, scores recopiés sur les autres
+                sentiments_analyze = analyze_sentiments_deduplicated(
+                    clean_data, threshold=dedup_threshold, analyze=analyze, **kwargs
+                )
+            else:
+                sentiments_analyze = analyze(clean_data, **kwargs)
+        save_dataframe(sentiments_analyze, f'sentiments_analyze{ext}')
 
+        # Matrice d'accord note / BERT / TextBlob / VADER, lue par le dashboard et le notebook
+        save_dataframe(model_agreement(sentiments_analyze), MODEL_AGREEMENT_FILE, typed=False)
+
+        # Stockage partitionné par mois (seuls les mois modifiés sont réécrits)
+        with measure(metrics, 'review_store', rows_in=len(sentiments_analyze)) as record:
+            ReviewStore(os.path.join(DATA_DIR, REVIEW_STORE_DIR)).write(sentiments_analyze)
+            record['rows_out'] = int(sentiments_analyze['Date'].notna().sum())
+
+        checkpoint.clear()
         logger.info('Processus terminé avec succès.')
  
     except Exception as e:
-        logger.error(f"Erreur dans le processus de traitement des données : {e}")
+        logger.exception("Erreur dans le processus de traitement des données")
+        metrics.fail(e)
+        if checkpoint.state is not None:
+            logger.info(f"Progression enregistrée dans {checkpoint.directory} : relancer avec --resume pour reprendre.")
+    finally:
+        metrics.save(os.path.join(DATA_DIR, RUN_REPORT_FILE), prometheus_path)
+
+# Traitement en flux : scrape -> nettoyage -> sentiments -> fichiers, chunk par chunk
+def process_data_streaming(chunk_size=STREAM_CHUNK_SIZE, queue_size=STREAM_QUEUE_SIZE, use_cache=True, workers=None,
+                           storage_format=DEFAULT_FORMAT, long_reviews=False, prometheus_path=None, profile_dir=None):
+    """
+    Produit les mêmes fichiers que process_data sans jamais charger tout le corpus :
+    chaque étape traite des chunks de chunk_size avis, reliés par des files bornées,
+    et les sorties sont écrites au fil de l'eau. Les mots-clés sont calculés ensuite
+    en deux passes sur les fichiers nettoyés, lus par chunks.
+    :param chunk_size: Nombre d'avis par chunk
+    :param queue_size: Nombre maximal de chunks en attente entre deux étapes
+    :param use_cache: Utiliser le cache des résultats de sentiment
+    :param workers: Nombre de processus pour TextBlob et VADER
+    :param storage_format: Format des fichiers de sortie ('parquet', 'csv')
+    :param long_reviews: Analyser les avis longs par fenêtres BERT au lieu de les tronquer
+    :param prometheus_path: Fichier où écrire les mesures au format Prometheus (optionnel)
+    :param profile_dir: Répertoire où écrire un profil cProfile par étape (optionnel)
+    """
+    metrics = RunMetrics(profile_dir)
+    chunk_stride = BERT_CHUNK_STRIDE if long_reviews else None
+    clean_path = dataset_path(DATA_DIR, 'clean_data', storage_format)
+    validation_path = os.path.join(DATA_DIR, 'echantillon_validation_test.csv')
+    scrape_sink = append_sink(dataset_path(DATA_DIR, 'scrape_data', storage_format), typed=False)
+    clean_sink = HoldbackSink(append_sink(clean_path), CsvAppendSink(validation_path), VALIDATION_SIZE)
+    sentiments_sink = append_sink(dataset_path(DATA_DIR, 'sentiments_analyze', storage_format))
+    # Comptes d'accord par chunk, additionnés en fin de traitement
+    agreements = []
+    # Le stockage partitionné est reconstruit au fil des chunks, comme sentiments_analyze
+    review_store = ReviewStore(os.path.join(DATA_DIR, REVIEW_STORE_DIR))
+    review_store.clear()
+
+    def scraped_chunks():
+        pages = (pd.DataFrame(reviews, columns=REVIEW_COLUMNS) for _, reviews in iter_review_pages())
+        chunks = rechunk(pages, chunk_size)
+        while True:
+            with measure(metrics, 'scrape') as record:
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    scrape_sink.append(chunk)
+                    record['rows_out'] = len(chunk)
+            if chunk is None:
+                return
+            yield chunk
+
+    def clean_stage(chunk):
+        with measure(metrics, 'clean', rows_in=len(chunk)) as record:
+            cleaned = clean_and_structure_frame(chunk, truncate=not long_reviews)
+            record['rows_out'] = 0 if cleaned is None else len(cleaned)
+        if cleaned is None:
+            raise ValueError("Échec du nettoyage d'un chunk")
+        if cleaned.empty:
+            return None
+        clean_sink.append(cleaned)
+        return cleaned
+
+    def sentiment_stage(chunk):
+        analyzed = analyze_sentiments(
+            data_frame=chunk, cache=cache, workers=workers, bert_chunk_stride=chunk_stride, metrics=metrics
+        )
+        sentiments_sink.append(analyzed)
+        agreements.append(model_agreement(analyzed))
+        with measure(metrics, 'review_store', rows_in=len(analyzed)) as record:
+            review_store.append(analyzed)
+            record['rows_out'] = int(analyzed['Date'].notna().sum())
+
+    try:
+        with contextlib.ExitStack() as stack:
+            cache = None
+            if use_cache:
+                cache = stack.enter_context(
+                    SentimentCache(
+                        os.path.join(DATA_DIR, SENTIMENT_CACHE_FILE), model_signature(bert_chunk_stride=chunk_stride)
+                    )
+                )
+            try:
+                run_pipeline(scraped_chunks(), [clean_stage, sentiment_stage], queue_size)
+            finally:
+                for sink in (scrape_sink, clean_sink, sentiments_sink):
+                    sink.close()
+
+        if scrape_sink.rows == 0:
+            logger.warning("Aucune donnée récupérée lors du scraping.")
+            return
+
+        if agreements:
+            save_dataframe(merge_agreement(agreements), MODEL_AGREEMENT_FILE, typed=False)
+
+        # Extraction des mots-clés sur les fichiers nettoyés, lus par chunks
+        def clean_chunks():
+            for path in (clean_path, validation_path):
+                if os.path.exists(path):
+                    yield from iter_frame_chunks(path, chunk_size, columns=['Content'])
+
+        # La matrice reste creuse : au plus n_keywords valeurs non nulles par avis
+        keywords_chunks = []
+        keywords_terms = []
+        with measure(metrics, 'keywords') as record:
+            for keywords_chunk, keywords_terms in extract_keywords_chunked(clean_chunks):
+                keywords_chunks.append(keywords_chunk)
+            record['rows_out'] = sum(keywords_chunk.shape[0] for keywords_chunk in keywords_chunks)
+        if keywords_chunks:
+            save_keywords_npz(
+                os.path.join(DATA_DIR, 'keywords_data.npz'), sparse.vstack(keywords_chunks, format='csr'), keywords_terms
+            )
+
+        logger.info('Processus terminé avec succès.')
+
+    except Exception as e:
+        logger.exception("Erreur dans le processus de traitement des données")
+        metrics.fail(e)
+    finally:
+        metrics.save(os.path.join(DATA_DIR, RUN_REPORT_FILE), prometheus_path)
+
+# Traitement de plusieurs entreprises en parallèle, sorties dans data/companies/<domaine>/
+def process_companies(domains, parallel=DEFAULT_PARALLEL_COMPANIES, use_cache=True, workers=None,
+                      storage_format=DEFAULT_FORMAT, long_reviews=False, dedup_threshold=None,
+                      prometheus_path=None, profile_dir=None):
+    """
+    :param domains: Domaines des entreprises (ex. ['www.teslamotors.com', 'www.bmw.com'])
+    :param parallel: Nombre d'entreprises scrapées en même temps
+    :return: Résumé par domaine (voir run_companies)
+    """
+    metrics = RunMetrics(profile_dir)
+    summary = {}
+    try:
+        summary = run_companies(
+            domains, DATA_DIR, storage_format=storage_format, parallel=parallel, use_cache=use_cache,
+            cache_file=os.path.join(DATA_DIR, SENTIMENT_CACHE_FILE), workers=workers,
+            dedup_threshold=dedup_threshold, long_reviews=long_reviews,
+            bert_chunk_stride=BERT_CHUNK_STRIDE if long_reviews else None, metrics=metrics
+        )
+        failed = [domain for domain, result in summary.items() if result['status'] == 'failed']
+        if failed:
+            metrics.fail(RuntimeError(f"Échec pour {', '.join(failed)}"))
+        logger.info(f"Traitement terminé pour {len(summary) - len(failed)}/{len(summary)} entreprises.")
+    except Exception as e:
+        logger.exception("Erreur dans le traitement multi-entreprises")
+        metrics.fail(e)
+    finally:
+        metrics.save(os.path.join(DATA_DIR, RUN_REPORT_FILE), prometheus_path)
+    return summary
 
 if __name__ == "__main__":
-    process_data()
+    parser = argparse.ArgumentParser(description="Scraping et analyse des avis Trustpilot")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Ne récupérer que les avis publiés depuis la dernière exécution")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ne pas utiliser le cache des résultats de sentiment")
+    parser.add_argument('--stream', action='store_true',
+                        help="Traiter les avis par chunks sans charger tout le corpus en mémoire")
+    parser.add_argument('--chunk-size', type=int, default=STREAM_CHUNK_SIZE,
+                        help="Nombre d'avis par chunk en mode --stream")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Nombre de processus pour les analyses TextBlob et VADER")
+    parser.add_argument('--format', choices=sorted(BACKENDS), default=DEFAULT_FORMAT,
+                        help="Format de stockage des fichiers entre les étapes")
+    parser.add_argument('--bert-backend', choices=BERT_BACKENDS, default='pytorch',
+                        help="Backend d'inférence BERT : pytorch (fp32), quantized (int8) ou onnx")
+    parser.add_argument('--bert-threads', type=int, default=None,
+                        help="Nombre de threads utilisés par l'inférence BERT")
+    parser.add_argument('--long-reviews', action='store_true',
+                        help="Analyser les avis longs en entier (fenêtres BERT) au lieu de les tronquer")
+    parser.add_argument('--prometheus', default=None,
+                        help="Fichier où écrire les mesures par étape au format Prometheus")
+    parser.add_argument('--profile', default=None, metavar='DIR',
+                        help="Profiler chaque étape avec cProfile et écrire les profils dans DIR")
+    parser.add_argument('--dedup', nargs='?', type=float, const=DEDUP_THRESHOLD, default=None, metavar='SEUIL',
+                        help=f"N'analyser qu'un avis par groupe de quasi-doublons (similarité >= SEUIL, "
+                             f"{DEDUP_THRESHOLD} par défaut)")
+    parser.add_argument('--domains', nargs='+', default=None, metavar='DOMAINE',
+                        help="Traiter plusieurs entreprises en parallèle (ex. www.teslamotors.com www.bmw.com)")
+    parser.add_argument('--parallel', type=int, default=DEFAULT_PARALLEL_COMPANIES,
+                        help="Nombre d'entreprises scrapées en même temps avec --domains")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reprendre l'exécution interrompue à partir des pages et chunks déjà enregistrés")
+    args = parser.parse_args()
+    if args.resume and (args.stream or args.domains):
+        parser.error("--resume n'est disponible ni avec --stream ni avec --domains")
+    configure_bert_backend(args.bert_backend, args.bert_threads)
+    if args.domains:
+        process_companies(args.domains, parallel=args.parallel, use_cache=not args.no_cache, workers=args.workers,
+                          storage_format=args.format, long_reviews=args.long_reviews, dedup_threshold=args.dedup,
+                          prometheus_path=args.prometheus, profile_dir=args.profile)
+    elif args.stream:
+        process_data_streaming(chunk_size=args.chunk_size, use_cache=not args.no_cache, workers=args.workers,
+                               storage_format=args.format, long_reviews=args.long_reviews,
+                               prometheus_path=args.prometheus, profile_dir=args.profile)
+    else:
+        process_data(use_cache=not args.no_cache, incremental=args.incremental, workers=args.workers,
+                     storage_format=args.format, long_reviews=args.long_reviews,
+                     prometheus_path=args.prometheus, profile_dir=args.profile, dedup_threshold=args.dedup,
+                     resume=args.resume)
@@ -0,0 +1,186 @@
+"""
+Service HTTP local d'analyse des sentiments : le modèle BERT reste chargé en
+mémoire et les requêtes concurrentes sont regroupées en micro-lots.
+
+Points d'accès :
+    POST /score   {"texts": ["...", ...]} ou {"text": "..."}
+                  -> {"results": [{textblob, textblob_label, vader, vader_label, bert_label, bert_prob}, ...]}
+    GET  /stats   latences (p50, p95, p99), tailles de lots, profondeur de la file
+    GET  /health
+
+Utilisation :
+    python scoring_service.py [--port 8502] [--max-batch-size 32] [--max-wait-ms 10]
+                              [--bert-backend quantized] [--bert-threads 4]
+"""
+import argparse
+import functools
+import json
+import logging
+import queue
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.clean_data import clean_text
+from utils.extract_sentiment import (
+    analyze_sentiment_bert_batch, analyze_sentiment_textblob, analyze_sentiment_vader, categorization_label,
+    configure_bert_backend, get_bert_analyzer, BERT_BACKENDS, BERT_BATCH_SIZE, BERT_MAX_LENGTH
+)
+from utils.micro_batcher import MicroBatcher, DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, DEFAULT_MAX_QUEUE
+
+# Configuration du logger
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8502
+
+# Délai maximal de réponse à une requête (s)
+REQUEST_TIMEOUT = 60
+
+# Nombre maximal de textes par requête
+MAX_TEXTS_PER_REQUEST = 256
+
+
+# Analyse un lot de textes avec les trois modèles, comme le pipeline (textes nettoyés puis analysés)
+def score_texts(texts, bert_batch_size=BERT_BATCH_SIZE, bert_max_length=BERT_MAX_LENGTH):
+    """
+    :param texts: Liste de textes bruts
+    :param bert_batch_size: Nombre maximal de textes par passe BERT (une requête isolée
+                            peut dépasser la taille des micro-lots)
+    :param bert_max_length: Longueur maximale en tokens pour BERT
+    :return: Liste de dictionnaires de scores et labels, dans l'ordre des textes
+    """
+    contents = [clean_text(text) for text in texts]
+    bert_results, _ = analyze_sentiment_bert_batch(
+        contents, batch_size=bert_batch_size, max_length=bert_max_length, quiet=True
+    )
+    results = []
+    for content, (bert_label, bert_prob) in zip(contents, bert_results):
+        textblob = analyze_sentiment_textblob(content)
+        vader = analyze_sentiment_vader(content)
+        results.append({
+            'textblob': textblob,
+            'textblob_label': categorization_label(textblob),
+            'vader': vader,
+            'vader_label': categorization_label(vader),
+            'bert_label': bert_label,
+            'bert_prob': bert_prob
+        })
+    return results
+
+
+# Textes d'une requête /score, ou message d'erreur
+def parse_score_request(body):
+    """
+    :param body: Corps de la requête (octets)
+    :return: Tuple (liste de textes, None) ou (None, message d'erreur)
+    """
+    try:
+        payload = json.loads(body or b'{}')
+    except (ValueError, UnicodeDecodeError):
+        return None, "corps JSON invalide"
+    if not isinstance(payload, dict):
+        return None, "objet JSON attendu"
+    texts = payload.get('texts', [payload['text']] if 'text' in payload else None)
+    if not isinstance(texts, list) or not texts or not all(isinstance(text, str) for text in texts):
+        return None, "champ 'text' (chaîne) ou 'texts' (liste de chaînes non vide) attendu"
+    if len(texts) > MAX_TEXTS_PER_REQUEST:
+        return None, f"au plus {MAX_TEXTS_PER_REQUEST} textes par requête"
+    return texts, None
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            self._send_json(200, self.server.batcher.stats_snapshot())
+        else:
+            self._send_json(404, {'error': 'ressource inconnue'})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.path != '/score':
+            self._send_json(404, {'error': 'ressource inconnue'})
+            return
+        texts, error = parse_score_request(body)
+        if error:
+            self._send_json(400, {'error': error})
+            return
+        try:
+            future = self.server.batcher.submit(texts)
+            results = future.result(timeout=REQUEST_TIMEOUT)
+        except queue.Full:
+            self._send_json(503, {'error': "file d'attente pleine"})
+        except FutureTimeoutError:
+            self._send_json(504, {'error': "délai d'analyse dépassé"})
+        except Exception as e:
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+        else:
+            self._send_json(200, {'results': results})
+
+    # Les requêtes sont comptées dans /stats : pas de ligne de journal par requête
+    def log_message(self, format, *args):
+        pass
+
+
+# Crée le serveur (sans le démarrer) autour d'une fonction d'analyse par lots
+def create_server(score_batch=score_texts, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                  max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS, max_queue=DEFAULT_MAX_QUEUE):
+    """
+    :param score_batch: Fonction liste de textes -> liste de résultats
+    :param port: Port d'écoute (0 : port libre choisi par le système)
+    :return: ThreadingHTTPServer ; server.batcher est le MicroBatcher associé
+    """
+    server = ThreadingHTTPServer((host, port), ScoringHandler)
+    server.daemon_threads = True
+    server.batcher = MicroBatcher(score_batch, max_batch_size, max_wait_ms, max_queue)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Adresse d'écoute")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port d'écoute")
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="Nombre maximal de textes par lot")
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="Attente maximale d'une requête avant le départ de son lot (ms)")
+    parser.add_argument('--max-queue', type=int, default=DEFAULT_MAX_QUEUE,
+                        help="Nombre maximal de requêtes en attente (au-delà : 503)")
+    parser.add_argument('--bert-backend', choices=BERT_BACKENDS, default='pytorch',
+                        help="Backend d'inférence BERT : pytorch (fp32), quantized (int8) ou onnx")
+    parser.add_argument('--bert-threads', type=int, default=None,
+                        help="Nombre de threads utilisés par l'inférence BERT")
+    args = parser.parse_args()
+
+    configure_bert_backend(args.bert_backend, args.bert_threads)
+    logger.info("Chargement du modèle BERT...")
+    get_bert_analyzer()
+
+    server = create_server(
+        functools.partial(score_texts, bert_batch_size=args.max_batch_size), host=args.host, port=args.port,
+        max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms, max_queue=args.max_queue
+    )
+    logger.info(f"Service d'analyse des sentiments à l'écoute sur http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.close()
+        logger.info("Service arrêté.")
+
+
+if __name__ == '__main__':
+    main()
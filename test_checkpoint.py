@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from utils.checkpoint import RunCheckpoint, analyze_sentiments_checkpointed
+from utils.scrape_data import scrape_trustpilot_reviews_resumable
+
+PARAMS = {"storage_format": "parquet", "models": "signature"}
+
+def crash_after(calls, side_effect):
+    """Exécute side_effect pour les `calls` premiers appels puis simule un arrêt brutal."""
+    state = {"calls": 0}
+    def wrapped(*args, **kwargs):
+        state["calls"] += 1
+        if state["calls"] > calls:
+            raise KeyboardInterrupt
+        return side_effect(*args, **kwargs)
+    return wrapped
+
+def test_resumed_scoring_only_analyzes_remaining_chunks(tmp_path, fake_analyze, patch_analyze):
+    df = pd.DataFrame({"Content": [f"review number {i}" for i in range(10)]})
+    checkpoint = RunCheckpoint(str(tmp_path), PARAMS)
+    checkpoint.start()
+    with patch_analyze("utils.checkpoint", side_effect=crash_after(2, fake_analyze)):
+        with pytest.raises(KeyboardInterrupt):
+            analyze_sentiments_checkpointed(df.copy(), checkpoint, chunk_size=3)
+
+    resumed = RunCheckpoint(str(tmp_path), PARAMS)
+    assert resumed.start(resume=True)
+    with patch_analyze("utils.checkpoint") as analyze:
+        result = analyze_sentiments_checkpointed(df.copy(), resumed, chunk_size=3)
+    assert analyze.call_count == 2
+    expected = fake_analyze(df.copy())
+    assert list(result['Sentiment_BERT_Label']) == list(expected['Sentiment_BERT_Label'])
+    assert list(result['Sentiment_TextBlob']) == list(expected['Sentiment_TextBlob'])
+
+def test_resumed_scraping_only_fetches_missing_pages(tmp_path):
+    def fetch(pages, *args, **kwargs):
+        return {page: f"page {page}" for page in pages}
+    def parse(content):
+        page = content.split()[1]
+        return [{"Username": f"user{page}", "Title": "t", "Content": f"content {page}", "Rating": "5", "Date": "2024-01-01"}]
+
+    checkpoint = RunCheckpoint(str(tmp_path), PARAMS)
+    checkpoint.start()
+    with patch("utils.scrape_data.parse_reviews_page", side_effect=parse), \
+         patch("utils.scrape_data.fetch_pages", side_effect=crash_after(1, fetch)):
+        with pytest.raises(KeyboardInterrupt):
+            scrape_trustpilot_reviews_resumable(checkpoint, num_pages=5, concurrency=2)
+
+    resumed = RunCheckpoint(str(tmp_path), PARAMS)
+    assert resumed.start(resume=True)
+    with patch("utils.scrape_data.parse_reviews_page", side_effect=parse), \
+         patch("utils.scrape_data.get_total_pages") as total_pages, \
+         patch("utils.scrape_data.fetch_pages", side_effect=fetch) as fetch_pages:
+        reviews = scrape_trustpilot_reviews_resumable(resumed, concurrency=2)
+    total_pages.assert_not_called()
+    assert [list(call.args[0]) for call in fetch_pages.call_args_list] == [[3, 4], [5]]
+    assert list(reviews["Username"]) == [f"user{page}" for page in range(1, 6)]
+
+def test_changed_parameters_start_from_scratch(tmp_path):
+    checkpoint = RunCheckpoint(str(tmp_path), PARAMS)
+    checkpoint.start()
+    checkpoint.complete("scrape")
+    other = RunCheckpoint(str(tmp_path), {**PARAMS, "models": "other"})
+    assert not other.start(resume=True)
+    assert not other.is_done("scrape")
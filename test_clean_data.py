@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.clean_data import clean_text, format_date, clean_text_series, format_date_series
+
+@pytest.fixture
+def raw_texts():
+    """Textes couvrant les cas limites du nettoyage."""
+    return pd.Series([
+        "Great car!!  Really   great 👍",
+        None,
+        np.nan,
+        "",
+        "!",
+        "a",
+        "L'équipe Tesla, très réactive.",
+        "x" * 511,
+        "x" * 513,
+        "  spaces\taround\n ",
+    ], dtype=object)
+
+@pytest.fixture
+def raw_dates():
+    """Dates valides, invalides et manquantes."""
+    return pd.Series([
+        "2024-03-28T10:15:30.000Z",
+        "2019-08-07T21:03:11.5Z",
+        "2024-13-01T00:00:00.000Z",
+        "2024-3-1T10:00:00.5Z",
+        "2024-03-28",
+        None,
+        np.nan,
+    ], dtype=object)
+
+def test_clean_text_series_matches_clean_text(raw_texts):
+    expected = raw_texts.apply(clean_text)
+    assert clean_text_series(raw_texts).tolist() == expected.tolist()
+
+def test_format_date_series_matches_format_date(raw_dates):
+    expected = raw_dates.apply(format_date)
+    result = format_date_series(raw_dates)
+    assert [None if pd.isnull(v) else v for v in result] == [None if pd.isnull(v) else v for v in expected]
+    assert result.dtype == expected.dtype
+
+def test_clean_text_without_truncation_keeps_long_reviews(raw_texts):
+    expected = raw_texts.apply(clean_text, truncate=False)
+    result = clean_text_series(raw_texts, truncate=False)
+    assert result.tolist() == expected.tolist()
+    assert len(result.iloc[8]) == 513
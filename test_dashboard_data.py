@@ -0,0 +1,61 @@
+import pandas as pd
+from utils.storage import load_frame
+from utils.dashboard_data import (
+    build_cube, filter_cube, compute_kpis, rating_distribution, sentiment_distribution,
+    monthly_trend, model_comparison, model_agreement, merge_agreement, agreement_matrix, AGREEMENT_PAIRS
+)
+
+COLUMNS = ["Date", "Rating", "Sentiment_BERT_Label", "Sentiment_TextBlob", "Sentiment_VADER"]
+
+def _load():
+    return load_frame("data/sentiments_analyze.csv", columns=COLUMNS)
+
+def test_kpis_match_raw_rows():
+    data = _load()
+    total, avg_rating, dominant = compute_kpis(build_cube(data))
+    assert total == len(data)
+    assert avg_rating == round(data['Rating'].mean(), 2)
+    assert dominant == data['Sentiment_BERT_Label'].astype(str).mode()[0]
+
+def test_filtered_aggregates_match_raw_rows():
+    data = _load()
+    cube = build_cube(data)
+    start, end = data['Date'].min().date(), data['Date'].max().date()
+    labels, ratings = ['positif', 'négatif'], (2, 5)
+    filtered = data[
+        (data['Date'] >= pd.Timestamp(start)) &
+        (data['Date'] <= pd.Timestamp(end) + pd.Timedelta(days=1) - pd.Timedelta(1)) &
+        (data['Sentiment_BERT_Label'].isin(labels)) &
+        (data['Rating'].between(*ratings))
+    ]
+    sub = filter_cube(cube, start, end, labels, ratings)
+    assert rating_distribution(sub).to_dict() == filtered['Rating'].value_counts().to_dict()
+    assert sentiment_distribution(sub).to_dict() == filtered['Sentiment_BERT_Label'].astype(str).value_counts().to_dict()
+    expected_trend = filtered.groupby(filtered['Date'].dt.to_period('M'))['Rating'].mean()
+    assert (monthly_trend(sub) - expected_trend).abs().max() < 1e-9
+    comparison = model_comparison(sub).set_index("Modèle")
+    assert comparison.loc["TextBlob", "Positif"] == (filtered['Sentiment_TextBlob'] > 0).sum()
+    assert comparison.loc["VADER", "Négatif"] == (filtered['Sentiment_VADER'] < 0).sum()
+
+def test_model_agreement_matches_crosstab():
+    data = load_frame("data/sentiments_analyze.csv")
+    agreement = model_agreement(data)
+    rating_labels = data['Rating'].map(dict(zip(range(1, 6), agreement_matrix(agreement, 'Note', 'BERT').index)))
+    columns = {'Note': rating_labels, 'BERT': data['Sentiment_BERT_Label'].astype(str),
+               'TextBlob': data['Sentiment_TextBlob_label'].astype(str), 'VADER': data['Sentiment_VADER_label'].astype(str)}
+    for reference, compared in AGREEMENT_PAIRS:
+        matrix = agreement_matrix(agreement, reference, compared)
+        expected = pd.crosstab(columns[reference], columns[compared]).reindex(
+            index=matrix.index, columns=matrix.columns, fill_value=0
+        )
+        assert (matrix.to_numpy() == expected.to_numpy()).all()
+        assert matrix.to_numpy().sum() == len(data)
+
+def test_model_agreement_is_additive_across_chunks():
+    data = load_frame("data/sentiments_analyze.csv")
+    merged = merge_agreement(model_agreement(data.iloc[start:start + 300]) for start in range(0, len(data), 300))
+    whole = model_agreement(data)
+    for reference, compared in AGREEMENT_PAIRS:
+        assert agreement_matrix(merged, reference, compared, include_null=True).equals(
+            agreement_matrix(whole, reference, compared, include_null=True)
+        )
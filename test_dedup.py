@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from utils.dedup import find_near_duplicates, analyze_sentiments_deduplicated, lsh_bands
+
+BASE = ("the delivery took three months and nobody at the service centre answered the phone "
+        "when the car finally arrived the paint was damaged and the app would not pair")
+
+def test_exact_and_near_duplicates_share_a_representative():
+    texts = [BASE, "great car love it", BASE, BASE.replace("three", "four"), "terrible support never again"]
+    representative = find_near_duplicates(texts, threshold=0.5)
+    assert list(representative) == [0, 1, 0, 0, 4]
+
+def test_threshold_one_only_groups_exact_duplicates():
+    texts = [BASE, BASE.replace("three", "four"), BASE]
+    assert list(find_near_duplicates(texts, threshold=1.0)) == [0, 1, 0]
+
+def test_lsh_bands_cover_all_permutations():
+    bands, rows = lsh_bands(0.9, 128)
+    assert bands * rows == 128
+
+def test_scores_are_fanned_out_to_duplicates(patch_analyze):
+    df = pd.DataFrame({"Content": ["a b c d", "x y z", "a b c d", "x y z", "a b c d"]})
+    with patch_analyze("utils.dedup") as analyze:
+        result = analyze_sentiments_deduplicated(df, threshold=1.0)
+    assert len(analyze.call_args[0][0]) == 2
+    assert list(result['Sentiment_BERT_Label']) == list(df['Content'])
+    assert result.attrs['dedup']['n_scored'] == 2
+    assert np.isclose(result.attrs['dedup']['inference_saved'], 0.6)
@@ -0,0 +1,114 @@
+import contextlib
+import os
+import types
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from utils.extract_sentiment import (
+    analyze_sentiment_textblob, analyze_sentiment_vader, score_lexical_parallel, analyze_sentiment_bert_chunked,
+    onnx_export_dir, ONNX_EXPORT_DIR
+)
+
+@pytest.fixture
+def contents():
+    """Avis nettoyés versionnés ; le premier lot est allongé pour terminer après les suivants."""
+    contents = pd.read_csv("data/clean_data.csv")["Content"].dropna().astype(str).head(60).tolist()
+    return [text * 40 for text in contents[:5]] + contents[5:]
+
+def test_parallel_lexical_scores_match_serial_order(contents):
+    textblob, vader = score_lexical_parallel(contents, workers=2, chunk_size=5)
+    assert textblob == [analyze_sentiment_textblob(text) for text in contents]
+    assert vader == [analyze_sentiment_vader(text) for text in contents]
+
+
+class FakeTensor:
+    """Tenseur minimal adossé à numpy (torch n'est pas nécessaire pour ces tests)."""
+    def __init__(self, array):
+        self.array = np.asarray(array)
+    def to(self, device):
+        return self
+    def cpu(self):
+        return self
+    def numpy(self):
+        return self.array
+
+def fake_softmax(tensor, dim=-1):
+    exp = np.exp(tensor.array - tensor.array.max(axis=dim, keepdims=True))
+    return FakeTensor(exp / exp.sum(axis=dim, keepdims=True))
+
+FAKE_TORCH = types.SimpleNamespace(no_grad=contextlib.nullcontext, softmax=fake_softmax)
+TOKEN_IDS = {"bad": 1, "good": 2}
+
+class FakeTokenizer:
+    """Un mot = un token ; fenêtres de max_length tokens chevauchantes de stride tokens."""
+    def __call__(self, texts, truncation, max_length, stride, return_overflowing_tokens):
+        windows, owners = [], []
+        for owner, text in enumerate(texts):
+            ids = [TOKEN_IDS.get(word, 3) for word in text.split()]
+            start = 0
+            while True:
+                windows.append(ids[start:start + max_length])
+                owners.append(owner)
+                if start + max_length >= len(ids):
+                    break
+                start += max_length - stride
+        return {"input_ids": windows, "overflow_to_sample_mapping": owners}
+
+    def pad(self, encoded, return_tensors):
+        width = max(len(ids) for ids in encoded["input_ids"])
+        return {"input_ids": FakeTensor([ids + [0] * (width - len(ids)) for ids in encoded["input_ids"]])}
+
+class FakeModel:
+    """Logits : « bad » pousse vers 1 étoile, « good » vers 5 étoiles ; garde les fenêtres reçues."""
+    config = types.SimpleNamespace(num_labels=5, id2label={i: f"{i + 1} star{'s' if i else ''}" for i in range(5)})
+    device = "cpu"
+
+    def __init__(self):
+        self.windows = []
+
+    def __call__(self, input_ids):
+        rows = [row[row > 0] for row in input_ids.array]
+        self.windows.extend(row.tolist() for row in rows)
+        logits = np.zeros((len(rows), 5))
+        for logit, row in zip(logits, rows):
+            logit[0], logit[4] = 2.0 * (row == 1).mean(), 2.0 * (row == 2).mean()
+        return types.SimpleNamespace(logits=FakeTensor(logits))
+
+@pytest.fixture
+def fake_bert():
+    model = FakeModel()
+    analyzer = types.SimpleNamespace(tokenizer=FakeTokenizer(), model=model)
+    with patch.dict("sys.modules", {"torch": FAKE_TORCH}), \
+         patch("utils.extract_sentiment.get_bert_analyzer", return_value=analyzer):
+        yield model
+
+def test_long_reviews_are_split_into_overlapping_windows(fake_bert):
+    # Début négatif (seule partie vue avec la troncature), puis une longue suite positive
+    ids = [1] * 10 + [2] * 30
+    long_text = " ".join(["bad"] * 10 + ["good"] * 30)
+    results, report = analyze_sentiment_bert_chunked(["good car", long_text], batch_size=2, max_length=16, stride=4)
+    windows = [ids[0:16], ids[12:28], ids[24:40]]
+    assert report["n_windows"] == 1 + len(windows)
+    assert sorted(fake_bert.windows) == sorted(windows + [[2, 3]])
+
+    # Moyenne des probabilités des fenêtres, pondérée par leur nombre de tokens
+    probs = [fake_softmax(FakeTensor([[2.0 * np.mean(np.array(w) == 1), 0, 0, 0, 2.0 * np.mean(np.array(w) == 2)]]))
+             .array[0] * len(w) for w in windows]
+    expected = np.sum(probs, axis=0) / sum(len(w) for w in windows)
+    assert fake_softmax(FakeTensor([[2.0 * 10 / 16, 0, 0, 0, 2.0 * 6 / 16]])).array[0].argmax() == 0
+    assert results[1] == ("très positif", round(float(expected[4]) * 100, 2))
+
+def test_short_reviews_use_a_single_window(fake_bert):
+    results, report = analyze_sentiment_bert_chunked(["bad service", "good car"], max_length=16, stride=4)
+    assert report["n_windows"] == 2
+    assert [label for label, _ in results] == ["très négatif", "très positif"]
+    # Une seule fenêtre : probabilité de cette fenêtre, sans agrégation
+    assert results[1][1] == round(float(fake_softmax(FakeTensor([[0, 0, 0, 0, 1.0]])).array[0, 4]) * 100, 2)
+
+def test_onnx_export_dir_depends_on_model_and_revision():
+    default = onnx_export_dir()
+    assert onnx_export_dir("nlptown/other-model") != default
+    assert onnx_export_dir(revision="0123abc") != default
+    # Le nom du modèle ("org/modèle") ne crée pas de sous-répertoire supplémentaire
+    assert os.path.dirname(default) == ONNX_EXPORT_DIR
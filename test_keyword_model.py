@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from utils.keyword_model import KeywordModel, extract_keywords_incremental
+
+@pytest.fixture
+def contents():
+    """Contenus nettoyés versionnés dans le dépôt, avec quelques doublons."""
+    contents = pd.read_csv("data/clean_data.csv")["Content"].dropna().astype(str).tolist()
+    return contents + contents[:20]
+
+def assert_matches_sklearn(matrix, terms, contents, n_keywords):
+    vectorizer = TfidfVectorizer(stop_words="english", max_features=n_keywords)
+    expected = vectorizer.fit_transform(contents)
+    assert terms == list(vectorizer.get_feature_names_out())
+    assert np.allclose(matrix.toarray(), expected.toarray())
+
+@pytest.mark.parametrize("n_keywords", [10, 50, 2000, None])
+def test_full_rebuild_matches_tfidf_vectorizer(contents, n_keywords):
+    model = KeywordModel()
+    model.update(contents)
+    matrix, terms = model.transform(contents, n_keywords)
+    assert_matches_sklearn(matrix, terms, contents, n_keywords)
+
+def test_incremental_updates_match_full_rebuild(tmp_path, contents):
+    path = str(tmp_path / "keyword_model.npz")
+    first, current = contents[:300], contents[100:]
+    extract_keywords_incremental(pd.DataFrame({"Content": first}), path)
+
+    model = KeywordModel.load(path)
+    assert model.update(current) == len(set(contents[300:]) - set(first))
+    matrix, terms = model.transform(current)
+    assert_matches_sklearn(matrix, terms, current, 10)
+    assert len(model.keys) == len(set(current))
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from utils.keywords_io import save_keywords_npz, load_keywords, keyword_aggregates, keyword_means
+
+def test_npz_round_trip(tmp_path):
+    matrix = sparse.csr_matrix(np.array([[0.0, 0.6, 0.8], [1.0, 0.0, 0.0]]))
+    path = str(tmp_path / "keywords.npz")
+    save_keywords_npz(path, matrix, ["car", "service", "tesla"])
+    loaded, terms = load_keywords(path)
+    assert sparse.issparse(loaded)
+    assert terms == ["car", "service", "tesla"]
+    assert (loaded != matrix).nnz == 0
+
+def test_aggregates_match_dense_computation():
+    dense = pd.read_csv("data/keywords_data.csv")
+    matrix, terms = load_keywords("data/keywords_data.csv")
+    means = keyword_means(matrix, terms)
+    expected = dense.mean().sort_values(ascending=False)
+    assert list(means.index) == list(expected.index)
+    assert np.allclose(means.values, expected.values)
+    aggregates = keyword_aggregates(matrix, terms)
+    assert aggregates.loc["car", "n_reviews"] == (dense["car"] > 0).sum()
@@ -0,0 +1,35 @@
+import json
+import pytest
+from utils.metrics import RunMetrics, measure
+
+def test_stages_are_accumulated_per_name():
+    metrics = RunMetrics()
+    for rows in (10, 5):
+        with metrics.stage('clean', rows_in=rows) as record:
+            record['rows_out'] = rows - 1
+    with measure(metrics, 'keywords'):
+        pass
+    report = metrics.report()
+    clean = report['stages'][0]
+    assert report['status'] == 'success'
+    assert (clean['stage'], clean['calls'], clean['rows_in'], clean['rows_out']) == ('clean', 2, 15, 13)
+    assert clean['wall_sec'] >= 0 and clean['cpu_sec'] >= 0
+    assert [stage['stage'] for stage in report['stages']] == ['clean', 'keywords']
+
+def test_failed_stage_is_recorded_and_reported(tmp_path):
+    metrics = RunMetrics(profile_dir=str(tmp_path / "profiles"))
+    with pytest.raises(ValueError):
+        with metrics.stage('scrape'):
+            raise ValueError("boom")
+    metrics.fail(ValueError("boom"))
+    metrics.save(str(tmp_path / "report.json"), str(tmp_path / "metrics.prom"))
+    report = json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))
+    assert report['status'] == 'failed' and report['error'] == "ValueError: boom"
+    prometheus = (tmp_path / "metrics.prom").read_text(encoding="utf-8")
+    assert 'trustpilot_pipeline_stage_wall_seconds{stage="scrape"}' in prometheus
+    assert 'trustpilot_pipeline_run_success 0' in prometheus
+    assert (tmp_path / "profiles" / "scrape.prof").exists()
+
+def test_measure_without_metrics_is_a_no_op():
+    with measure(None, 'clean', rows_in=3) as record:
+        record['rows_out'] = 3
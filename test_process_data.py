@@ -12,7 +12,11 @@ sentiments_analyze_data = pd.read_csv(sentiments_analyze_path)
 tesla_reviews_data = pd.read_csv(tesla_reviews_path)
 
 # Mock des fonctions dans process_data.py
+import process_data
 from process_data import save_dataframe
+from utils.review_store import ReviewStore
+from utils.scrape_data import REVIEW_COLUMNS
+from utils.keywords_io import load_keywords
 
 # Fonction pour tester save_dataframe
 def test_save_dataframe():
@@ -36,3 +40,25 @@ def test_save_dataframe():
         mock_logger.info.assert_called_once_with("Fichier sauvegardé : mock_path.csv")
 
 test_save_dataframe()
+
+def fake_bert_batch(texts, batch_size=None, max_length=None):
+    return [("neutre", 50.0) for _ in texts], {}
+
+# Traitement en flux complet, sans réseau ni modèle BERT
+def test_process_data_streaming_writes_outputs(tmp_path):
+    reviews = tesla_reviews_data[REVIEW_COLUMNS].head(120).to_dict("records")
+    pages = [(page + 1, reviews[start:start + 20]) for page, start in enumerate(range(0, len(reviews), 20))]
+    with patch("process_data.DATA_DIR", str(tmp_path)), \
+         patch("process_data.iter_review_pages", return_value=iter(pages)), \
+         patch("utils.extract_sentiment.analyze_sentiment_bert_batch", side_effect=fake_bert_batch):
+        process_data.process_data_streaming(chunk_size=50, use_cache=False, storage_format="csv")
+
+    analyzed = pd.read_csv(tmp_path / "sentiments_analyze.csv")
+    keywords_matrix, _ = load_keywords(str(tmp_path / "keywords_data.npz"))
+    assert keywords_matrix.shape[0] == len(analyzed)
+    validation = pd.read_csv(tmp_path / "echantillon_validation_test.csv")
+    assert len(analyzed) == len(pd.read_csv(tmp_path / "clean_data.csv")) + len(validation)
+    assert (analyzed["Sentiment_BERT_Label"] == "neutre").all()
+    assert analyzed["Sentiment_TextBlob"].notna().all()
+    store = ReviewStore(str(tmp_path / process_data.REVIEW_STORE_DIR))
+    assert store.cube()["n_reviews"].sum() == analyzed["Date"].notna().sum()
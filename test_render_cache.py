@@ -0,0 +1,37 @@
+import os
+from utils.render_cache import RenderCache, render_key
+
+def test_key_depends_on_frequencies_and_params():
+    base = render_key({"car": 0.5, "service": 0.25}, width=800)
+    assert base == render_key({"service": 0.25, "car": 0.5}, width=800)
+    assert base != render_key({"car": 0.5, "service": 0.26}, width=800)
+    assert base != render_key({"car": 0.5, "service": 0.25}, width=400)
+
+def test_lru_renders_once_and_evicts_oldest():
+    cache = RenderCache(max_entries=2)
+    calls = []
+    def render(name):
+        calls.append(name)
+        return name.encode()
+    assert cache.get_or_render("a", lambda: render("a")) == b"a"
+    assert cache.get_or_render("a", lambda: render("a")) == b"a"
+    cache.get_or_render("b", lambda: render("b"))
+    cache.get_or_render("c", lambda: render("c"))
+    assert calls == ["a", "b", "c"]
+    assert cache.get("a") is None
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 3)
+
+def test_disk_cache_survives_restart(tmp_path):
+    RenderCache(directory=str(tmp_path)).put("k", b"png-bytes")
+    fresh = RenderCache(directory=str(tmp_path))
+    assert fresh.get_or_render("k", lambda: b"rendered") == b"png-bytes"
+    assert fresh.hits == 1
+
+def test_disk_cache_is_bounded_and_keeps_recently_read_files(tmp_path):
+    cache = RenderCache(max_entries=2, directory=str(tmp_path))
+    cache.put("a", b"a")
+    cache.put("b", b"b")
+    assert RenderCache(directory=str(tmp_path)).get("a") == b"a"
+    cache.put("c", b"c")
+    assert sorted(os.listdir(tmp_path)) == ["a.png", "c.png"]
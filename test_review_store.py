@@ -0,0 +1,59 @@
+import os
+import shutil
+import pandas as pd
+import pytest
+from utils.dashboard_data import build_cube, filter_cube, rating_distribution, monthly_trend
+from utils.review_store import ReviewStore
+from utils.storage import load_frame
+
+@pytest.fixture
+def analyzed():
+    """Avis analysés versionnés dans le dépôt."""
+    return load_frame("data/sentiments_analyze.csv")
+
+@pytest.fixture
+def store(tmp_path, analyzed):
+    store = ReviewStore(str(tmp_path / "reviews_store"))
+    store.write(analyzed)
+    return store
+
+def test_query_matches_raw_rows(store, analyzed):
+    months = store.months()
+    start, end = pd.Timestamp(months[1]).date(), pd.Timestamp(months[-2]).date() + pd.Timedelta(days=3)
+    labels, ratings = ["positif", "très négatif"], (1, 4)
+    expected = analyzed[
+        (analyzed["Date"] >= pd.Timestamp(start)) &
+        (analyzed["Date"] < pd.Timestamp(end) + pd.Timedelta(days=1)) &
+        (analyzed["Sentiment_BERT_Label"].isin(labels)) &
+        (analyzed["Rating"].between(*ratings))
+    ]
+    result = store.query(start, end, labels, ratings, columns=["Date", "Content"])
+    assert sorted(result["Content"].fillna("")) == sorted(expected["Content"].fillna(""))
+    assert result["Date"].is_monotonic_increasing
+
+def test_query_only_reads_overlapping_partitions(store):
+    months = store.months()
+    shutil.rmtree(os.path.join(store.directory, months[0]))
+    result = store.query(pd.Timestamp(months[-1]).date(), None, columns=["Date"])
+    assert result["Date"].dt.strftime("%Y-%m").eq(months[-1]).all()
+    with pytest.raises(OSError):
+        store.query(None, store.partitions[months[0]]["max_date"])
+
+def test_cube_and_rewrites(store, analyzed):
+    cube = store.cube()
+    expected = build_cube(analyzed)
+    start, end = analyzed["Date"].min(), analyzed["Date"].max()
+    sub, expected_sub = filter_cube(cube, start, end, ["positif"], (3, 5)), filter_cube(expected, start, end, ["positif"], (3, 5))
+    assert rating_distribution(sub).to_dict() == rating_distribution(expected_sub).to_dict()
+    assert (monthly_trend(cube) - monthly_trend(expected)).abs().max() < 1e-9
+    assert store.write(analyzed) == 0
+    latest = store.months()[-1]
+    assert store.write(analyzed[analyzed["Date"].dt.strftime("%Y-%m") != latest]) == 0
+    assert latest not in ReviewStore(store.directory).months()
+
+def test_append_by_chunks_matches_full_write(tmp_path, store, analyzed):
+    appended = ReviewStore(str(tmp_path / "appended"))
+    for start in range(0, len(analyzed), 400):
+        appended.append(analyzed.iloc[start:start + 400])
+    assert appended.partitions == store.partitions
+    assert appended.cube().equals(store.cube())
@@ -0,0 +1,71 @@
+import threading
+import time
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from utils.scheduler import run_companies
+from utils.scrape_data import REVIEW_COLUMNS
+
+REQUESTS_PER_COMPANY = 8
+
+@pytest.fixture
+def reviews():
+    """Avis bruts versionnés dans le dépôt."""
+    return pd.read_csv("data/Tesla_Trustpilot_Reviews.csv")[REVIEW_COLUMNS].head(30)
+
+def fake_scraper(reviews, requests, failing=()):
+    """Scraper factice : une requête (jeton) par page, horodatée par domaine."""
+    lock = threading.Lock()
+    def scrape(num_pages, base_url, concurrency, rate, bucket):
+        if any(domain in base_url for domain in failing):
+            raise ConnectionError("Trustpilot indisponible")
+        for _ in range(REQUESTS_PER_COMPANY):
+            bucket.acquire()
+            with lock:
+                requests.append((base_url, time.monotonic()))
+        return reviews.copy()
+    return scrape
+
+def run(tmp_path, reviews, domains, requests, failing=(), **kwargs):
+    with patch("utils.scheduler.scrape_trustpilot_reviews", side_effect=fake_scraper(reviews, requests, failing)):
+        return run_companies(domains, str(tmp_path), storage_format="csv", use_cache=False, **kwargs)
+
+def test_company_buckets_respect_the_global_rate(tmp_path, reviews, patch_analyze):
+    requests = []
+    domains = ["a.com", "b.com", "c.com"]
+    with patch_analyze("utils.scheduler"):
+        start = time.monotonic()
+        run(tmp_path, reviews, domains, requests, parallel=3, rate=1000, total_rate=40)
+    # Seau global : 3 jetons de rafale, puis 40 requêtes/s pour toutes les entreprises
+    assert len(requests) == 3 * REQUESTS_PER_COMPANY
+    assert max(t for _, t in requests) - start >= (len(requests) - 3) / 40 * 0.9
+
+def test_company_bucket_limits_each_company(tmp_path, reviews, patch_analyze):
+    requests = []
+    with patch_analyze("utils.scheduler"):
+        run(tmp_path, reviews, ["a.com", "b.com"], requests, parallel=2, rate=20, total_rate=1000)
+    for domain in ("a.com", "b.com"):
+        times = [t for url, t in requests if domain in url]
+        # Seau de l'entreprise : 2 jetons de rafale, puis 20 requêtes/s
+        assert times[-1] - times[0] >= (REQUESTS_PER_COMPANY - 2) / 20 * 0.9
+
+def test_one_company_failure_does_not_abort_the_others(tmp_path, reviews, patch_analyze):
+    requests = []
+    with patch_analyze("utils.scheduler"):
+        summary = run(tmp_path, reviews, ["a.com", "down.com", "c.com"], requests, failing=["down.com"],
+                      parallel=3, rate=1000, total_rate=1000)
+    assert summary["down.com"]["status"] == "failed"
+    assert "ConnectionError" in summary["down.com"]["error"]
+    for domain in ("a.com", "c.com"):
+        assert summary[domain]["status"] == "success"
+        assert (tmp_path / "companies" / domain / "sentiments_analyze.csv").exists()
+
+def test_elapsed_time_excludes_queue_time(tmp_path, reviews, patch_analyze):
+    requests = []
+    domains = ["a.com", "b.com", "c.com"]
+    with patch_analyze("utils.scheduler"):
+        start = time.monotonic()
+        summary = run(tmp_path, reviews, domains, requests, parallel=1, rate=20, total_rate=1000)
+        total = time.monotonic() - start
+    # Un seul thread : chaque entreprise attend les précédentes, sans que cela compte dans sa durée
+    assert max(summary[domain]["elapsed_sec"] for domain in domains) < total * 0.6
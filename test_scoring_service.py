@@ -0,0 +1,109 @@
+import json
+import queue
+import threading
+import time
+from unittest.mock import patch
+import pytest
+import requests
+from scoring_service import create_server, score_texts
+from utils.micro_batcher import MicroBatcher
+
+def fake_score(texts):
+    time.sleep(0.02)
+    return [{"bert_label": text.upper(), "batch": len(texts)} for text in texts]
+
+def test_concurrent_requests_share_batches_and_keep_order():
+    batcher = MicroBatcher(fake_score, max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit([f"a{i}", f"b{i}"]) for i in range(10)]
+    results = [future.result(timeout=5) for future in futures]
+    batcher.close()
+    assert [[r["bert_label"] for r in result] for result in results] == [[f"A{i}", f"B{i}"] for i in range(10)]
+    assert max(r["batch"] for result in results for r in result) == 8
+    stats = batcher.stats_snapshot()
+    assert stats["requests"] == 10 and stats["texts"] == 20 and stats["batches"] < 10
+
+def test_backlog_is_drained_after_max_wait():
+    def slow_score(texts):
+        time.sleep(0.1)
+        return texts
+    batcher = MicroBatcher(slow_score, max_batch_size=32, max_wait_ms=1)
+    first = batcher.submit(["premier"])
+    time.sleep(0.02)
+    futures = [batcher.submit([f"t{i}"]) for i in range(9)]
+    first.result(timeout=5)
+    assert [future.result(timeout=5) for future in futures] == [[f"t{i}"] for i in range(9)]
+    batcher.close()
+    assert batcher.stats_snapshot()["batches"] == 2
+
+def test_lone_request_leaves_after_max_wait():
+    batcher = MicroBatcher(fake_score, max_batch_size=32, max_wait_ms=30)
+    start = time.perf_counter()
+    batcher.submit(["seul"]).result(timeout=5)
+    elapsed = time.perf_counter() - start
+    batcher.close()
+    assert 0.03 <= elapsed < 1
+
+def test_http_endpoints():
+    server = create_server(fake_score, port=0, max_wait_ms=5)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        response = requests.post(url + "/score", json={"texts": ["bon", "mauvais"]}, timeout=5)
+        assert [r["bert_label"] for r in response.json()["results"]] == ["BON", "MAUVAIS"]
+        assert requests.post(url + "/score", json={"text": "seul"}, timeout=5).json()["results"][0]["bert_label"] == "SEUL"
+        assert requests.post(url + "/score", data=b"{", timeout=5).status_code == 400
+        assert requests.post(url + "/score", data=json.dumps({"texts": []}), timeout=5).status_code == 400
+        stats = requests.get(url + "/stats", timeout=5).json()
+        assert stats["requests"] == 2 and stats["latency_ms"]["p50"] > 0
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.batcher.close()
+
+def test_batches_never_exceed_max_batch_size():
+    sizes = []
+    def record_score(texts):
+        sizes.append(len(texts))
+        time.sleep(0.02)
+        return texts
+    batcher = MicroBatcher(record_score, max_batch_size=32, max_wait_ms=50)
+    blocker = batcher.submit(["bloque"])
+    futures = [batcher.submit([f"a{i}" for i in range(31)]), batcher.submit([f"b{i}" for i in range(20)]),
+               batcher.submit([f"c{i}" for i in range(40)])]
+    results = [future.result(timeout=5) for future in [blocker] + futures]
+    batcher.close()
+    assert results[2] == [f"b{i}" for i in range(20)]
+    assert sizes == [32, 20, 40]
+
+def test_full_queue_is_rejected_with_503():
+    release = threading.Event()
+    def blocked_score(texts):
+        release.wait(5)
+        return texts
+    server = create_server(blocked_score, port=0, max_wait_ms=1, max_queue=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        server.batcher.submit(["en cours"])
+        time.sleep(0.05)
+        server.batcher.submit(["en attente"])
+        with pytest.raises(queue.Full):
+            server.batcher.submit(["refusé"])
+        assert requests.post(url + "/score", json={"text": "refusé"}, timeout=5).status_code == 503
+        assert server.batcher.stats_snapshot()["rejected"] == 2
+    finally:
+        release.set()
+        server.shutdown()
+        server.server_close()
+        server.batcher.close()
+
+def test_score_texts_bounds_bert_batches_and_stays_quiet():
+    def fake_bert(texts, batch_size, max_length, quiet):
+        assert batch_size == 8 and quiet
+        return [("positif", 90.0) for _ in texts], {}
+    with patch("scoring_service.analyze_sentiment_bert_batch", side_effect=fake_bert) as bert:
+        results = score_texts(["Great car, love it!"] * 20 + ["   "], bert_batch_size=8)
+    assert bert.call_count == 1
+    assert [r["bert_label"] for r in results] == ["positif"] * 21
+    assert results[0]["textblob"] > 0 and results[0]["textblob_label"] != "Null"
+    assert results[0]["vader_label"] == "très positif"
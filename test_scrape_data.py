@@ -0,0 +1,118 @@
+import os
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import pytest
+from utils import scrape_data
+
+FIXTURES_DIR = os.path.join("data", "fixtures")
+
+def read_fixture(page):
+    with open(os.path.join(FIXTURES_DIR, f"trustpilot_page_{page}.html"), "rb") as f:
+        return f.read()
+
+
+class RecordedPagesHandler(BaseHTTPRequestHandler):
+    """Sert les pages enregistrées ; la page 2 répond une fois 429 avant de réussir."""
+    throttled = set()
+    requested = []
+
+    def do_GET(self):
+        page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+        self.requested.append(page)
+        if page == 2 and page not in self.throttled:
+            self.throttled.add(page)
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        path = os.path.join(FIXTURES_DIR, f"trustpilot_page_{page}.html")
+        if not os.path.exists(path):
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = read_fixture(page)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    """Serveur HTTP local servant les pages enregistrées."""
+    RecordedPagesHandler.throttled = set()
+    RecordedPagesHandler.requested = []
+    server = HTTPServer(("127.0.0.1", 0), RecordedPagesHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/review/www.teslamotors.com?page="
+    server.shutdown()
+
+
+def test_parse_reviews_page():
+    reviews = scrape_data.parse_reviews_page(read_fixture(1))
+    assert len(reviews) == 4
+    assert reviews[0]["Username"] == "Jonathan Birge"
+    assert reviews[0]["Rating"] == "1"
+    assert reviews[0]["Date"].startswith("2024-03-28")
+
+
+def test_next_data_and_markup_paths_agree():
+    for page in (1, 2, 3):
+        html = read_fixture(page)
+        assert scrape_data.parse_reviews_page(html) == scrape_data.parse_reviews_markup(html)
+
+
+def test_parse_falls_back_to_markup_without_next_data():
+    html = read_fixture(1)
+    without_json = scrape_data.NEXT_DATA_PATTERN.sub(b"", html)
+    assert scrape_data.extract_next_data(without_json) is None
+    assert scrape_data.parse_reviews_page(without_json) == scrape_data.parse_reviews_page(html)
+
+
+def test_concurrent_scrape_is_page_ordered(local_server):
+    data = scrape_data.scrape_trustpilot_reviews(num_pages=3, base_url=local_server, concurrency=3, rate=50)
+    expected = []
+    for page in (1, 2, 3):
+        expected.extend(r["Username"] for r in scrape_data.parse_reviews_page(read_fixture(page)))
+    assert list(data["Username"]) == expected
+    assert list(data.columns) == ["Username", "Title", "Content", "Rating", "Date"]
+
+
+def test_total_pages_discovered_on_first_scrape(local_server):
+    data = scrape_data.scrape_trustpilot_reviews(base_url=local_server, concurrency=3, rate=50)
+    assert scrape_data.get_total_pages(local_server + "1") == 3
+    assert len(data) == 12
+    # La page 1 lue pour connaître le nombre de pages n'est pas téléchargée une seconde fois
+    assert RecordedPagesHandler.requested.count(1) == 1
+
+
+def test_fetch_page_gives_up_on_missing_page(local_server):
+    session = scrape_data.create_session(1)
+    bucket = scrape_data.TokenBucket(rate=50)
+    assert scrape_data.fetch_page(session, local_server + "99", bucket) is None
+
+
+def test_incremental_scrape_stops_at_known_reviews(local_server):
+    import pandas as pd
+    known = pd.DataFrame(scrape_data.parse_reviews_page(read_fixture(2)))
+    state = scrape_data.state_from_reviews(known)
+    new_reviews, new_state = scrape_data.scrape_trustpilot_reviews_incremental(
+        state, num_pages=3, base_url=local_server, concurrency=1, rate=50
+    )
+    assert list(new_reviews["Username"]) == [r["Username"] for r in scrape_data.parse_reviews_page(read_fixture(1))]
+    assert new_state["newest_date"] == new_reviews["Date"].max()
+
+
+def test_merge_reviews_skips_duplicates():
+    import pandas as pd
+    stored = pd.DataFrame(scrape_data.parse_reviews_page(read_fixture(2)))
+    new_reviews = pd.DataFrame(scrape_data.parse_reviews_page(read_fixture(1)) + scrape_data.parse_reviews_page(read_fixture(2))[:1])
+    merged = scrape_data.merge_reviews(stored, new_reviews)
+    assert len(merged) == 8
+    assert merged["Username"].iloc[0] == "Jonathan Birge"
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from utils.extract_sentiment import analyze_sentiments, SCORE_COLUMNS
+from utils.sentiment_cache import SentimentCache
+
+@pytest.fixture
+def cache_path(tmp_path):
+    """Chemin d'un cache SQLite temporaire."""
+    return str(tmp_path / "cache.sqlite")
+
+def test_hits_and_misses(cache_path):
+    with SentimentCache(cache_path, "sig-v1") as cache:
+        key = cache.key("Great car")
+        assert cache.get_many([key]) == {}
+        cache.put_many([(key, (0.8, 0.6, "très positif", 87.5))])
+        assert cache.get_many([key, cache.key("Bad service")]) == {key: (0.8, 0.6, "très positif", 87.5)}
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 1)
+
+def test_cache_persists_between_runs(cache_path):
+    with SentimentCache(cache_path, "sig-v1") as cache:
+        cache.put_many([(cache.key("Great car"), (0.8, 0.6, "très positif", 87.5))])
+    with SentimentCache(cache_path, "sig-v1") as cache:
+        assert len(cache.get_many([cache.key("Great car")])) == 1
+
+def test_signature_change_invalidates(cache_path):
+    with SentimentCache(cache_path, "sig-v1") as cache:
+        cache.put_many([(cache.key("Great car"), (0.8, 0.6, "très positif", 87.5))])
+    with SentimentCache(cache_path, "sig-v2") as cache:
+        assert len(cache) == 0
+
+def test_eviction_keeps_size_bounded(cache_path):
+    with SentimentCache(cache_path, "sig-v1", max_entries=3) as cache:
+        cache.put_many([(cache.key(f"avis {i}"), (0.0, 0.0, "neutre", 50.0)) for i in range(5)])
+        assert len(cache) == 3
+
+def fake_scores(contents, *args, **kwargs):
+    """Scores factices ; BERT échoue pour les avis contenant "panne"."""
+    failed = contents.str.contains("panne")
+    return pd.DataFrame({
+        "Sentiment_TextBlob": 0.5, "Sentiment_VADER": 0.5,
+        "Sentiment_BERT_Label": failed.map({True: None, False: "positif"}),
+        "Sentiment_BERT_Prob": failed.map({True: None, False: 80.0}),
+    }, index=contents.index)[SCORE_COLUMNS]
+
+def test_failed_scores_are_not_cached(cache_path):
+    df = pd.DataFrame({"Content": ["Great car", "panne du modèle", "Nice app"]})
+    with SentimentCache(cache_path, "sig-v1") as cache:
+        with patch("utils.extract_sentiment._score_contents", side_effect=fake_scores) as score:
+            first = analyze_sentiments(df.copy(), cache=cache)
+            assert first["Sentiment_BERT_Label"].isna().tolist() == [False, True, False]
+            assert len(cache) == 2
+            analyze_sentiments(df.copy(), cache=cache)
+        assert score.call_args[0][0].tolist() == ["panne du modèle"]
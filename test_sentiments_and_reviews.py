@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
 import pytest
+from utils.extract_sentiment import categorization_label, categorization_labels
+from utils.storage import normalize_labels
 
 @pytest.fixture
 def load_sentiments_data():
@@ -24,6 +27,20 @@ def test_sentiment_scores_vs_labels(load_sentiments_data):
     assert (data.loc[data["Sentiment_TextBlob"] > 0, "Sentiment_TextBlob_label"] == "positif").all(), \
         "Incohérence entre score TextBlob et label."
 
+def test_categorization_labels_match_stored_labels(load_sentiments_data):
+    data = load_sentiments_data
+    for model in ("TextBlob", "VADER"):
+        expected = normalize_labels(data[f"Sentiment_{model}_label"])
+        assert (categorization_labels(data[f"Sentiment_{model}"]) == expected).all()
+
+def test_categorization_label_boundaries():
+    scores = [-1.5, -1, -0.6, -0.59, -0.2, 0, 0.2, 0.21, 0.6, 1, 1.01, np.nan]
+    expected = ["Null", "très négatif", "très négatif", "négatif", "neutre", "neutre", "neutre",
+                "positif", "très positif", "très positif", "Null", "Null"]
+    assert categorization_labels(pd.Series(scores)).tolist() == expected
+    assert [categorization_label(score) for score in scores] == expected
+    assert categorization_label(None) == "Null"
+
 # Tests pour Tesla_Trustpilot_Reviews.csv
 def test_reviews_columns_presence(load_reviews_data):
     expected_columns = ["Username", "Title", "Content", "Rating", "Date"]
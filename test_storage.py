@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+from utils.storage import save_frame, load_frame, find_dataset, dataset_path, export_csv, append_sink
+
+@pytest.fixture
+def analyzed():
+    """Extrait des avis analysés versionnés dans le dépôt."""
+    return pd.read_csv("data/sentiments_analyze.csv", nrows=200)
+
+def test_parquet_round_trip_is_typed(tmp_path, analyzed):
+    path = dataset_path(tmp_path, "sentiments_analyze", "parquet")
+    save_frame(analyzed, path)
+    loaded = load_frame(path)
+    assert len(loaded) == len(analyzed)
+    assert pd.api.types.is_datetime64_any_dtype(loaded["Date"])
+    assert isinstance(loaded["Sentiment_BERT_Label"].dtype, pd.CategoricalDtype)
+    assert loaded["Sentiment_VADER"].dtype == "float32"
+    assert loaded["Sentiment_BERT_Label"].astype(str).tolist() == analyzed["Sentiment_BERT_Label"].tolist()
+
+def test_column_projection(tmp_path, analyzed):
+    path = dataset_path(tmp_path, "sentiments_analyze", "parquet")
+    save_frame(analyzed, path)
+    assert list(load_frame(path, columns=["Date", "Rating"]).columns) == ["Date", "Rating"]
+
+def test_csv_export_and_latest_dataset(tmp_path, analyzed):
+    path = dataset_path(tmp_path, "sentiments_analyze", "parquet")
+    save_frame(analyzed, path)
+    csv_path = export_csv(path)
+    assert find_dataset(tmp_path, "sentiments_analyze") == csv_path
+    assert len(pd.read_csv(csv_path)) == len(analyzed)
+
+def test_parquet_append_sink(tmp_path, analyzed):
+    path = dataset_path(tmp_path, "sentiments_analyze", "parquet")
+    sink = append_sink(path)
+    sink.append(analyzed.iloc[:120])
+    sink.append(analyzed.iloc[120:])
+    sink.close()
+    loaded = load_frame(path)["Content"]
+    assert [None if pd.isnull(v) else v for v in loaded] == [None if pd.isnull(v) else v for v in analyzed["Content"]]
+
+def test_legacy_labels_are_normalized(tmp_path, analyzed):
+    analyzed["Sentiment_TextBlob_label"] = "trés négatif"
+    path = dataset_path(tmp_path, "sentiments_analyze", "parquet")
+    save_frame(analyzed, path)
+    assert set(load_frame(path)["Sentiment_TextBlob_label"].astype(str)) == {"très négatif"}
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+from utils.extract_sentiment import extract_keywords_sparse, extract_keywords_chunked
+from utils.streaming import CsvAppendSink, HoldbackSink, rechunk, run_pipeline
+
+@pytest.fixture
+def reviews():
+    """Petit flux d'avis découpé en pages de tailles inégales."""
+    df = pd.DataFrame({"Content": [f"avis {i}" for i in range(23)], "Rating": range(23)})
+    return [df.iloc[0:7], df.iloc[7:8], df.iloc[8:20], df.iloc[20:23]]
+
+def test_rechunk_keeps_order_and_sizes(reviews):
+    chunks = list(rechunk(reviews, chunk_size=5))
+    assert [len(c) for c in chunks] == [5, 5, 5, 5, 3]
+    assert pd.concat(chunks)["Rating"].tolist() == list(range(23))
+
+def test_holdback_sink_matches_iloc_split(tmp_path, reviews):
+    full = pd.concat(reviews, ignore_index=True)
+    sink = HoldbackSink(CsvAppendSink(tmp_path / "model.csv"), CsvAppendSink(tmp_path / "test.csv"), 4)
+    for chunk in rechunk(reviews, chunk_size=6):
+        sink.append(chunk)
+    sink.close()
+    assert pd.read_csv(tmp_path / "model.csv")["Rating"].tolist() == full.iloc[:-4]["Rating"].tolist()
+    assert pd.read_csv(tmp_path / "test.csv")["Rating"].tolist() == full.iloc[-4:]["Rating"].tolist()
+
+def test_run_pipeline_preserves_order(reviews):
+    seen = []
+    run_pipeline(
+        rechunk(reviews, chunk_size=4),
+        [lambda c: c.assign(Rating=c["Rating"] * 2), lambda c: seen.extend(c["Rating"])],
+        queue_size=1
+    )
+    assert seen == [2 * i for i in range(23)]
+
+def test_run_pipeline_propagates_errors(reviews):
+    def failing_stage(chunk):
+        raise ValueError("boom")
+    with pytest.raises(ValueError):
+        run_pipeline(rechunk(reviews, chunk_size=4), [failing_stage, lambda c: None], queue_size=1)
+
+@pytest.mark.parametrize("n_keywords", [10, 50, 2000])
+def test_chunked_keywords_match_extract_keywords(n_keywords):
+    contents = pd.read_csv("data/clean_data.csv")[["Content"]].dropna()
+    frames = [contents.iloc[start:start + 250] for start in range(0, len(contents), 250)]
+    chunks = list(extract_keywords_chunked(lambda: iter(frames), n_keywords))
+    chunked = sparse.vstack([matrix for matrix, _ in chunks], format='csr')
+    expected, expected_terms = extract_keywords_sparse(contents, n_keywords)
+    assert list(chunks[-1][1]) == list(expected_terms)
+    assert np.allclose(chunked.toarray(), expected.toarray())
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+import pandas as pd
+from utils.dedup import SENTIMENT_OUTPUT_COLUMNS
+from utils.extract_sentiment import analyze_sentiments
+from utils.storage import save_frame, load_frame
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Nombre d'avis analysés entre deux enregistrements du point de reprise
+CHECKPOINT_CHUNK_SIZE = 2000
+
+CHECKPOINT_STATE_FILE = 'state.json'
+PAGES_DIR = 'pages'
+CHUNKS_DIR = 'chunks'
+
+# Préfixe des fichiers en cours d'écriture (ignorés à la lecture)
+_TMP_PREFIX = 'tmp-'
+
+
+# Écrit un fichier JSON de façon atomique
+def _write_json(path, value):
+    tmp_path = os.path.join(os.path.dirname(path), _TMP_PREFIX + os.path.basename(path))
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(value, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+# Empreinte des contenus d'un chunk : un chunk enregistré n'est réutilisé que pour les mêmes avis
+def chunk_fingerprint(contents):
+    digest = hashlib.sha1()
+    for text in contents:
+        digest.update(str(text).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+# Point de reprise d'une exécution de process_data
+class RunCheckpoint:
+    """
+    Enregistre la progression d'une exécution au fil de l'eau :
+    - les étapes terminées ;
+    - chaque page scrapée (liste d'avis, un fichier JSON par page) ;
+    - chaque chunk d'avis analysés (scores seulement, un fichier Parquet par chunk).
+    Chaque fichier est écrit sous un nom temporaire puis renommé : un arrêt brutal
+    ne laisse jamais de page ou de chunk à moitié écrit. Une exécution relancée avec
+    resume=True repart du dernier élément enregistré, si ses paramètres sont
+    identiques à ceux de l'exécution interrompue.
+    """
+
+    def __init__(self, directory, params):
+        """
+        :param directory: Répertoire du point de reprise
+        :param params: Paramètres de l'exécution (dictionnaire sérialisable en JSON) ;
+                       une reprise n'est possible qu'avec les mêmes paramètres
+        """
+        self.directory = directory
+        self.params = params
+        self.state_path = os.path.join(directory, CHECKPOINT_STATE_FILE)
+        self.state = None
+
+    def start(self, resume=False):
+        """
+        :param resume: Reprendre l'exécution précédente si elle est compatible
+        :return: True si une exécution précédente est reprise
+        """
+        previous = self._load_state()
+        if resume and previous is not None and previous['params'] == self.params:
+            self.state = previous
+            logger.info(
+                f"Reprise de l'exécution du {previous['started_at']} : étapes terminées "
+                f"{previous['stages_done'] or 'aucune'}, {len(self.pages())} pages et "
+                f"{len(previous['chunks'])} chunks déjà enregistrés"
+            )
+            return True
+        if resume:
+            logger.warning("Aucun point de reprise compatible avec ces paramètres : exécution complète")
+        self.clear()
+        os.makedirs(os.path.join(self.directory, PAGES_DIR))
+        os.makedirs(os.path.join(self.directory, CHUNKS_DIR))
+        self.state = {
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'params': self.params,
+            'stages_done': [],
+            'chunks': {},
+            'values': {}
+        }
+        _write_json(self.state_path, self.state)
+        return False
+
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return None
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Point de reprise illisible ({self.state_path}) : {e}")
+            return None
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def is_done(self, stage):
+        return stage in self.state['stages_done']
+
+    def complete(self, stage):
+        self.state['stages_done'].append(stage)
+        _write_json(self.state_path, self.state)
+
+    def get(self, key, default=None):
+        return self.state['values'].get(key, default)
+
+    def set(self, key, value):
+        self.state['values'][key] = value
+        _write_json(self.state_path, self.state)
+
+    def _page_path(self, page):
+        return os.path.join(self.directory, PAGES_DIR, f"page_{page:06d}.json")
+
+    def save_page(self, page, reviews):
+        """
+        :param page: Numéro de page
+        :param reviews: Liste des avis de la page (dictionnaires)
+        """
+        _write_json(self._page_path(page), reviews)
+
+    def pages(self):
+        """
+        :return: Dictionnaire numéro de page -> avis des pages enregistrées
+        """
+        directory = os.path.join(self.directory, PAGES_DIR)
+        if not os.path.isdir(directory):
+            return {}
+        pages = {}
+        for name in os.listdir(directory):
+            if name.startswith(_TMP_PREFIX):
+                continue
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                pages[int(name[len('page_'):-len('.json')])] = json.load(f)
+        return pages
+
+    def _chunk_path(self, index, prefix=''):
+        return os.path.join(self.directory, CHUNKS_DIR, f"{prefix}chunk_{index:06d}.parquet")
+
+    def save_chunk(self, index, fingerprint, scores):
+        """
+        :param index: Position du chunk
+        :param fingerprint: Empreinte des contenus du chunk (voir chunk_fingerprint)
+        :param scores: DataFrame des colonnes de scores du chunk
+        """
+        tmp_path = self._chunk_path(index, _TMP_PREFIX)
+        save_frame(scores.reset_index(drop=True), tmp_path, typed=False)
+        os.replace(tmp_path, self._chunk_path(index))
+        self.state['chunks'][str(index)] = fingerprint
+        _write_json(self.state_path, self.state)
+
+    def load_chunk(self, index, fingerprint):
+        """
+        :return: Scores du chunk enregistré, ou None s'il est absent ou porte sur d'autres avis
+        """
+        if self.state['chunks'].get(str(index)) != fingerprint:
+            return None
+        return load_frame(self._chunk_path(index))
+
+
+# Analyse des sentiments chunk par chunk, chaque chunk étant enregistré dans le point de reprise
+def analyze_sentiments_checkpointed(data_frame, checkpoint, chunk_size=CHECKPOINT_CHUNK_SIZE, **kwargs):
+    """
+    Les chunks déjà enregistrés (mêmes avis, même position) sont relus au lieu d'être
+    analysés à nouveau : une reprise ne recalcule que les chunks non terminés.
+    :param data_frame: DataFrame contenant une colonne 'Content'
+    :param checkpoint: RunCheckpoint démarré
+    :param chunk_size: Nombre d'avis par chunk
+    :param kwargs: Paramètres transmis à analyze_sentiments (cache, workers, metrics...)
+    :return: DataFrame enrichi, comme analyze_sentiments
+    """
+    scores = []
+    resumed = 0
+    for index, start in enumerate(range(0, len(data_frame), chunk_size)):
+        chunk = data_frame.iloc[start:start + chunk_size]
+        fingerprint = chunk_fingerprint(chunk['Content'])
+        chunk_scores = checkpoint.load_chunk(index, fingerprint)
+        if chunk_scores is None:
+            analyzed = analyze_sentiments(chunk.copy(), **kwargs)
+            data_frame.attrs.update(analyzed.attrs)
+            chunk_scores = analyzed[SENTIMENT_OUTPUT_COLUMNS]
+            checkpoint.save_chunk(index, fingerprint, chunk_scores)
+        else:
+            resumed += 1
+        scores.append(chunk_scores.reset_index(drop=True))
+    if resumed:
+        logger.info(f"{resumed} chunks d'avis analysés repris du point de reprise")
+
+    if scores:
+        scores = pd.concat(scores, ignore_index=True)
+        for column in SENTIMENT_OUTPUT_COLUMNS:
+            data_frame[column] = scores[column].to_numpy()
+    return data_frame
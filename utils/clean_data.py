@@ -2,6 +2,7 @@ import pandas as pd
 import re
 from datetime import datetime
 import logging
+from utils.storage import load_frame
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
@@ -10,6 +11,17 @@ logging.basicConfig(
     level=logging.INFO
 )
 
+# Motifs précompilés utilisés par le nettoyage
+SPECIAL_CHARS_PATTERN = re.compile(r"[^a-zA-Z0-9À-ÿ' ]")
+SPACES_PATTERN = re.compile(r"\s+")
+ISO_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{1,6}Z$")
+DATE_INPUT_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+DATE_OUTPUT_FORMAT = "%Y-%m-%d"
+
+# Longueur au-delà de laquelle le texte est tronqué pour le modèle
+MAX_TEXT_LENGTH = 512
+TRUNCATED_LENGTH = 510
+
 # Charger le fichier CSV
 def load_csv(file_path):
     """
@@ -23,19 +35,33 @@ def load_csv(file_path):
         logger.error(f"Erreur lors du chargement du fichier : {e}")
         return None
 
+# Charger un fichier de données, quel que soit son format (CSV, Parquet)
+def load_data(file_path):
+    """
+    Charge un fichier de données brutes, sans conversion de types.
+    :param file_path: Chemin du fichier
+    :return: DataFrame contenant les données ou None en cas d'erreur
+    """
+    try:
+        return load_frame(file_path, typed=False)
+    except Exception as e:
+        logger.error(f"Erreur lors du chargement du fichier : {e}")
+        return None
+
 # Nettoyer le texte en supprimant les caractères spéciaux
-def clean_text(text):
+def clean_text(text, truncate=True):
     """
     Nettoie le texte en supprimant les caractères spéciaux et les espaces multiples.
     :param text: Texte à nettoyer
+    :param truncate: Tronquer les textes trop longs pour le modèle
     :return: Texte nettoyé
     """
     if pd.isnull(text):
         return ""
-    text = re.sub(r"[^a-zA-Z0-9À-ÿ' ]", " ", text)  # Supprimer les caractères spéciaux
-    text = re.sub(r"\s+", " ", text).strip()        # Supprimer les espaces multiples
-    if len(text) > 512:
-        text = text[:510]  # Truncate to fit model input size
+    text = SPECIAL_CHARS_PATTERN.sub(" ", text)  # Supprimer les caractères spéciaux
+    text = SPACES_PATTERN.sub(" ", text).strip()  # Supprimer les espaces multiples
+    if truncate and len(text) > MAX_TEXT_LENGTH:
+        text = text[:TRUNCATED_LENGTH]  # Truncate to fit model input size
     if len(text) < 2:
         text += "N/A"  # Handle very short or empty reviews
     return text
@@ -48,24 +74,59 @@ def format_date(date_str):
     :return: Date formatée en chaîne ou None en cas d'échec
     """
     try:
-        return datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S.%fZ").strftime("%Y-%m-%d")
+        return datetime.strptime(date_str, DATE_INPUT_FORMAT).strftime(DATE_OUTPUT_FORMAT)
     except Exception:
         return None
 
-# Nettoyer et structurer les données
-def clean_and_structure_data(file_path):
+# Version vectorisée de clean_text, appliquée à une colonne entière
+def clean_text_series(series, truncate=True):
     """
-    Charge un fichier CSV, nettoie et structure les données.
-    :param file_path: Chemin du fichier CSV à charger
-    :return: DataFrame nettoyé ou None en cas d'échec
+    Nettoie une colonne de textes avec les opérations vectorisées de pandas.
+    Le résultat est identique à series.apply(clean_text, truncate=truncate).
+    :param series: Series de textes
+    :param truncate: Tronquer les textes trop longs pour le modèle
+    :return: Series nettoyée
     """
-    logger.info("Début du nettoyage des données")
-    
-    df = load_csv(file_path)
-    if df is None:
-        logger.error("Échec du nettoyage : impossible de charger le fichier CSV")
-        return None
+    missing = series.isnull()
+    text = series.where(~missing, "").astype(str)
+    text = text.str.replace(SPECIAL_CHARS_PATTERN, " ", regex=True)
+    text = text.str.replace(SPACES_PATTERN, " ", regex=True).str.strip()
+    if truncate:
+        text = text.where(text.str.len() <= MAX_TEXT_LENGTH, text.str[:TRUNCATED_LENGTH])
+    text = text.where(text.str.len() >= 2, text + "N/A")
+    # clean_text renvoie une chaîne vide (sans "N/A") pour les valeurs manquantes
+    return text.where(~missing, "")
+
+# Version vectorisée de format_date, appliquée à une colonne entière
+def format_date_series(series):
+    """
+    Formate une colonne de dates ISO 8601 en YYYY-MM-DD.
+    Les dates au format Trustpilot standard sont converties en un seul appel à
+    pd.to_datetime ; les rares valeurs atypiques passent par format_date, ce qui
+    garantit un résultat identique à series.apply(format_date).
+    :param series: Series de dates sous forme de chaînes
+    :return: Series de dates formatées (NaN en cas d'échec)
+    """
+    present = series.notnull()
+    standard = present & series.where(present, "").astype(str).str.match(ISO_DATE_PATTERN)
+    result = pd.Series(None, index=series.index, dtype=object)
+    if standard.any():
+        parsed = pd.to_datetime(series[standard], format=DATE_INPUT_FORMAT, errors="coerce")
+        result[standard] = parsed.dt.strftime(DATE_OUTPUT_FORMAT)
+    atypical = present & ~standard
+    if atypical.any():
+        result[atypical] = series[atypical].map(format_date)
+    # Même type que series.apply(format_date) (chaînes dès qu'une date est valide)
+    return result.infer_objects() if result.notna().any() else result
 
+# Nettoyer et structurer un DataFrame déjà chargé
+def clean_and_structure_frame(df, truncate=True):
+    """
+    Nettoie et structure un DataFrame d'avis (utilisé aussi chunk par chunk).
+    :param df: DataFrame contenant les colonnes Username, Title, Content, Rating, Date
+    :param truncate: Tronquer les contenus trop longs (False pour l'analyse BERT par fenêtres)
+    :return: DataFrame nettoyé ou None en cas d'échec
+    """
     required_columns = ["Username", "Title", "Content", "Rating", "Date"]
     for col in required_columns:
         if col not in df.columns:
@@ -74,15 +135,32 @@ def clean_and_structure_data(file_path):
 
     try:
         # Nettoyage des colonnes
-        df["Username"] = df["Username"].apply(clean_text)
-        df["Title"] = df["Title"].apply(clean_text)
-        df["Content"] = df["Content"].apply(clean_text)
-        df["Date"] = df["Date"].apply(format_date)
+        df["Username"] = clean_text_series(df["Username"])
+        df["Title"] = clean_text_series(df["Title"])
+        df["Content"] = clean_text_series(df["Content"], truncate=truncate)
+        df["Date"] = format_date_series(df["Date"])
         df["Rating"] = pd.to_numeric(df["Rating"], errors="coerce")
-        df = df.dropna(subset=["Rating", "Date"])  # Supprimer les lignes avec notes ou dates manquantes
-        
-        logger.info("Nettoyage des données terminé avec succès")
-        return df
+        return df.dropna(subset=["Rating", "Date"])  # Supprimer les lignes avec notes ou dates manquantes
     except Exception as e:
         logger.error(f"Échec du nettoyage des données : {e}")
         return None
+
+# Nettoyer et structurer les données
+def clean_and_structure_data(file_path, truncate=True):
+    """
+    Charge un fichier (CSV ou Parquet), nettoie et structure les données.
+    :param file_path: Chemin du fichier à charger
+    :param truncate: Tronquer les contenus trop longs (False pour l'analyse BERT par fenêtres)
+    :return: DataFrame nettoyé ou None en cas d'échec
+    """
+    logger.info("Début du nettoyage des données")
+    
+    df = load_data(file_path)
+    if df is None:
+        logger.error("Échec du nettoyage : impossible de charger le fichier")
+        return None
+
+    df = clean_and_structure_frame(df, truncate=truncate)
+    if df is not None:
+        logger.info("Nettoyage des données terminé avec succès")
+    return df
@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+from utils.storage import SCORE_LABELS, SENTIMENT_LABELS, normalize_labels
+
+# Dimensions du cube d'agrégats
+CUBE_DIMENSIONS = ['Day', 'Sentiment_BERT_Label', 'Rating']
+
+# Sources comparées dans la matrice d'accord : la note (1 à 5 -> SCORE_LABELS) et les labels des modèles
+AGREEMENT_SOURCES = {
+    'Note': 'Rating',
+    'BERT': 'Sentiment_BERT_Label',
+    'TextBlob': 'Sentiment_TextBlob_label',
+    'VADER': 'Sentiment_VADER_label',
+}
+AGREEMENT_PAIRS = [('Note', 'BERT'), ('BERT', 'TextBlob'), ('BERT', 'VADER'), ('TextBlob', 'VADER')]
+AGREEMENT_COLUMNS = ['reference', 'compared', 'reference_label', 'compared_label', 'n_reviews']
+
+# Matrice d'accord écrite par le pipeline à côté des avis analysés
+MODEL_AGREEMENT_FILE = 'model_agreement.csv'
+
+
+# Construit le cube d'agrégats à partir des avis analysés
+def build_cube(data):
+    """
+    Agrège les avis par jour x label BERT x note. Le cube est petit (quelques
+    milliers de lignes) et suffit à calculer tous les indicateurs filtrés du
+    dashboard sans reparcourir les avis.
+    :param data: DataFrame avec Date, Rating, Sentiment_BERT_Label, Sentiment_TextBlob, Sentiment_VADER
+    :return: DataFrame du cube (Day, Month_Year, Sentiment_BERT_Label, Rating, n_reviews,
+             rating_sum, textblob_pos, textblob_neg, vader_pos, vader_neg)
+    """
+    frame = pd.DataFrame({
+        'Day': data['Date'].dt.normalize(),
+        'Sentiment_BERT_Label': data['Sentiment_BERT_Label'].astype(str),
+        'Rating': data['Rating'],
+        'textblob_pos': data['Sentiment_TextBlob'] > 0,
+        'textblob_neg': data['Sentiment_TextBlob'] < 0,
+        'vader_pos': data['Sentiment_VADER'] > 0,
+        'vader_neg': data['Sentiment_VADER'] < 0,
+    })
+    cube = frame.groupby(CUBE_DIMENSIONS, observed=True).agg(
+        n_reviews=('Rating', 'size'),
+        rating_sum=('Rating', 'sum'),
+        textblob_pos=('textblob_pos', 'sum'),
+        textblob_neg=('textblob_neg', 'sum'),
+        vader_pos=('vader_pos', 'sum'),
+        vader_neg=('vader_neg', 'sum'),
+    ).reset_index()
+    cube['Month_Year'] = cube['Day'].dt.to_period('M')
+    return cube
+
+
+# Sélectionne les cellules du cube correspondant aux filtres
+def filter_cube(cube, start_date, end_date, labels, ratings):
+    """
+    La plage de dates est découpée par recherche dichotomique : le cube doit être
+    trié par jour (c'est le cas de build_cube et de ReviewStore.cube).
+    :param start_date: Date de début (incluse)
+    :param end_date: Date de fin (incluse)
+    :param labels: Labels BERT retenus
+    :param ratings: Tuple (note min, note max)
+    :return: Sous-cube filtré
+    """
+    days = cube['Day'].to_numpy()
+    first = days.searchsorted(pd.Timestamp(start_date).to_datetime64(), 'left')
+    last = days.searchsorted(pd.Timestamp(end_date).to_datetime64(), 'right')
+    window = cube.iloc[first:last]
+    return window[
+        (window['Sentiment_BERT_Label'].isin([str(label) for label in labels])) &
+        (window['Rating'].between(*ratings))
+    ]
+
+
+# Indicateurs clés : total, note moyenne, sentiment dominant
+def compute_kpis(cube):
+    """
+    :return: Tuple (nombre d'avis, note moyenne arrondie, sentiment le plus fréquent)
+    """
+    total = int(cube['n_reviews'].sum())
+    avg_rating = round(cube['rating_sum'].sum() / total, 2) if total else None
+    by_label = sentiment_distribution(cube)
+    # Comme Series.mode() : en cas d'égalité, le premier label dans l'ordre alphabétique
+    dominant = by_label.sort_index().idxmax() if not by_label.empty else None
+    return total, avg_rating, dominant
+
+
+# Nombre d'avis par note
+def rating_distribution(cube):
+    return cube.groupby('Rating')['n_reviews'].sum()
+
+
+# Nombre d'avis par label BERT
+def sentiment_distribution(cube):
+    counts = cube.groupby('Sentiment_BERT_Label')['n_reviews'].sum()
+    return counts[counts > 0]
+
+
+# Note moyenne par mois
+def monthly_trend(cube):
+    monthly = cube.groupby('Month_Year')[['rating_sum', 'n_reviews']].sum()
+    return monthly['rating_sum'] / monthly['n_reviews']
+
+
+# Comptes par modèle pour la comparaison BERT / TextBlob / VADER
+def model_comparison(cube):
+    """
+    :return: DataFrame (Modèle, Positif, Négatif, Très positif, Très négatif)
+    """
+    by_label = cube.groupby('Sentiment_BERT_Label')['n_reviews'].sum()
+    return pd.DataFrame({
+        "Modèle": ["BERT", "TextBlob", "VADER"],
+        "Positif": [int(by_label.get('positif', 0)), int(cube['textblob_pos'].sum()), int(cube['vader_pos'].sum())],
+        "Négatif": [int(by_label.get('négatif', 0)), int(cube['textblob_neg'].sum()), int(cube['vader_neg'].sum())],
+        # TextBlob et VADER n'ont pas de catégorie "très positif" / "très négatif"
+        "Très positif": [int(by_label.get('très positif', 0)), 0, 0],
+        "Très négatif": [int(by_label.get('très négatif', 0)), 0, 0],
+    })
+
+
+# Codes des labels d'une source (position dans SENTIMENT_LABELS, "Null" pour une valeur inconnue)
+def _label_codes(data, source):
+    null_code = len(SENTIMENT_LABELS) - 1
+    if source == 'Note':
+        ratings = pd.to_numeric(data['Rating'], errors='coerce').to_numpy(dtype=float)
+        valid = np.isin(ratings, np.arange(1, len(SCORE_LABELS) + 1))
+        return np.where(valid, np.nan_to_num(ratings) - 1, null_code).astype(np.int64)
+    labels = normalize_labels(data[AGREEMENT_SOURCES[source]])
+    labels = labels.where(labels.isin(SENTIMENT_LABELS))
+    codes = pd.Categorical(labels, categories=SENTIMENT_LABELS).codes.astype(np.int64)
+    return np.where(codes < 0, null_code, codes)
+
+
+# Matrice d'accord entre la note et les modèles de sentiment, au format long
+def model_agreement(data, pairs=AGREEMENT_PAIRS):
+    """
+    Compte, pour chaque paire de sources, les avis par couple (label de référence,
+    label comparé), en une passe par paire (np.bincount sur les codes des labels).
+    Toutes les cellules sont présentes, même vides : les comptes de plusieurs
+    chunks s'additionnent ligne à ligne (voir merge_agreement).
+    :param data: DataFrame avec Rating et les colonnes de labels des modèles
+    :param pairs: Paires (référence, comparé) parmi les clés de AGREEMENT_SOURCES
+    :return: DataFrame (reference, compared, reference_label, compared_label, n_reviews)
+    """
+    n_labels = len(SENTIMENT_LABELS)
+    codes = {source: _label_codes(data, source) for source in dict.fromkeys(s for pair in pairs for s in pair)}
+    frames = []
+    for reference, compared in pairs:
+        counts = np.bincount(codes[reference] * n_labels + codes[compared], minlength=n_labels * n_labels)
+        frames.append(pd.DataFrame({
+            'reference': reference,
+            'compared': compared,
+            'reference_label': np.repeat(SENTIMENT_LABELS, n_labels),
+            'compared_label': np.tile(SENTIMENT_LABELS, n_labels),
+            'n_reviews': counts,
+        }))
+    if not frames:
+        return pd.DataFrame(columns=AGREEMENT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+# Additionne les matrices d'accord de plusieurs chunks
+def merge_agreement(agreements):
+    """
+    :param agreements: Matrices d'accord (voir model_agreement)
+    :return: Matrice d'accord cumulée, ou None si la liste est vide
+    """
+    agreements = list(agreements)
+    if not agreements:
+        return None
+    keys = AGREEMENT_COLUMNS[:-1]
+    return pd.concat(agreements, ignore_index=True).groupby(keys, sort=False)['n_reviews'].sum().reset_index()
+
+
+# Matrice d'accord d'une paire de sources, prête à afficher
+def agreement_matrix(agreement, reference, compared, include_null=False):
+    """
+    :param agreement: Matrice d'accord au format long (voir model_agreement)
+    :param reference: Source en lignes (ex. 'Note')
+    :param compared: Source en colonnes (ex. 'BERT')
+    :param include_null: Garder la ligne et la colonne "Null"
+    :return: DataFrame label de référence x label comparé -> nombre d'avis
+    """
+    labels = SENTIMENT_LABELS if include_null else SCORE_LABELS
+    pair = agreement[(agreement['reference'] == reference) & (agreement['compared'] == compared)]
+    matrix = pair.pivot_table(
+        index='reference_label', columns='compared_label', values='n_reviews', aggfunc='sum'
+    )
+    return matrix.reindex(index=labels, columns=labels).fillna(0).astype(int)
@@ -0,0 +1,164 @@
+import logging
+import re
+import zlib
+import numpy as np
+from utils.extract_sentiment import analyze_sentiments
+from utils.metrics import measure
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Similarité de Jaccard (estimée) à partir de laquelle deux avis sont considérés comme doublons
+DEDUP_THRESHOLD = 0.9
+
+# Nombre de permutations MinHash et taille des shingles (en mots)
+NUM_PERM = 128
+SHINGLE_SIZE = 3
+
+# Nombre premier > 2**32 utilisé par les permutations (a * x + b) mod p
+_PRIME = np.uint64(4294967311)
+
+# Colonnes ajoutées par analyze_sentiments, recopiées du représentant vers ses doublons
+SENTIMENT_OUTPUT_COLUMNS = [
+    'Sentiment_TextBlob', 'Sentiment_TextBlob_label', 'Sentiment_VADER', 'Sentiment_VADER_label',
+    'Sentiment_BERT_Label', 'Sentiment_BERT_Prob'
+]
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+# Shingles d'un texte : ensemble des hashs de ses suites de `size` mots
+def _shingles(text, size=SHINGLE_SIZE):
+    words = _WORD_PATTERN.findall(str(text).lower())
+    if len(words) <= size:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64))
+
+
+# Coefficients des permutations, identiques d'un appel à l'autre pour une graine donnée
+def _permutations(num_perm, seed):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+# Signature MinHash de chaque texte
+def minhash_signatures(texts, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=1):
+    """
+    :param texts: Liste (ou Series) de textes
+    :param num_perm: Nombre de permutations (longueur de la signature)
+    :param shingle_size: Nombre de mots par shingle
+    :param seed: Graine des permutations
+    :return: Matrice (n_textes, num_perm) de uint64
+    """
+    a, b = _permutations(num_perm, seed)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint64)
+    for i, text in enumerate(texts):
+        shingles = _shingles(text, shingle_size)
+        signatures[i] = ((np.outer(shingles, a) + b) % _PRIME).min(axis=0)
+    return signatures
+
+
+# Découpage LSH (bandes x lignes) dont le seuil approché est le plus proche de `threshold`
+def lsh_bands(threshold, num_perm=NUM_PERM):
+    """
+    Deux signatures deviennent candidates si elles coïncident sur au moins une
+    bande ; la probabilité vaut 1/2 autour de s = (1 / bandes) ** (1 / lignes).
+    :return: Tuple (nombre de bandes, lignes par bande)
+    """
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    return min(options, key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - threshold))
+
+
+# Regroupe les avis identiques ou quasi identiques
+def find_near_duplicates(texts, threshold=DEDUP_THRESHOLD, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=1):
+    """
+    Les doublons exacts sont regroupés d'abord ; les textes restants sont comparés
+    par MinHash et LSH, et une paire candidate n'est fusionnée que si sa similarité
+    estimée atteint le seuil.
+    :param texts: Liste (ou Series) de textes
+    :param threshold: Similarité de Jaccard minimale (1.0 : doublons exacts seulement)
+    :return: Tableau donnant pour chaque texte la position de son représentant
+             (le premier texte de son groupe)
+    """
+    texts = [str(text) for text in texts]
+    first_seen = {}
+    representative = np.array([first_seen.setdefault(text, i) for i, text in enumerate(texts)])
+    if threshold >= 1.0:
+        return representative
+
+    unique = np.unique(representative)
+    signatures = minhash_signatures([texts[i] for i in unique], num_perm, shingle_size, seed)
+    n_bands, rows = lsh_bands(threshold, num_perm)
+
+    # Union-find sur les positions de `unique` ; la racine est toujours la plus petite position
+    parent = np.arange(len(unique))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(n_bands):
+        buckets = {}
+        band_values = signatures[:, band * rows:(band + 1) * rows]
+        for i in range(len(unique)):
+            buckets.setdefault(band_values[i].tobytes(), []).append(i)
+        for members in buckets.values():
+            head = members[0]
+            for other in members[1:]:
+                root_head, root_other = find(head), find(other)
+                if root_head == root_other:
+                    continue
+                if np.mean(signatures[head] == signatures[other]) >= threshold:
+                    parent[max(root_head, root_other)] = min(root_head, root_other)
+
+    roots = np.array([find(i) for i in range(len(unique))])
+    unique_representative = dict(zip(unique, unique[roots]))
+    return np.array([unique_representative[r] for r in representative])
+
+
+# Analyse des sentiments d'un seul avis par groupe de doublons
+def analyze_sentiments_deduplicated(data_frame, threshold=DEDUP_THRESHOLD, num_perm=NUM_PERM,
+                                    shingle_size=SHINGLE_SIZE, analyze=None, **kwargs):
+    """
+    Regroupe les avis quasi identiques, n'analyse que le représentant de chaque
+    groupe puis recopie ses scores sur les autres avis du groupe. Toutes les lignes
+    sont conservées en sortie.
+    :param data_frame: DataFrame contenant une colonne 'Content'
+    :param threshold: Similarité de Jaccard minimale entre doublons (1.0 : doublons exacts)
+    :param num_perm: Nombre de permutations MinHash
+    :param shingle_size: Nombre de mots par shingle
+    :param analyze: Fonction d'analyse des représentants (analyze_sentiments par défaut)
+    :param kwargs: Paramètres transmis à analyze_sentiments (cache, workers, metrics...)
+    :return: DataFrame enrichi ; le rapport de déduplication est dans data_frame.attrs['dedup']
+    """
+    with measure(kwargs.get('metrics'), 'dedup', rows_in=len(data_frame)) as record:
+        representative = find_near_duplicates(data_frame['Content'], threshold, num_perm, shingle_size)
+        kept = np.unique(representative)
+        record['rows_out'] = len(kept)
+
+    scored = (analyze or analyze_sentiments)(data_frame.iloc[kept].copy(), **kwargs)
+    positions = np.searchsorted(kept, representative)
+    for column in SENTIMENT_OUTPUT_COLUMNS:
+        data_frame[column] = scored[column].to_numpy()[positions]
+
+    n_rows = len(data_frame)
+    report = {
+        'threshold': threshold,
+        'n_reviews': n_rows,
+        'n_scored': len(kept),
+        'n_exact_duplicates': int(n_rows - data_frame['Content'].astype(str).nunique()),
+        'inference_saved': round(1 - len(kept) / n_rows, 4) if n_rows else 0.0
+    }
+    logger.info(
+        f"Déduplication : {report['n_scored']} avis analysés sur {n_rows} "
+        f"({report['inference_saved']:.1%} d'inférence économisée, seuil {threshold})"
+    )
+    data_frame.attrs.update(scored.attrs)
+    data_frame.attrs['dedup'] = report
+    return data_frame
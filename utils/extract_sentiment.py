@@ -1,31 +1,154 @@
-import os
-# Désactiver réduit les performances mais permet d'obtenir des résultats plus précis
-# os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
-
+import numpy as np
 import pandas as pd
+from collections import Counter
 from textblob import TextBlob
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from transformers import pipeline
-from transformers import logging as transformers_logging
-import torch
+from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
+from sklearn.preprocessing import normalize
+from scipy import sparse
 from tqdm import tqdm
-import tensorflow as tf
+import time
+import logging
+import os
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+import json
+import hashlib
+from functools import lru_cache
+from importlib import metadata
+from utils.metrics import measure
+from utils.keyword_model import top_term_positions
+from utils.storage import SCORE_LABELS
+
+logger = logging.getLogger(__name__)
+
+# Nombre de textes envoyés à un processus à la fois pour TextBlob et VADER
+SCORING_CHUNK_SIZE = 500
+
+# Paramètres par défaut de l'inférence BERT par lots
+BERT_BATCH_SIZE = 32
+BERT_MAX_LENGTH = 512
+
+# Chevauchement (en tokens) entre deux fenêtres d'un avis long
+BERT_CHUNK_STRIDE = 128
+
+# Modèle BERT utilisé pour l'analyse de sentiment
+BERT_MODEL_NAME = "nlptown/bert-base-multilingual-uncased-sentiment"
+# Révision du modèle sur le Hub (branche, tag ou hash de commit)
+BERT_MODEL_REVISION = "main"
+
+# Backends d'inférence BERT disponibles sur CPU
+BERT_BACKENDS = ('pytorch', 'quantized', 'onnx')
+
+# Répertoire où les modèles exportés en ONNX sont conservés entre deux exécutions
+# (un sous-répertoire par modèle et révision, voir onnx_export_dir)
+ONNX_EXPORT_DIR = './models/bert-onnx'
+
+# Backend et nombre de threads utilisés par get_bert_analyzer (voir configure_bert_backend)
+_bert_config = {'backend': 'pytorch', 'num_threads': None}
+
+# Choisit le backend d'inférence BERT pour la suite de l'exécution
+def configure_bert_backend(backend='pytorch', num_threads=None):
+    """
+    :param backend: 'pytorch' (fp32), 'quantized' (int8 dynamique) ou 'onnx' (ONNX Runtime, via optimum)
+    :param num_threads: Nombre de threads intra-op (None : valeur par défaut de la bibliothèque)
+    """
+    if backend not in BERT_BACKENDS:
+        raise ValueError(f"Backend BERT inconnu : {backend} (disponibles : {', '.join(BERT_BACKENDS)})")
+    _bert_config['backend'] = backend
+    _bert_config['num_threads'] = num_threads
+
+# Pipeline BERT pour l'analyse de sentiment, chargé à la première inférence
+def get_bert_analyzer():
+    """
+    :return: Pipeline transformers de classification de texte du backend configuré
+    """
+    return load_bert_analyzer(_bert_config['backend'], _bert_config['num_threads'])
+
+# Charge (une seule fois par backend) le pipeline BERT
+@lru_cache(maxsize=None)
+def load_bert_analyzer(backend='pytorch', num_threads=None):
+    """
+    torch et transformers ne sont importés qu'ici, pour que l'import du module
+    reste rapide et fonctionne hors ligne.
+    :param backend: Voir configure_bert_backend
+    :param num_threads: Nombre de threads intra-op
+    :return: Pipeline transformers de classification de texte
+    """
+    import torch
+    from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+    from transformers import logging as transformers_logging
+
+    # Configuration du logging
+    transformers_logging.set_verbosity_error()
+
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+    if backend == 'pytorch':
+        # Vérifie si un GPU est disponible sinon CPU
+        device = 0 if torch.cuda.is_available() else -1
+        logger.info(f"Chargement du modèle BERT {BERT_MODEL_NAME} (device={device})")
+        return pipeline(
+            task='text-classification',
+            model=BERT_MODEL_NAME,
+            tokenizer=BERT_MODEL_NAME,
+            revision=BERT_MODEL_REVISION,
+            device=device
+        )
 
-# Configuration du logging
-transformers_logging.set_verbosity_error()
-tf.get_logger().setLevel('ERROR')
+    tokenizer = AutoTokenizer.from_pretrained(BERT_MODEL_NAME, revision=BERT_MODEL_REVISION)
+    if backend == 'quantized':
+        # Quantification dynamique int8 des couches linéaires (CPU uniquement)
+        logger.info(f"Chargement du modèle BERT {BERT_MODEL_NAME} quantifié en int8")
+        model = AutoModelForSequenceClassification.from_pretrained(BERT_MODEL_NAME, revision=BERT_MODEL_REVISION).eval()
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    else:
+        model = _load_onnx_model(num_threads)
+    return pipeline(task='text-classification', model=model, tokenizer=tokenizer, device=-1)
+
+# Répertoire d'export ONNX propre au modèle BERT et à sa révision
+def onnx_export_dir(model_name=None, revision=None):
+    """
+    Un export n'est relu que pour le modèle et la révision qui l'ont produit :
+    changer BERT_MODEL_NAME ou BERT_MODEL_REVISION déclenche un nouvel export.
+    :param model_name: Nom du modèle sur le Hub (par défaut BERT_MODEL_NAME)
+    :param revision: Révision du modèle (par défaut BERT_MODEL_REVISION)
+    :return: Chemin du répertoire d'export
+    """
+    model_name = model_name or BERT_MODEL_NAME
+    revision = revision or BERT_MODEL_REVISION
+    return os.path.join(ONNX_EXPORT_DIR, f"{model_name.replace('/', '--')}@{revision.replace('/', '--')}")
 
-# Vérifie si un GPU est disponible sinon CPU
-DEVICE = 0 if torch.cuda.is_available() else -1
+# Modèle ONNX Runtime, exporté au premier appel puis relu depuis onnx_export_dir()
+def _load_onnx_model(num_threads=None):
+    try:
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError as e:
+        raise ImportError(
+            "Le backend BERT 'onnx' nécessite optimum[onnxruntime] (pip install optimum[onnxruntime])"
+        ) from e
 
-# Pipeline BERT pour l'analyse de sentiment
-bert_analyzer = pipeline(
-    task='text-classification',
-    model="nlptown/bert-base-multilingual-uncased-sentiment",
-    tokenizer="nlptown/bert-base-multilingual-uncased-sentiment",
-    device=DEVICE
-)
+    session_options = onnxruntime.SessionOptions()
+    if num_threads:
+        session_options.intra_op_num_threads = num_threads
+    export_dir = onnx_export_dir()
+    if os.path.isdir(export_dir):
+        logger.info(f"Chargement du modèle BERT ONNX depuis {export_dir}")
+        return ORTModelForSequenceClassification.from_pretrained(export_dir, session_options=session_options)
+    logger.info(f"Export du modèle BERT {BERT_MODEL_NAME} ({BERT_MODEL_REVISION}) en ONNX vers {export_dir}")
+    model = ORTModelForSequenceClassification.from_pretrained(
+        BERT_MODEL_NAME, revision=BERT_MODEL_REVISION, export=True, session_options=session_options
+    )
+    model.save_pretrained(export_dir)
+    return model
+
+# Compatibilité : `extract_sentiment.bert_analyzer` charge le pipeline à la demande
+def __getattr__(name):
+    if name == 'bert_analyzer':
+        return get_bert_analyzer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Mappage des labels de BERT
 label2emotion = {
@@ -36,6 +159,33 @@ label2emotion = {
     '5 stars': "très positif"
 }
 
+# Signature des modèles, utilisée pour invalider le cache de sentiments
+def model_signature(bert_chunk_stride=None):
+    """
+    Calcule une signature des modèles et de leur configuration : nom et backend du
+    modèle BERT, mappage des labels et versions des bibliothèques d'analyse.
+    :param bert_chunk_stride: Chevauchement des fenêtres BERT (None : troncature)
+    :return: Hash hexadécimal de la signature
+    """
+    versions = {}
+    packages = ['transformers', 'textblob', 'vaderSentiment']
+    packages += {'quantized': ['torch'], 'onnx': ['optimum', 'onnxruntime']}.get(_bert_config['backend'], [])
+    for package in packages:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    payload = {
+        'bert_model': BERT_MODEL_NAME,
+        'bert_revision': BERT_MODEL_REVISION,
+        'bert_backend': _bert_config['backend'],
+        'label2emotion': label2emotion,
+        'versions': versions
+    }
+    if bert_chunk_stride:
+        payload['bert_chunk_stride'] = bert_chunk_stride
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
 # Fonction d'analyse de sentiment avec TextBlob
 def analyze_sentiment_textblob(text):
     try:
@@ -44,71 +194,428 @@ def analyze_sentiment_textblob(text):
     except Exception:
         return None
 
+# Analyseur VADER partagé : le lexique n'est chargé qu'une fois par processus
+@lru_cache(maxsize=None)
+def get_vader_analyzer():
+    return SentimentIntensityAnalyzer()
+
 # Fonction d'analyse de sentiment avec VADER
 def analyze_sentiment_vader(text):
     try:
-        analyzer = SentimentIntensityAnalyzer()
-        sentiment_score = analyzer.polarity_scores(text)
+        sentiment_score = get_vader_analyzer().polarity_scores(text)
         return sentiment_score['compound']
     except Exception:
         return None
 
+# Score TextBlob et VADER d'un lot de textes (exécuté dans un processus du pool)
+def _score_lexical_chunk(texts):
+    return [(analyze_sentiment_textblob(text), analyze_sentiment_vader(text)) for text in texts]
+
+# Prépare chaque processus : l'analyseur VADER est créé une fois par processus
+def _init_scoring_worker():
+    get_vader_analyzer()
+
+# Pool de processus réutilisé d'un appel à l'autre (mode flux : un appel par chunk)
+@lru_cache(maxsize=None)
+def _get_process_pool(workers):
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_scoring_worker)
+    atexit.register(pool.shutdown)
+    return pool
+
+# Analyse TextBlob et VADER répartie sur plusieurs processus
+def score_lexical_parallel(texts, workers, chunk_size=SCORING_CHUNK_SIZE):
+    """
+    Découpe les textes en lots de chunk_size, les score dans un pool de `workers`
+    processus et réassemble les résultats dans l'ordre d'origine.
+    :param texts: Liste (ou Series) de textes
+    :param workers: Nombre de processus
+    :param chunk_size: Nombre de textes par lot envoyé à un processus
+    :return: Tuple (scores TextBlob, scores VADER), listes dans l'ordre des textes
+    """
+    texts = list(texts)
+    if not texts:
+        return [], []
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    pool = _get_process_pool(workers)
+    results = list(tqdm(
+        pool.map(_score_lexical_chunk, chunks),
+        total=len(chunks), desc=f"Analyse des sentiments TextBlob/VADER ({workers} processus)"
+    ))
+    scores = [score for chunk in results for score in chunk]
+    return [s[0] for s in scores], [s[1] for s in scores]
+
 # Fonction d'analyse de sentiment avec BERT
 def analyze_sentiment_bert(text):
     try:
-        result = bert_analyzer(text, truncation=True, max_length=512, return_all_scores=True)
+        result = get_bert_analyzer()(text, truncation=True, max_length=512, return_all_scores=True)
         max_result = max(result[0], key=lambda x: x['score'])
         label = label2emotion[max_result['label']]
         prob = round(max_result['score'] * 100, 2)
         return label, prob
     except Exception:
         return None, None
-    
+
+# Convertit la sortie brute du pipeline en (label, probabilité)
+def _bert_scores_to_label(scores):
+    max_result = max(scores, key=lambda x: x['score'])
+    return label2emotion[max_result['label']], round(max_result['score'] * 100, 2)
+
+# Analyse BERT par lots, regroupés par longueur de tokens
+def analyze_sentiment_bert_batch(texts, batch_size=BERT_BATCH_SIZE, max_length=BERT_MAX_LENGTH, quiet=False):
+    """
+    Analyse une liste de textes avec BERT en lots de taille fixe.
+    Les textes sont triés par nombre de tokens afin que chaque lot contienne des
+    longueurs proches, ce qui limite le remplissage (padding) inutile.
+    :param texts: Liste (ou Series) de textes à analyser
+    :param batch_size: Nombre de textes envoyés au modèle par passe
+    :param max_length: Longueur maximale en tokens (troncature au-delà)
+    :param quiet: Sans barre de progression ni journal de débit (appels fréquents sur de petits lots)
+    :return: Tuple (résultats, rapport) où résultats est une liste de (label, probabilité)
+             dans l'ordre d'origine et rapport un dictionnaire de débit
+    """
+    texts = [str(text) for text in texts]
+    results = [(None, None)] * len(texts)
+    start = time.perf_counter()
+    if not texts:
+        return results, bert_throughput_report(0, 0, 0, 0, batch_size, quiet)
+
+    bert_analyzer = get_bert_analyzer()
+    lengths = [
+        len(ids) for ids in
+        bert_analyzer.tokenizer(texts, truncation=True, max_length=max_length)['input_ids']
+    ]
+    order = sorted(range(len(texts)), key=lambda i: lengths[i])
+
+    real_tokens = 0
+    padded_tokens = 0
+    for batch_start in tqdm(range(0, len(order), batch_size), desc="Analyse des sentiments BERT (lots)", disable=quiet):
+        batch_idx = order[batch_start:batch_start + batch_size]
+        batch_lengths = [lengths[i] for i in batch_idx]
+        real_tokens += sum(batch_lengths)
+        padded_tokens += max(batch_lengths) * len(batch_idx)
+        batch_texts = [texts[i] for i in batch_idx]
+        try:
+            outputs = bert_analyzer(
+                batch_texts,
+                batch_size=len(batch_texts),
+                truncation=True,
+                max_length=max_length,
+                return_all_scores=True
+            )
+            for i, scores in zip(batch_idx, outputs):
+                results[i] = _bert_scores_to_label(scores)
+        except Exception as e:
+            # En cas d'échec du lot, on retombe sur l'analyse texte par texte
+            logger.warning(f"Échec du lot BERT, analyse individuelle : {e}")
+            for i in batch_idx:
+                results[i] = analyze_sentiment_bert(texts[i])
+
+    report = bert_throughput_report(
+        len(texts), time.perf_counter() - start, real_tokens, padded_tokens, batch_size, quiet
+    )
+    return results, report
+
+# Analyse BERT des avis longs : fenêtres de tokens chevauchantes, agrégées par avis
+def analyze_sentiment_bert_chunked(texts, batch_size=BERT_BATCH_SIZE, max_length=BERT_MAX_LENGTH,
+                                   stride=BERT_CHUNK_STRIDE):
+    """
+    Découpe chaque texte en fenêtres de max_length tokens qui se chevauchent de
+    `stride` tokens, analyse toutes les fenêtres en une passe par lots puis agrège
+    les probabilités de chaque avis (moyenne pondérée par le nombre de tokens de
+    chaque fenêtre). Les fenêtres sont triées par longueur avant le découpage en
+    lots, ce qui borne le remplissage comme dans analyze_sentiment_bert_batch.
+    Un texte qui tient dans une fenêtre obtient le même résultat qu'avec la troncature.
+    :param texts: Liste (ou Series) de textes à analyser
+    :param batch_size: Nombre de fenêtres envoyées au modèle par passe
+    :param max_length: Taille d'une fenêtre en tokens (tokens spéciaux compris)
+    :param stride: Nombre de tokens partagés par deux fenêtres consécutives
+    :return: Tuple (résultats, rapport) comme analyze_sentiment_bert_batch ; le rapport
+             indique aussi le nombre de fenêtres analysées
+    """
+    import torch
+
+    texts = [str(text) for text in texts]
+    results = [(None, None)] * len(texts)
+    start = time.perf_counter()
+    if not texts:
+        return results, bert_throughput_report(0, 0, 0, 0, batch_size)
+
+    bert_analyzer = get_bert_analyzer()
+    tokenizer, model = bert_analyzer.tokenizer, bert_analyzer.model
+    encoded = tokenizer(
+        texts, truncation=True, max_length=max_length, stride=stride, return_overflowing_tokens=True
+    )
+    windows = encoded['input_ids']
+    owners = encoded['overflow_to_sample_mapping']
+    order = sorted(range(len(windows)), key=lambda i: len(windows[i]))
+
+    n_labels = model.config.num_labels
+    weighted = np.zeros((len(texts), n_labels))
+    weights = np.zeros(len(texts))
+    real_tokens = 0
+    padded_tokens = 0
+    for batch_start in tqdm(range(0, len(order), batch_size), desc="Analyse des sentiments BERT (fenêtres)"):
+        batch_idx = order[batch_start:batch_start + batch_size]
+        batch_lengths = [len(windows[i]) for i in batch_idx]
+        real_tokens += sum(batch_lengths)
+        padded_tokens += max(batch_lengths) * len(batch_idx)
+        try:
+            inputs = tokenizer.pad({'input_ids': [windows[i] for i in batch_idx]}, return_tensors='pt')
+            inputs = {name: tensor.to(model.device) for name, tensor in inputs.items()}
+            with torch.no_grad():
+                probs = torch.softmax(model(**inputs).logits, dim=-1).cpu().numpy()
+        except Exception as e:
+            logger.warning(f"Échec d'un lot de fenêtres BERT, fenêtres ignorées : {e}")
+            continue
+        for i, length, prob in zip(batch_idx, batch_lengths, probs):
+            weighted[owners[i]] += length * prob
+            weights[owners[i]] += length
+
+    for i in np.flatnonzero(weights):
+        probs = weighted[i] / weights[i]
+        best = int(probs.argmax())
+        results[i] = (label2emotion[model.config.id2label[best]], round(float(probs[best]) * 100, 2))
+
+    report = bert_throughput_report(len(texts), time.perf_counter() - start, real_tokens, padded_tokens, batch_size)
+    report['n_windows'] = len(windows)
+    return results, report
+
+# Rapport de débit de l'inférence BERT
+def bert_throughput_report(n_reviews, elapsed, real_tokens, padded_tokens, batch_size, quiet=False):
+    """
+    Construit le rapport de débit d'une passe d'inférence BERT.
+    :param n_reviews: Nombre d'avis analysés
+    :param elapsed: Durée totale en secondes
+    :param real_tokens: Nombre de tokens réels
+    :param padded_tokens: Nombre de tokens après remplissage des lots
+    :param batch_size: Taille de lot utilisée
+    :param quiet: Ne pas journaliser le rapport
+    :return: Dictionnaire (avis/s, part de padding, etc.)
+    """
+    report = {
+        'n_reviews': n_reviews,
+        'batch_size': batch_size,
+        'elapsed_sec': round(elapsed, 3),
+        'reviews_per_sec': round(n_reviews / elapsed, 2) if elapsed > 0 else None,
+        'real_tokens': real_tokens,
+        'padded_tokens': padded_tokens,
+        'padding_waste': round(1 - real_tokens / padded_tokens, 4) if padded_tokens else 0.0
+    }
+    if quiet:
+        return report
+    logger.info(
+        f"BERT : {report['n_reviews']} avis en {report['elapsed_sec']}s "
+        f"({report['reviews_per_sec']} avis/s, batch_size={batch_size}, "
+        f"padding perdu={report['padding_waste']:.1%})"
+    )
+    return report
+
+# Label TextBlob / VADER d'un score isolé (voir categorization_labels)
 def categorization_label(col):
-    if col<=(-0.6) and col>=(-1):
-        return "trés négatif"
-    if col<(-0.2) and col>(-0.6):
-        return "négatif"
-    if col<=(0.2) and col>=(-0.2):
-        return "neutre"
-    if col<(0.6) and col>(0.2):
-        return "positif"
-    if col<=(1) and col>=(0.6):
-        return "très positif"
-    else:
-        return "Null"
+    return categorization_labels(pd.Series([col], dtype=float)).iloc[0]
 
-# Extraction des mots-clés avec TF-IDF
-def extract_keywords(df, n_keywords=10):
+# Labels TextBlob / VADER d'une colonne de scores, calculés en une passe vectorisée
+def categorization_labels(scores):
+    """
+    Bornes : [-1, -0.6] très négatif, ]-0.6, -0.2[ négatif, [-0.2, 0.2] neutre,
+    ]0.2, 0.6[ positif, [0.6, 1] très positif ; "Null" pour un score manquant ou
+    hors de [-1, 1].
+    :param scores: Series de scores
+    :return: Series de labels (mêmes index)
+    """
+    values = pd.to_numeric(scores, errors='coerce').to_numpy(dtype=float)
+    conditions = [
+        (values >= -1) & (values <= -0.6),
+        (values > -0.6) & (values < -0.2),
+        (values >= -0.2) & (values <= 0.2),
+        (values > 0.2) & (values < 0.6),
+        (values >= 0.6) & (values <= 1),
+    ]
+    return pd.Series(np.select(conditions, SCORE_LABELS, default="Null"), index=scores.index, dtype=object)
+
+# Extraction des mots-clés avec TF-IDF, sous forme de matrice creuse
+def extract_keywords_sparse(df, n_keywords=10):
+    """
+    :param df: DataFrame contenant une colonne 'Content'
+    :param n_keywords: Nombre de mots-clés conservés
+    :return: Tuple (matrice TF-IDF CSR, liste des termes) ou (None, []) en cas d'erreur
+    """
     try:
         vectorizer = TfidfVectorizer(stop_words='english', max_features=n_keywords)
         tfidf_matrix = vectorizer.fit_transform(df['Content'].astype(str))
-        feature_names = vectorizer.get_feature_names_out()
-        docterm = pd.DataFrame(tfidf_matrix.todense(), columns=feature_names)
-        return docterm
+        return tfidf_matrix, list(vectorizer.get_feature_names_out())
     except Exception as e:
-        print(f"Erreur d'extraction des mots-clés : {e}")
+        logger.error(f"Erreur d'extraction des mots-clés : {e}")
+        return None, []
+
+# Extraction des mots-clés avec TF-IDF
+def extract_keywords(df, n_keywords=10):
+    tfidf_matrix, feature_names = extract_keywords_sparse(df, n_keywords)
+    if tfidf_matrix is None:
         return []
+    docterm = pd.DataFrame(tfidf_matrix.todense(), columns=feature_names)
+    return docterm
 
-# Fonction principale d'analyse des sentiments
-def analyze_sentiments(data_frame):
-    
-    tqdm.pandas(desc="Analyse des sentiments TextBlob")
-    # Ajoute les colonnes calculées
-    data_frame['Sentiment_TextBlob'] = data_frame['Content'].progress_apply(analyze_sentiment_textblob)
-    data_frame['Sentiment_TextBlob_label']=data_frame['Sentiment_TextBlob'].apply(categorization_label)
+# Sélectionne les termes les plus fréquents comme TfidfVectorizer(max_features=...)
+def _top_terms(term_counts, n_keywords):
+    terms = sorted(term_counts)
+    if n_keywords is None:
+        return terms
+    positions = top_term_positions([term_counts[term] for term in terms], n_keywords)
+    return [terms[i] for i in positions]
 
-    tqdm.pandas(desc="Analyse des sentiments VADER")
-    data_frame['Sentiment_VADER'] = data_frame['Content'].progress_apply(analyze_sentiment_vader)
-    data_frame['Sentiment_VADER_label']=data_frame['Sentiment_VADER'].apply(categorization_label)
+# Extraction des mots-clés TF-IDF chunk par chunk, sans charger tout le corpus
+def extract_keywords_chunked(chunks, n_keywords=10):
+    """
+    Calcule les mêmes poids que extract_keywords en deux passes sur des chunks :
+    la première compte les fréquences des termes, la seconde calcule les poids.
+    Seuls les compteurs du vocabulaire restent en mémoire.
+    :param chunks: Fonction sans argument renvoyant un nouvel itérateur de DataFrames
+                   (colonne 'Content'), appelée une fois par passe
+    :param n_keywords: Nombre de mots-clés conservés
+    :return: Itérateur de tuples (matrice TF-IDF CSR du chunk, liste des termes)
+    """
+    analyzer = TfidfVectorizer(stop_words='english').build_analyzer()
+    term_counts = Counter()
+    doc_freq = Counter()
+    n_docs = 0
+    for chunk in chunks():
+        for text in chunk['Content'].astype(str):
+            tokens = analyzer(text)
+            term_counts.update(tokens)
+            doc_freq.update(set(tokens))
+            n_docs += 1
 
-    tqdm.pandas(desc="Analyse des sentiments BERT")
-    bert_results = data_frame['Content'].progress_apply(analyze_sentiment_bert)
-    # ajoutt des données dans le data frame
-    data_frame['Sentiment_BERT_Label'] = bert_results.apply(lambda x: x[0])
-    data_frame['Sentiment_BERT_Prob'] = bert_results.apply(lambda x: x[1])
-    
-    return data_frame
+    vocabulary = _top_terms(term_counts, n_keywords)
+    if not vocabulary:
+        logger.error("Erreur d'extraction des mots-clés : vocabulaire vide")
+        return
+    # idf lissé, comme TfidfTransformer(smooth_idf=True)
+    idf = np.log((1 + n_docs) / (1 + np.array([doc_freq[t] for t in vocabulary], dtype=float))) + 1
+    counter = CountVectorizer(stop_words='english', vocabulary=vocabulary)
+    for chunk in chunks():
+        counts = counter.transform(chunk['Content'].astype(str))
+        yield normalize(sparse.csr_matrix(counts.astype(float) @ sparse.diags(idf)), norm='l2'), vocabulary
 
+# Colonnes de scores produites par les modèles (et stockées dans le cache)
+SCORE_COLUMNS = ['Sentiment_TextBlob', 'Sentiment_VADER', 'Sentiment_BERT_Label', 'Sentiment_BERT_Prob']
 
-    
+# Calcule les scores des trois modèles pour une série de textes
+def _score_contents(contents, bert_batch_size, bert_max_length, workers=None, chunk_size=SCORING_CHUNK_SIZE,
+                    bert_chunk_stride=None, metrics=None):
+    scores = pd.DataFrame(index=contents.index)
+
+    if workers and workers > 1:
+        # TextBlob et VADER sont calculés ensemble dans le pool : une seule étape mesurée
+        with measure(metrics, 'sentiment_textblob_vader', rows_in=len(contents)) as record:
+            textblob_scores, vader_scores = score_lexical_parallel(contents, workers, chunk_size)
+            record['rows_out'] = len(textblob_scores)
+        scores['Sentiment_TextBlob'] = pd.Series(textblob_scores, index=contents.index, dtype=float)
+        scores['Sentiment_VADER'] = pd.Series(vader_scores, index=contents.index, dtype=float)
+    else:
+        with measure(metrics, 'sentiment_textblob', rows_in=len(contents)) as record:
+            tqdm.pandas(desc="Analyse des sentiments TextBlob")
+            scores['Sentiment_TextBlob'] = contents.progress_apply(analyze_sentiment_textblob)
+            record['rows_out'] = int(scores['Sentiment_TextBlob'].notna().sum())
+
+        with measure(metrics, 'sentiment_vader', rows_in=len(contents)) as record:
+            tqdm.pandas(desc="Analyse des sentiments VADER")
+            scores['Sentiment_VADER'] = contents.progress_apply(analyze_sentiment_vader)
+            record['rows_out'] = int(scores['Sentiment_VADER'].notna().sum())
+
+    with measure(metrics, 'sentiment_bert', rows_in=len(contents)) as record:
+        bert_results = _score_bert(contents, scores, bert_batch_size, bert_max_length, bert_chunk_stride)
+        record['rows_out'] = int(bert_results.map(lambda x: x[0] is not None).sum())
+    scores['Sentiment_BERT_Label'] = bert_results.apply(lambda x: x[0])
+    scores['Sentiment_BERT_Prob'] = bert_results.apply(lambda x: x[1])
+    return scores
+
+# Résultats BERT (label, probabilité) selon le mode choisi ; le rapport de débit va dans scores.attrs
+def _score_bert(contents, scores, bert_batch_size, bert_max_length, bert_chunk_stride):
+    if bert_chunk_stride:
+        bert_results, report = analyze_sentiment_bert_chunked(
+            contents, batch_size=bert_batch_size or BERT_BATCH_SIZE, max_length=bert_max_length,
+            stride=bert_chunk_stride
+        )
+        bert_results = pd.Series(bert_results, index=contents.index, dtype=object)
+        scores.attrs['bert_throughput'] = report
+    elif bert_batch_size:
+        bert_results, report = analyze_sentiment_bert_batch(
+            contents, batch_size=bert_batch_size, max_length=bert_max_length
+        )
+        bert_results = pd.Series(bert_results, index=contents.index, dtype=object)
+        scores.attrs['bert_throughput'] = report
+    else:
+        tqdm.pandas(desc="Analyse des sentiments BERT")
+        bert_results = contents.progress_apply(analyze_sentiment_bert)
+    return bert_results
+
+# Calcule les scores en ne passant que les avis absents du cache dans les modèles
+def _score_contents_cached(contents, cache, bert_batch_size, bert_max_length, workers=None, chunk_size=SCORING_CHUNK_SIZE,
+                           bert_chunk_stride=None, metrics=None):
+    keys = contents.astype(str).map(cache.key)
+    cached = cache.get_many(keys)
+
+    # Un seul passage par contenu inconnu, même s'il apparaît plusieurs fois
+    missing = ~keys.isin(list(cached)) & ~keys.duplicated()
+    scores = pd.DataFrame(columns=SCORE_COLUMNS)
+    if missing.any():
+        scores = _score_contents(
+            contents[missing], bert_batch_size, bert_max_length, workers, chunk_size, bert_chunk_stride, metrics
+        )
+        new_entries = {
+            keys[idx]: tuple(None if pd.isna(v) else v for v in row)
+            for idx, row in zip(scores.index, scores[SCORE_COLUMNS].itertuples(index=False))
+        }
+        # Un échec de modèle (score manquant) n'est pas mis en cache : l'avis sera réanalysé
+        cache.put_many((key, value) for key, value in new_entries.items() if None not in value)
+        cached.update(new_entries)
+    stats = cache.stats()
+    logger.info(
+        f"Cache de sentiments : {stats['hits']} hits, {stats['misses']} misses "
+        f"(taux {stats['hit_rate']:.1%}, {stats['size']} entrées)"
+    )
+
+    values = pd.DataFrame([cached[k] for k in keys], index=contents.index, columns=SCORE_COLUMNS)
+    values.attrs.update(scores.attrs)
+    values.attrs['sentiment_cache'] = stats
+    return values
+
+# Fonction principale d'analyse des sentiments
+def analyze_sentiments(data_frame, bert_batch_size=BERT_BATCH_SIZE, bert_max_length=BERT_MAX_LENGTH, cache=None,
+                       workers=None, chunk_size=SCORING_CHUNK_SIZE, bert_chunk_stride=None, metrics=None):
+    """
+    Ajoute au DataFrame les scores et labels TextBlob, VADER et BERT.
+    :param data_frame: DataFrame contenant une colonne 'Content'
+    :param bert_batch_size: Taille des lots BERT, None pour l'analyse avis par avis
+    :param bert_max_length: Longueur maximale en tokens pour BERT
+    :param cache: SentimentCache optionnel ; seuls les avis absents du cache sont analysés
+    :param workers: Nombre de processus pour TextBlob et VADER (None ou 1 : séquentiel)
+    :param chunk_size: Nombre de textes par lot envoyé à un processus
+    :param bert_chunk_stride: Si renseigné, les avis longs sont analysés par fenêtres de
+                              bert_max_length tokens chevauchantes de ce nombre de tokens
+                              (voir analyze_sentiment_bert_chunked) au lieu d'être tronqués
+    :param metrics: RunMetrics optionnel ; chaque modèle y est mesuré comme une étape
+    :return: DataFrame enrichi ; les rapports (débit BERT, cache) sont dans data_frame.attrs
+    """
+    if cache is None:
+        scores = _score_contents(
+            data_frame['Content'], bert_batch_size, bert_max_length, workers, chunk_size, bert_chunk_stride, metrics
+        )
+    else:
+        scores = _score_contents_cached(
+            data_frame['Content'], cache, bert_batch_size, bert_max_length, workers, chunk_size, bert_chunk_stride,
+            metrics
+        )
+
+    # Ajoute les colonnes calculées
+    data_frame['Sentiment_TextBlob'] = scores['Sentiment_TextBlob']
+    data_frame['Sentiment_TextBlob_label'] = categorization_labels(data_frame['Sentiment_TextBlob'])
+    data_frame['Sentiment_VADER'] = scores['Sentiment_VADER']
+    data_frame['Sentiment_VADER_label'] = categorization_labels(data_frame['Sentiment_VADER'])
+    # ajoutt des données dans le data frame
+    data_frame['Sentiment_BERT_Label'] = scores['Sentiment_BERT_Label']
+    data_frame['Sentiment_BERT_Prob'] = scores['Sentiment_BERT_Prob']
+    data_frame.attrs.update(scores.attrs)
+
+    return data_frame
@@ -0,0 +1,231 @@
+import hashlib
+import logging
+import os
+import numpy as np
+from collections import Counter
+from importlib import metadata
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+from scipy import sparse
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Nombre de mots-clés conservés par défaut (comme extract_keywords_sparse)
+DEFAULT_N_KEYWORDS = 10
+
+
+# Clé d'un contenu (hash du texte)
+def content_key(text):
+    return hashlib.blake2b(str(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Signature de la tokenisation : les stop words et l'analyseur dépendent de la version de scikit-learn
+def _analyzer_signature():
+    return f"stop_words=english;sklearn={metadata.version('scikit-learn')}"
+
+
+# Sélectionne les termes les plus fréquents exactement comme TfidfVectorizer(max_features=...)
+def top_term_positions(term_counts, n_keywords):
+    """
+    Reprend le tri de scikit-learn : argsort (non stable) des fréquences opposées,
+    rangées dans l'ordre alphabétique des termes. À fréquence égale, les termes
+    retenus dépendent de cet argsort : un tri stable ne donne pas toujours les mêmes.
+    :param term_counts: Fréquences des termes, dans l'ordre alphabétique des termes
+    :param n_keywords: Nombre de termes conservés
+    :return: Positions des termes retenus dans term_counts, croissantes
+    """
+    return np.sort((-np.asarray(term_counts, dtype=np.int64)).argsort()[:n_keywords])
+
+
+# Modèle TF-IDF persistant, mis à jour au fil des nouveaux avis
+class KeywordModel:
+    """
+    Conserve, pour chaque contenu distinct déjà vu, ses comptes de termes et son
+    nombre d'occurrences dans le corpus, ainsi que le vocabulaire complet (ajout
+    seulement), les fréquences des termes et les fréquences documentaires.
+    Une mise à jour ne tokenise que les contenus nouveaux ; les fréquences sont
+    corrigées à partir des seuls contenus dont le nombre d'occurrences a changé.
+    Les mots-clés et les poids obtenus sont identiques à ceux de
+    TfidfVectorizer(stop_words='english', max_features=n_keywords) ajusté sur
+    tout le corpus.
+    """
+
+    def __init__(self):
+        self.analyzer = TfidfVectorizer(stop_words='english').build_analyzer()
+        self.signature = _analyzer_signature()
+        self.terms = []
+        self.term_index = {}
+        self.keys = []
+        self.key_index = {}
+        self.counts = sparse.csr_matrix((0, 0), dtype=np.int64)
+        self.multiplicity = np.zeros(0, dtype=np.int64)
+        self.term_counts = np.zeros(0, dtype=np.int64)
+        self.doc_freq = np.zeros(0, dtype=np.int64)
+
+    @property
+    def n_docs(self):
+        return int(self.multiplicity.sum())
+
+    # Comptes de termes des contenus nouveaux (le vocabulaire est complété au passage)
+    def _count_new(self, texts):
+        indices = []
+        indptr = [0]
+        for text in texts:
+            for term in self.analyzer(text):
+                index = self.term_index.get(term)
+                if index is None:
+                    index = self.term_index[term] = len(self.terms)
+                    self.terms.append(term)
+                indices.append(index)
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.int64)
+        rows = sparse.csr_matrix((data, indices, indptr), shape=(len(texts), len(self.terms)))
+        rows.sum_duplicates()
+        return rows
+
+    def update(self, contents):
+        """
+        Aligne le modèle sur le corpus courant : les contenus absents du modèle sont
+        ajoutés, ceux qui ont disparu du corpus sont retirés.
+        :param contents: Tous les contenus du corpus courant (liste ou Series)
+        :return: Nombre de contenus distincts tokenisés lors de cette mise à jour
+        """
+        keys = [content_key(text) for text in contents]
+        occurrences = Counter(keys)
+        new_texts = {}
+        for key, text in zip(keys, contents):
+            if key not in self.key_index and key not in new_texts:
+                new_texts[key] = str(text)
+
+        if new_texts:
+            new_rows = self._count_new(list(new_texts.values()))
+            self.counts.resize((self.counts.shape[0], len(self.terms)))
+            self.counts = sparse.vstack([self.counts, new_rows], format='csr')
+            for key in new_texts:
+                self.key_index[key] = len(self.keys)
+                self.keys.append(key)
+            self.multiplicity = np.concatenate([self.multiplicity, np.zeros(len(new_texts), dtype=np.int64)])
+            n_new_terms = len(self.terms) - len(self.term_counts)
+            self.term_counts = np.concatenate([self.term_counts, np.zeros(n_new_terms, dtype=np.int64)])
+            self.doc_freq = np.concatenate([self.doc_freq, np.zeros(n_new_terms, dtype=np.int64)])
+
+        target = np.array([occurrences.get(key, 0) for key in self.keys], dtype=np.int64)
+        changed = np.flatnonzero(target != self.multiplicity)
+        if changed.size:
+            rows = self.counts[changed]
+            delta = target[changed] - self.multiplicity[changed]
+            self.term_counts += rows.T @ delta
+            self.doc_freq += (rows > 0).astype(np.int64).T @ delta
+            self.multiplicity = target
+        self._drop_absent()
+        logger.info(
+            f"Modèle de mots-clés : {len(new_texts)} nouveaux contenus tokenisés, "
+            f"{changed.size} contenus modifiés, {self.n_docs} avis au total"
+        )
+        return len(new_texts)
+
+    # Retire les contenus qui ne sont plus dans le corpus (le vocabulaire est conservé)
+    def _drop_absent(self):
+        present = self.multiplicity > 0
+        if present.all():
+            return
+        self.counts = self.counts[np.flatnonzero(present)]
+        self.multiplicity = self.multiplicity[present]
+        self.keys = [key for key, keep in zip(self.keys, present) if keep]
+        self.key_index = {key: i for i, key in enumerate(self.keys)}
+
+    def vocabulary(self, n_keywords=DEFAULT_N_KEYWORDS):
+        """
+        Sélectionne les termes les plus fréquents comme TfidfVectorizer(max_features=...).
+        :param n_keywords: Nombre de mots-clés (None pour tous les termes présents)
+        :return: Tableau des positions des termes retenus, dans l'ordre alphabétique des termes
+        """
+        present = np.flatnonzero(self.term_counts > 0)
+        alphabetical = present[np.argsort(np.array(self.terms, dtype=object)[present], kind='stable')]
+        if n_keywords is not None:
+            alphabetical = alphabetical[top_term_positions(self.term_counts[alphabetical], n_keywords)]
+        return alphabetical
+
+    def transform(self, contents, n_keywords=DEFAULT_N_KEYWORDS):
+        """
+        Poids TF-IDF des avis, calculés à partir des comptes conservés (sans retokeniser).
+        :param contents: Contenus des avis, tous connus du modèle (voir update)
+        :param n_keywords: Nombre de mots-clés conservés
+        :return: Tuple (matrice TF-IDF CSR, liste des termes)
+        """
+        columns = self.vocabulary(n_keywords)
+        if not columns.size:
+            raise ValueError("vocabulaire vide")
+        rows = [self.key_index[content_key(text)] for text in contents]
+        # idf lissé, comme TfidfTransformer(smooth_idf=True)
+        idf = np.log((1 + self.n_docs) / (1 + self.doc_freq[columns].astype(float))) + 1
+        counts = self.counts[rows][:, columns].astype(float)
+        matrix = normalize(sparse.csr_matrix(counts @ sparse.diags(idf)), norm='l2')
+        return matrix, [self.terms[i] for i in columns]
+
+    def save(self, path):
+        """
+        :param path: Chemin du fichier .npz
+        """
+        counts = sparse.csr_matrix(self.counts)
+        np.savez_compressed(
+            path,
+            signature=np.array(self.signature),
+            terms=np.array(self.terms, dtype=str),
+            keys=np.array(self.keys, dtype=str),
+            multiplicity=self.multiplicity,
+            term_counts=self.term_counts,
+            doc_freq=self.doc_freq,
+            data=counts.data,
+            indices=counts.indices,
+            indptr=counts.indptr,
+            shape=np.array(counts.shape)
+        )
+        logger.info(f"Fichier sauvegardé : {path}")
+
+    @classmethod
+    def load(cls, path):
+        """
+        :param path: Chemin du fichier .npz
+        :return: Modèle chargé, ou modèle vide si le fichier est absent ou si la
+                 tokenisation a changé depuis sa création
+        """
+        model = cls()
+        if not os.path.exists(path):
+            return model
+        with np.load(path, allow_pickle=False) as npz:
+            if str(npz['signature']) != model.signature:
+                logger.info("Tokenisation modifiée : reconstruction complète du modèle de mots-clés")
+                return model
+            model.terms = npz['terms'].tolist()
+            model.keys = npz['keys'].tolist()
+            model.multiplicity = npz['multiplicity']
+            model.term_counts = npz['term_counts']
+            model.doc_freq = npz['doc_freq']
+            model.counts = sparse.csr_matrix(
+                (npz['data'], npz['indices'], npz['indptr']), shape=tuple(npz['shape'])
+            )
+        model.term_index = {term: i for i, term in enumerate(model.terms)}
+        model.key_index = {key: i for i, key in enumerate(model.keys)}
+        return model
+
+
+# Extraction des mots-clés avec un modèle persistant mis à jour de façon incrémentale
+def extract_keywords_incremental(df, model_path, n_keywords=DEFAULT_N_KEYWORDS, rebuild=False):
+    """
+    :param df: DataFrame contenant une colonne 'Content' (tout le corpus courant)
+    :param model_path: Chemin du modèle persistant (.npz), mis à jour sur place
+    :param n_keywords: Nombre de mots-clés conservés
+    :param rebuild: Ignorer le modèle existant et le reconstruire sur tout le corpus
+    :return: Tuple (matrice TF-IDF CSR, liste des termes) ou (None, []) en cas d'erreur
+    """
+    try:
+        contents = df['Content'].astype(str).tolist()
+        model = KeywordModel() if rebuild else KeywordModel.load(model_path)
+        model.update(contents)
+        model.save(model_path)
+        return model.transform(contents, n_keywords)
+    except Exception as e:
+        logger.error(f"Erreur d'extraction des mots-clés : {e}")
+        return None, []
@@ -0,0 +1,73 @@
+import logging
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+
+# Sauvegarde une matrice de mots-clés creuse et son vocabulaire dans un .npz
+def save_keywords_npz(path, matrix, terms):
+    """
+    Enregistre la matrice TF-IDF (format CSR) et les termes dans un seul fichier.
+    :param path: Chemin du fichier .npz
+    :param matrix: Matrice creuse (une ligne par avis, une colonne par terme)
+    :param terms: Liste des termes, dans l'ordre des colonnes
+    """
+    matrix = sparse.csr_matrix(matrix)
+    np.savez_compressed(
+        path,
+        data=matrix.data,
+        indices=matrix.indices,
+        indptr=matrix.indptr,
+        shape=np.array(matrix.shape),
+        terms=np.array(list(terms), dtype=str)
+    )
+    logger.info(f"Fichier sauvegardé : {path}")
+
+
+# Charge une matrice de mots-clés sans jamais la densifier
+def load_keywords(path):
+    """
+    Charge les mots-clés depuis un .npz (format creux) ou, à défaut, depuis
+    l'ancien CSV dense, converti en matrice creuse.
+    :param path: Chemin du fichier .npz ou .csv
+    :return: Tuple (matrice CSR, liste des termes)
+    """
+    if os.path.splitext(path)[1] == '.csv':
+        df = pd.read_csv(path)
+        return sparse.csr_matrix(df.to_numpy(dtype=float)), list(df.columns)
+    with np.load(path, allow_pickle=False) as npz:
+        matrix = sparse.csr_matrix(
+            (npz['data'], npz['indices'], npz['indptr']), shape=tuple(npz['shape'])
+        )
+        return matrix, npz['terms'].tolist()
+
+
+# Statistiques par terme calculées directement sur la matrice creuse
+def keyword_aggregates(matrix, terms):
+    """
+    :param matrix: Matrice TF-IDF creuse
+    :param terms: Liste des termes
+    :return: DataFrame indexé par terme (mean, sum, max, n_reviews), trié par moyenne décroissante
+    """
+    matrix = sparse.csc_matrix(matrix)
+    n_rows = matrix.shape[0] or 1
+    sums = np.asarray(matrix.sum(axis=0)).ravel()
+    aggregates = pd.DataFrame({
+        'mean': sums / n_rows,
+        'sum': sums,
+        'max': matrix.max(axis=0).toarray().ravel(),
+        'n_reviews': np.diff(matrix.indptr)
+    }, index=pd.Index(terms, name='term'))
+    return aggregates.sort_values('mean', ascending=False)
+
+
+# Poids moyen de chaque terme (entrée du nuage de mots)
+def keyword_means(matrix, terms):
+    """
+    :return: Series terme -> poids TF-IDF moyen, triée par ordre décroissant
+    """
+    return keyword_aggregates(matrix, terms)['mean']
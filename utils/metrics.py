@@ -0,0 +1,198 @@
+import contextlib
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from datetime import datetime
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Nombre de fonctions listées dans le résumé texte de chaque profil
+PROFILE_TOP_FUNCTIONS = 25
+
+# Préfixe des métriques exportées au format Prometheus
+PROMETHEUS_PREFIX = 'trustpilot_pipeline'
+
+
+# Pic de mémoire résidente du processus, en Mo (None si indisponible)
+def peak_rss_mb():
+    """
+    Utilise resource (Linux, macOS) ; sous Windows, psutil s'il est installé.
+    """
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss est en octets sous macOS, en kilo-octets ailleurs
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        memory = psutil.Process().memory_info()
+        return round(getattr(memory, 'peak_wset', memory.rss) / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+
+# Mesures d'une exécution du pipeline, étape par étape
+class RunMetrics:
+    """
+    Chaque étape est mesurée avec `with metrics.stage(nom, rows_in=...) as record:` :
+    durée réelle, temps CPU du processus, pic de mémoire et lignes en entrée/sortie
+    (record['rows_out'] est renseigné par l'appelant). Une étape exécutée plusieurs
+    fois (mode flux, un appel par chunk) est cumulée dans le rapport.
+    Le temps CPU est celui du processus : il n'inclut pas les processus du pool
+    TextBlob/VADER et se chevauche entre étapes concurrentes en mode flux.
+    """
+
+    def __init__(self, profile_dir=None):
+        """
+        :param profile_dir: Si renseigné, chaque étape est profilée avec cProfile et son
+                            profil écrit dans ce répertoire (.prof et résumé .txt)
+        """
+        self.profile_dir = profile_dir
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.start = time.perf_counter()
+        self.records = []
+        self.profiles = {}
+        self.status = 'running'
+        self.error = None
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name, rows_in=None):
+        record = {'stage': name, 'rows_in': rows_in, 'rows_out': None}
+        profiler = self._profiler(name)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError as e:
+                # Un seul profileur actif à la fois (étapes concurrentes du mode flux)
+                logger.warning(f"Profilage de l'étape {name} ignoré : {e}")
+                profiler = None
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record['wall_sec'] = time.perf_counter() - wall_start
+            record['cpu_sec'] = time.process_time() - cpu_start
+            record['peak_rss_mb'] = peak_rss_mb()
+            with self.lock:
+                self.records.append(record)
+
+    # Profil cProfile d'une étape (un seul par nom d'étape, cumulé d'un appel à l'autre)
+    def _profiler(self, name):
+        if not self.profile_dir:
+            return None
+        with self.lock:
+            if name not in self.profiles:
+                self.profiles[name] = cProfile.Profile()
+            return self.profiles[name]
+
+    def fail(self, error):
+        self.status = 'failed'
+        self.error = f"{type(error).__name__}: {error}"
+
+    def report(self):
+        """
+        :return: Dictionnaire du rapport (statut, durée totale, mesures cumulées par étape)
+        """
+        stages = {}
+        with self.lock:
+            records = list(self.records)
+        for record in records:
+            stage = stages.setdefault(record['stage'], {
+                'stage': record['stage'], 'calls': 0, 'wall_sec': 0.0, 'cpu_sec': 0.0,
+                'peak_rss_mb': None, 'rows_in': None, 'rows_out': None
+            })
+            stage['calls'] += 1
+            stage['wall_sec'] += record['wall_sec']
+            stage['cpu_sec'] += record['cpu_sec']
+            if record['peak_rss_mb'] is not None:
+                stage['peak_rss_mb'] = max(stage['peak_rss_mb'] or 0, record['peak_rss_mb'])
+            for key in ('rows_in', 'rows_out'):
+                if record[key] is not None:
+                    stage[key] = (stage[key] or 0) + record[key]
+        for stage in stages.values():
+            stage['wall_sec'] = round(stage['wall_sec'], 3)
+            stage['cpu_sec'] = round(stage['cpu_sec'], 3)
+        return {
+            'started_at': self.started_at,
+            'status': 'success' if self.status == 'running' else self.status,
+            'error': self.error,
+            'wall_sec': round(time.perf_counter() - self.start, 3),
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': list(stages.values())
+        }
+
+    def to_prometheus(self):
+        """
+        :return: Rapport au format texte Prometheus (une jauge par mesure et par étape)
+        """
+        report = self.report()
+        metrics = [
+            ('stage_wall_seconds', 'wall_sec', "Durée réelle de l'étape"),
+            ('stage_cpu_seconds', 'cpu_sec', "Temps CPU du processus pendant l'étape"),
+            ('stage_peak_rss_megabytes', 'peak_rss_mb', "Pic de mémoire résidente à la fin de l'étape"),
+            ('stage_rows_in', 'rows_in', "Lignes en entrée de l'étape"),
+            ('stage_rows_out', 'rows_out', "Lignes en sortie de l'étape"),
+        ]
+        lines = []
+        for metric, key, description in metrics:
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{metric} {description}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{metric} gauge")
+            for stage in report['stages']:
+                if stage[key] is not None:
+                    lines.append(f'{PROMETHEUS_PREFIX}_{metric}{{stage="{stage["stage"]}"}} {stage[key]}')
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_run_wall_seconds gauge")
+        lines.append(f"{PROMETHEUS_PREFIX}_run_wall_seconds {report['wall_sec']}")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_run_success gauge")
+        lines.append(f"{PROMETHEUS_PREFIX}_run_success {int(report['status'] == 'success')}")
+        return "\n".join(lines) + "\n"
+
+    def save(self, json_path=None, prometheus_path=None):
+        """
+        Écrit le rapport JSON, le rapport Prometheus et les profils des étapes.
+        :param json_path: Fichier JSON du rapport (None pour ne pas l'écrire)
+        :param prometheus_path: Fichier texte Prometheus (None pour ne pas l'écrire)
+        """
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(self.report(), f, indent=2, ensure_ascii=False)
+            logger.info(f"Rapport d'exécution sauvegardé : {json_path}")
+        if prometheus_path:
+            with open(prometheus_path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+            logger.info(f"Métriques Prometheus sauvegardées : {prometheus_path}")
+        if self.profiles:
+            self._save_profiles()
+
+    # Un .prof (pour snakeviz, pstats...) et un résumé des fonctions les plus coûteuses par étape
+    def _save_profiles(self):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        for name, profiler in self.profiles.items():
+            profiler.create_stats()
+            if not profiler.stats:
+                continue  # Étape jamais profilée (profileur déjà actif)
+            path = os.path.join(self.profile_dir, f"{name}.prof")
+            profiler.dump_stats(path)
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+            with open(os.path.join(self.profile_dir, f"{name}.txt"), 'w', encoding='utf-8') as f:
+                f.write(summary.getvalue())
+        logger.info(f"Profils des étapes sauvegardés dans {self.profile_dir}")
+
+
+# Mesure une étape si des métriques sont collectées, ne fait rien sinon
+def measure(metrics, name, rows_in=None):
+    if metrics is None:
+        return contextlib.nullcontext({})
+    return metrics.stage(name, rows_in)
@@ -0,0 +1,193 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de textes regroupés en un lot
+DEFAULT_MAX_BATCH_SIZE = 32
+
+# Attente maximale (ms) d'une requête avant le départ de son lot, même incomplet
+DEFAULT_MAX_WAIT_MS = 10
+
+# Nombre maximal de requêtes en attente ; au-delà, les nouvelles sont refusées
+DEFAULT_MAX_QUEUE = 1000
+
+# Nombre de mesures récentes conservées pour les percentiles
+LATENCY_WINDOW = 10_000
+
+_STOP = object()
+
+
+# Statistiques du service : latences récentes, tailles de lots, profondeur de file
+class ServiceStats:
+    def __init__(self, window=LATENCY_WINDOW):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.queue_waits = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self.rejected = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        self.started = time.perf_counter()
+
+    def record_batch(self, n_texts, queue_waits, latencies, failed=False):
+        with self.lock:
+            self.batches += 1
+            self.requests += len(latencies)
+            self.texts += n_texts
+            self.errors += len(latencies) if failed else 0
+            self.batch_sizes.append(n_texts)
+            self.queue_waits.extend(queue_waits)
+            self.latencies.extend(latencies)
+
+    def record_queue_depth(self, depth):
+        with self.lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def record_rejected(self):
+        with self.lock:
+            self.rejected += 1
+
+    def snapshot(self, queue_depth):
+        """
+        :param queue_depth: Nombre de requêtes actuellement en attente
+        :return: Dictionnaire des statistiques (latences en ms)
+        """
+        with self.lock:
+            latencies = np.array(self.latencies) * 1000
+            queue_waits = np.array(self.queue_waits) * 1000
+            batch_sizes = np.array(self.batch_sizes)
+            uptime = time.perf_counter() - self.started
+            return {
+                'uptime_sec': round(uptime, 1),
+                'requests': self.requests,
+                'texts': self.texts,
+                'batches': self.batches,
+                'rejected': self.rejected,
+                'errors': self.errors,
+                'texts_per_sec': round(self.texts / uptime, 2) if uptime > 0 else None,
+                'mean_batch_size': round(float(batch_sizes.mean()), 2) if batch_sizes.size else None,
+                'queue_depth': queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+                'latency_ms': _percentiles(latencies),
+                'queue_wait_ms': _percentiles(queue_waits)
+            }
+
+
+def _percentiles(values):
+    if not values.size:
+        return None
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        'p50': round(float(p50), 2), 'p95': round(float(p95), 2), 'p99': round(float(p99), 2),
+        'max': round(float(values.max()), 2)
+    }
+
+
+# Regroupe les requêtes concurrentes en lots pour un modèle chargé une seule fois
+class MicroBatcher:
+    """
+    Les requêtes sont déposées dans une file bornée ; un thread unique les regroupe
+    et appelle score_batch sur le lot. Un lot part dès qu'il atteint max_batch_size
+    textes, ou au plus tard max_wait_ms après l'arrivée de sa première requête :
+    une requête isolée n'attend donc jamais plus que ce délai. Une requête qui ferait
+    dépasser max_batch_size ouvre le lot suivant ; seule une requête plus grande que
+    max_batch_size à elle seule forme un lot plus grand (voir score_texts).
+    """
+
+    def __init__(self, score_batch, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                 max_queue=DEFAULT_MAX_QUEUE):
+        """
+        :param score_batch: Fonction liste de textes -> liste de résultats (même ordre)
+        :param max_batch_size: Nombre maximal de textes par lot
+        :param max_wait_ms: Attente maximale d'une requête avant le départ de son lot
+        :param max_queue: Nombre maximal de requêtes en attente
+        """
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.stats = ServiceStats()
+        # Requête retirée de la file mais reportée au lot suivant
+        self.pending = None
+        self.thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self.thread.start()
+
+    def submit(self, texts):
+        """
+        :param texts: Liste de textes d'une requête
+        :return: Future dont le résultat est la liste des résultats de ces textes
+        :raises queue.Full: si la file d'attente est pleine
+        """
+        future = Future()
+        try:
+            self.queue.put_nowait((list(texts), future, time.perf_counter()))
+        except queue.Full:
+            self.stats.record_rejected()
+            raise
+        self.stats.record_queue_depth(self.queue.qsize())
+        return future
+
+    def _next_batch(self, first):
+        batch = [first]
+        n_texts = len(first[0])
+        deadline = first[2] + self.max_wait
+        while n_texts < self.max_batch_size:
+            # Délai écoulé : on ne prend plus que les requêtes déjà en file, sans attendre
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self.queue.put(_STOP)
+                break
+            if n_texts + len(item[0]) > self.max_batch_size:
+                self.pending = item
+                break
+            batch.append(item)
+            n_texts += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            first, self.pending = self.pending or self.queue.get(), None
+            if first is _STOP:
+                return
+            batch = self._next_batch(first)
+            texts = [text for item in batch for text in item[0]]
+            started = time.perf_counter()
+            queue_waits = [started - enqueued for _, _, enqueued in batch]
+            try:
+                results = self.score_batch(texts)
+            except Exception as e:
+                logger.exception(f"Échec de l'analyse d'un lot de {len(texts)} textes")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                self.stats.record_batch(len(texts), queue_waits, [time.perf_counter() - t for _, _, t in batch], True)
+                continue
+            position = 0
+            for item_texts, future, _ in batch:
+                future.set_result(results[position:position + len(item_texts)])
+                position += len(item_texts)
+            finished = time.perf_counter()
+            self.stats.record_batch(len(texts), queue_waits, [finished - enqueued for _, _, enqueued in batch])
+
+    def stats_snapshot(self):
+        return self.stats.snapshot(self.queue.qsize())
+
+    def close(self):
+        """
+        Arrête le thread une fois les requêtes déjà en file traitées.
+        """
+        self.queue.put(_STOP)
+        self.thread.join()
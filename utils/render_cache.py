@@ -0,0 +1,163 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Nombre d'images conservées en mémoire par défaut
+RENDER_CACHE_SIZE = 8
+
+
+# Clé d'un rendu : hash des fréquences et des paramètres d'affichage
+def render_key(frequencies, **params):
+    """
+    :param frequencies: Dictionnaire ou Series terme -> poids
+    :param params: Paramètres du rendu (taille, couleurs, ...)
+    :return: Clé hexadécimale, identique pour des entrées identiques
+    """
+    digest = hashlib.sha256()
+    for term, weight in sorted((str(t), float(w)) for t, w in frequencies.items()):
+        digest.update(f"{term}\0{weight!r}\n".encode("utf-8"))
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Cache LRU d'images PNG, en mémoire et optionnellement sur disque
+class RenderCache:
+    """
+    Garde les `max_entries` derniers rendus en mémoire. Si `directory` est
+    fourni, chaque rendu y est aussi écrit en PNG et relu lorsqu'il a été évincé
+    de la mémoire (ou après un redémarrage du serveur). Le répertoire est borné de
+    la même façon : la date de modification d'un fichier est mise à jour à chaque
+    lecture, et les fichiers les plus anciens au-delà de `max_entries` sont supprimés.
+    """
+
+    def __init__(self, max_entries=RENDER_CACHE_SIZE, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.directory, key + ".png")
+
+    def get(self, key):
+        """
+        :return: Octets PNG en cache, ou None
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        if self.directory and os.path.exists(self._disk_path(key)):
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    png = f.read()
+                self._touch(self._disk_path(key))
+            except FileNotFoundError:
+                # Évincé par un autre processus entre-temps
+                return None
+            self._remember(key, png)
+            return png
+        return None
+
+    def put(self, key, png):
+        self._remember(key, png)
+        if self.directory:
+            tmp_path = self._disk_path(key) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(png)
+            os.replace(tmp_path, self._disk_path(key))
+            self._touch(self._disk_path(key))
+            self._prune_disk()
+
+    # Marque un fichier comme récemment utilisé
+    @staticmethod
+    def _touch(path):
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    # Supprime les fichiers les moins récemment utilisés au-delà de max_entries
+    def _prune_disk(self):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".png"):
+                try:
+                    files.append((entry.stat().st_mtime_ns, entry.path))
+                except FileNotFoundError:
+                    continue
+        files.sort()
+        for _, path in files[:max(0, len(files) - self.max_entries)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    # Ajoute une entrée en mémoire en évinçant la moins récemment utilisée
+    def _remember(self, key, png):
+        with self.lock:
+            self.entries[key] = png
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get_or_render(self, key, render):
+        """
+        :param key: Clé du rendu (voir render_key)
+        :param render: Fonction sans argument produisant les octets PNG
+        :return: Octets PNG, rendus seulement en cas d'absence dans le cache
+        """
+        png = self.get(key)
+        if png is not None:
+            with self.lock:
+                self.hits += 1
+            return png
+        with self.lock:
+            self.misses += 1
+        png = render()
+        self.put(key, png)
+        return png
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# Génère le nuage de mots au format PNG
+def render_wordcloud_png(frequencies, width=800, height=400, background_color="white", colormap="coolwarm"):
+    """
+    :param frequencies: Dictionnaire ou Series terme -> poids
+    :return: Octets PNG de l'image
+    """
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(
+        width=width,
+        height=height,
+        background_color=background_color,
+        colormap=colormap
+    ).generate_from_frequencies(dict(frequencies))
+    buffer = io.BytesIO()
+    wordcloud.to_image().save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# Nuage de mots mémoïsé : ne le régénère que si les fréquences ou la taille changent
+def cached_wordcloud_png(cache, frequencies, **params):
+    """
+    :param cache: RenderCache
+    :param frequencies: Dictionnaire ou Series terme -> poids
+    :param params: Paramètres transmis à render_wordcloud_png
+    :return: Octets PNG
+    """
+    key = render_key(frequencies, kind="wordcloud", **params)
+    return cache.get_or_render(key, lambda: render_wordcloud_png(frequencies, **params))
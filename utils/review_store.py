@@ -0,0 +1,205 @@
+import json
+import logging
+import os
+import shutil
+import pandas as pd
+from utils.dashboard_data import build_cube
+from utils.storage import apply_schema, load_frame, save_frame
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Fichiers d'une partition mensuelle et index des partitions
+PARTITION_REVIEWS = 'reviews.parquet'
+PARTITION_CUBE = 'cube.parquet'
+MANIFEST_FILE = 'manifest.json'
+
+
+# Bornes de lignes [lo, hi[ d'un intervalle de jours, la fin étant incluse au jour près
+def _day_bounds(start, end):
+    lo = pd.Timestamp(start).normalize() if start is not None else None
+    hi = pd.Timestamp(end).normalize() + pd.Timedelta(days=1) if end is not None else None
+    return lo, hi
+
+
+# Avis analysés partitionnés par mois, triés par date dans chaque partition
+class ReviewStore:
+    """
+    Chaque mois est stocké dans son propre répertoire (AAAA-MM) : les avis triés par
+    date (Parquet typé : label BERT catégoriel, note en int8) et le cube
+    d'agrégats jour x label x note du mois. Le manifeste liste les partitions avec
+    leurs bornes de dates : une requête ne lit que les mois qui recoupent
+    l'intervalle demandé, et seules les partitions de bord sont découpées, par
+    recherche dichotomique sur les dates triées.
+    """
+
+    def __init__(self, directory):
+        """
+        :param directory: Répertoire du stockage (créé à la première écriture)
+        """
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+        self.partitions = self._load_manifest()
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, encoding='utf-8') as f:
+            return json.load(f)['partitions']
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'partitions': self.partitions}, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def exists(self):
+        return bool(self.partitions)
+
+    def _partition_path(self, month, name):
+        return os.path.join(self.directory, month, name)
+
+    # Avis datés, typés et triés par date, regroupés par mois
+    @staticmethod
+    def _by_month(data):
+        data = apply_schema(data)
+        undated = int(data['Date'].isna().sum())
+        if undated:
+            logger.warning(f"{undated} avis sans date ignorés par le stockage partitionné")
+        data = data[data['Date'].notna()].sort_values('Date', kind='stable')
+        return data.groupby(data['Date'].dt.strftime('%Y-%m'), sort=True)
+
+    # Écrit une partition (avis et cube) si son contenu a changé ; renvoie True si elle a été réécrite
+    def _write_partition(self, month, partition, partitions):
+        partition = partition.reset_index(drop=True)
+        fingerprint = str(int(pd.util.hash_pandas_object(partition, index=False).sum()))
+        partitions[month] = {
+            'n_rows': len(partition),
+            'min_date': partition['Date'].iloc[0].isoformat(),
+            'max_date': partition['Date'].iloc[-1].isoformat(),
+            'fingerprint': fingerprint
+        }
+        if self.partitions.get(month, {}).get('fingerprint') == fingerprint:
+            return False
+        os.makedirs(os.path.join(self.directory, month), exist_ok=True)
+        save_frame(partition, self._partition_path(month, PARTITION_REVIEWS))
+        cube = build_cube(partition).drop(columns='Month_Year')
+        save_frame(cube, self._partition_path(month, PARTITION_CUBE), typed=False)
+        return True
+
+    def write(self, data):
+        """
+        Range les avis dans leurs partitions mensuelles. Une partition dont le
+        contenu n'a pas changé depuis la dernière écriture n'est pas réécrite, et
+        les mois absents de `data` sont supprimés.
+        :param data: DataFrame des avis analysés (tout le corpus)
+        :return: Nombre de partitions réécrites
+        """
+        written = 0
+        partitions = {}
+        for month, partition in self._by_month(data):
+            written += self._write_partition(month, partition, partitions)
+
+        for month in set(self.partitions) - set(partitions):
+            shutil.rmtree(os.path.join(self.directory, month), ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+        self.partitions = partitions
+        self._save_manifest()
+        logger.info(f"Stockage partitionné : {written} partitions réécrites sur {len(partitions)}")
+        return written
+
+    def append(self, data):
+        """
+        Ajoute des avis aux partitions existantes (traitement en flux, chunk par
+        chunk) : seuls les mois présents dans `data` sont relus et réécrits.
+        :param data: DataFrame d'avis analysés absents du stockage
+        :return: Nombre de partitions réécrites
+        """
+        written = 0
+        partitions = dict(self.partitions)
+        for month, partition in self._by_month(data):
+            if month in self.partitions:
+                existing = load_frame(self._partition_path(month, PARTITION_REVIEWS))
+                partition = apply_schema(pd.concat([existing, partition], ignore_index=True))
+                partition = partition.sort_values('Date', kind='stable')
+            written += self._write_partition(month, partition, partitions)
+        os.makedirs(self.directory, exist_ok=True)
+        self.partitions = partitions
+        self._save_manifest()
+        return written
+
+    def clear(self):
+        """
+        Supprime toutes les partitions et le manifeste.
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.partitions = {}
+
+    def months(self, start=None, end=None):
+        """
+        :return: Mois (AAAA-MM) dont les avis recoupent l'intervalle de jours [start, end]
+        """
+        lo, hi = _day_bounds(start, end)
+        return [
+            month for month, info in sorted(self.partitions.items())
+            if (lo is None or pd.Timestamp(info['max_date']) >= lo)
+            and (hi is None or pd.Timestamp(info['min_date']) < hi)
+        ]
+
+    def query(self, start=None, end=None, labels=None, ratings=None, columns=None, limit=None, newest_first=False):
+        """
+        :param start: Date de début (incluse), None pour ne pas borner
+        :param end: Date de fin (incluse au jour près), None pour ne pas borner
+        :param labels: Labels BERT retenus (None pour tous)
+        :param ratings: Tuple (note min, note max) (None pour toutes)
+        :param columns: Colonnes à lire (None pour toutes)
+        :param limit: Nombre maximal d'avis renvoyés ; la lecture s'arrête dès qu'il est atteint
+        :param newest_first: Parcourir les partitions du mois le plus récent au plus ancien
+        :return: DataFrame des avis correspondants
+        """
+        lo, hi = _day_bounds(start, end)
+        read_columns = None
+        if columns is not None:
+            read_columns = list(dict.fromkeys(list(columns) + ['Date', 'Sentiment_BERT_Label', 'Rating']))
+        months = self.months(start, end)
+        if newest_first:
+            months.reverse()
+
+        frames = []
+        n_rows = 0
+        for month in months:
+            partition = load_frame(self._partition_path(month, PARTITION_REVIEWS), columns=read_columns)
+            # Dates triées : seules les partitions de bord sont découpées
+            dates = partition['Date'].to_numpy()
+            first = dates.searchsorted(lo.to_datetime64(), 'left') if lo is not None else 0
+            last = dates.searchsorted(hi.to_datetime64(), 'left') if hi is not None else len(dates)
+            partition = partition.iloc[first:last]
+            mask = pd.Series(True, index=partition.index)
+            if labels is not None:
+                mask &= partition['Sentiment_BERT_Label'].isin([str(label) for label in labels])
+            if ratings is not None:
+                mask &= partition['Rating'].between(*ratings)
+            partition = partition[mask]
+            if newest_first:
+                partition = partition.iloc[::-1]
+            if columns is not None:
+                partition = partition[list(columns)]
+            frames.append(partition)
+            n_rows += len(partition)
+            if limit is not None and n_rows >= limit:
+                break
+
+        if not frames:
+            return apply_schema(pd.DataFrame(columns=columns or []))
+        result = pd.concat(frames, ignore_index=True)
+        return result.head(limit) if limit is not None else result
+
+    def cube(self):
+        """
+        :return: Cube d'agrégats de tout le stockage (voir dashboard_data.build_cube),
+                 assemblé à partir des cubes mensuels sans relire les avis
+        """
+        cubes = [load_frame(self._partition_path(month, PARTITION_CUBE)) for month in sorted(self.partitions)]
+        cube = pd.concat(cubes, ignore_index=True)
+        cube['Month_Year'] = cube['Day'].dt.to_period('M')
+        return cube
@@ -0,0 +1,141 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.clean_data import clean_and_structure_frame
+from utils.dashboard_data import model_agreement, MODEL_AGREEMENT_FILE
+from utils.dedup import analyze_sentiments_deduplicated
+from utils.extract_sentiment import extract_keywords_sparse, analyze_sentiments, model_signature
+from utils.keywords_io import save_keywords_npz
+from utils.metrics import measure
+from utils.scrape_data import scrape_trustpilot_reviews, reviews_url, TokenBucket, DEFAULT_CONCURRENCY, DEFAULT_RATE
+from utils.sentiment_cache import SentimentCache
+from utils.storage import DEFAULT_FORMAT, dataset_path, save_frame
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Nombre d'entreprises scrapées en même temps
+DEFAULT_PARALLEL_COMPANIES = 4
+
+# Débit global vers Trustpilot, toutes entreprises confondues (requêtes par seconde)
+DEFAULT_TOTAL_RATE = 2.0
+
+# Sous-répertoire des sorties partitionnées par entreprise
+COMPANIES_DIR = 'companies'
+
+
+# Répertoire des sorties d'une entreprise
+def company_dir(data_dir, domain):
+    """
+    :param data_dir: Répertoire des données
+    :param domain: Domaine de l'entreprise (ex. 'www.teslamotors.com')
+    :return: Chemin du répertoire (créé si absent)
+    """
+    path = os.path.join(data_dir, COMPANIES_DIR, domain)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# Scrape, nettoie et extrait les mots-clés d'une entreprise (exécuté dans un thread par entreprise)
+def _collect_company(domain, data_dir, storage_format, concurrency, rate, total_bucket, num_pages, truncate, started):
+    # Début mesuré ici et non à la soumission : la durée n'inclut pas l'attente d'un thread libre
+    started[domain] = time.perf_counter()
+    output_dir = company_dir(data_dir, domain)
+    bucket = TokenBucket(rate, parent=total_bucket)
+    scraped = scrape_trustpilot_reviews(num_pages, reviews_url(domain), concurrency, rate, bucket=bucket)
+    if scraped.empty:
+        return None
+    save_frame(scraped, dataset_path(output_dir, 'scrape_data', storage_format), typed=False)
+
+    cleaned = clean_and_structure_frame(scraped, truncate=truncate)
+    if cleaned is None or cleaned.empty:
+        return None
+    save_frame(cleaned, dataset_path(output_dir, 'clean_data', storage_format))
+
+    keywords_matrix, keywords_terms = extract_keywords_sparse(df=cleaned)
+    if keywords_matrix is not None:
+        save_keywords_npz(os.path.join(output_dir, 'keywords_data.npz'), keywords_matrix, keywords_terms)
+    return cleaned
+
+
+# Traite plusieurs entreprises : scraping en parallèle, analyse avec un seul modèle BERT partagé
+def run_companies(domains, data_dir, storage_format=DEFAULT_FORMAT, parallel=DEFAULT_PARALLEL_COMPANIES,
+                  concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, total_rate=DEFAULT_TOTAL_RATE,
+                  num_pages=None, use_cache=True, cache_file=None, workers=None, dedup_threshold=None,
+                  long_reviews=False, bert_chunk_stride=None, metrics=None):
+    """
+    Les entreprises sont scrapées et nettoyées en parallèle (`parallel` threads),
+    chacune avec son propre limiteur de débit (`rate`) et sous une limite globale
+    (`total_rate`) commune à tout Trustpilot. L'analyse des sentiments se fait dans
+    le thread appelant, entreprise par entreprise dès que son scraping est terminé :
+    le modèle BERT et le cache de sentiments ne sont chargés qu'une fois, et le
+    scraping des autres entreprises continue pendant l'analyse.
+    Les sorties sont écrites dans data_dir/companies/<domaine>/.
+    :param domains: Liste de domaines (ex. ['www.teslamotors.com', 'www.bmw.com'])
+    :param data_dir: Répertoire des données
+    :param storage_format: Format des fichiers de sortie ('parquet', 'csv')
+    :param parallel: Nombre d'entreprises scrapées en même temps
+    :param concurrency: Nombre de requêtes simultanées par entreprise
+    :param rate: Requêtes par seconde par entreprise
+    :param total_rate: Requêtes par seconde, toutes entreprises confondues
+    :param num_pages: Nombre de pages par entreprise, None pour toutes
+    :param use_cache: Utiliser le cache des résultats de sentiment
+    :param cache_file: Chemin du cache SQLite (partagé par toutes les entreprises)
+    :param workers: Nombre de processus pour TextBlob et VADER
+    :param dedup_threshold: Si renseigné, seul un avis par groupe de doublons est analysé
+    :param long_reviews: Ne pas tronquer les contenus (analyse BERT par fenêtres)
+    :param bert_chunk_stride: Chevauchement des fenêtres BERT si long_reviews
+    :param metrics: RunMetrics optionnel
+    :return: Dictionnaire domaine -> résumé (statut, nombre d'avis, durée)
+    """
+    total_bucket = TokenBucket(total_rate, capacity=max(1, parallel))
+    summary = {}
+    started = {}
+    cache = None
+    if use_cache:
+        cache = SentimentCache(cache_file, model_signature(bert_chunk_stride=bert_chunk_stride))
+
+    try:
+        with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="company") as pool:
+            futures = {}
+            for domain in dict.fromkeys(domains):
+                futures[pool.submit(
+                    _collect_company, domain, data_dir, storage_format, concurrency, rate, total_bucket,
+                    num_pages, not long_reviews, started
+                )] = domain
+
+            for future in as_completed(futures):
+                domain = futures[future]
+                try:
+                    cleaned = future.result()
+                    if cleaned is None:
+                        logger.warning(f"{domain} : aucun avis récupéré.")
+                        summary[domain] = {'status': 'empty', 'n_reviews': 0}
+                        continue
+
+                    kwargs = {
+                        'cache': cache, 'workers': workers, 'bert_chunk_stride': bert_chunk_stride, 'metrics': metrics
+                    }
+                    with measure(metrics, 'score_company', rows_in=len(cleaned)) as record:
+                        if dedup_threshold:
+                            analyzed = analyze_sentiments_deduplicated(cleaned, threshold=dedup_threshold, **kwargs)
+                        else:
+                            analyzed = analyze_sentiments(data_frame=cleaned, **kwargs)
+                        record['rows_out'] = len(analyzed)
+                    save_frame(analyzed, dataset_path(company_dir(data_dir, domain), 'sentiments_analyze', storage_format))
+                    save_frame(
+                        model_agreement(analyzed), os.path.join(company_dir(data_dir, domain), MODEL_AGREEMENT_FILE),
+                        typed=False
+                    )
+                    summary[domain] = {'status': 'success', 'n_reviews': len(analyzed)}
+                except Exception as e:
+                    logger.exception(f"{domain} : échec du traitement")
+                    summary[domain] = {'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+                finally:
+                    summary[domain]['elapsed_sec'] = round(time.perf_counter() - started[domain], 2)
+                    logger.info(f"{domain} : {summary[domain]['status']} en {summary[domain]['elapsed_sec']}s")
+    finally:
+        if cache is not None:
+            cache.close()
+    return summary
@@ -1,92 +1,505 @@
-import streamlit as st
 import pandas as pd
 import time
 import logging
 import json
+import os
+import random
+import hashlib
+import re
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
 
 # Configurer les logs
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-base_url = "https://www.trustpilot.com/review/www.teslamotors.com"
-response = requests.get(base_url)
+# Paramètres par défaut du moteur de récupération concurrent
+BUSINESS_URL = "https://www.trustpilot.com/review/www.teslamotors.com"
+REVIEWS_URL = BUSINESS_URL + "?page="
+DEFAULT_CONCURRENCY = 4       # Nombre de pages récupérées en parallèle
+DEFAULT_RATE = 0.5            # Requêtes par seconde autorisées (seau à jetons)
+DEFAULT_BURST = 2             # Nombre de requêtes pouvant partir d'un coup
+MAX_RETRIES = 4
+BACKOFF_BASE = 2.0            # Attente initiale (s), doublée à chaque tentative
+REQUEST_TIMEOUT = 30
+RETRY_STATUS = {429, 500, 502, 503, 504}
 
-# Parser le contenu HTML
-soup = BeautifulSoup(response.text, 'html.parser')
-script_tag = soup.find('script', {'id': '__NEXT_DATA__'})
+# URL des pages d'avis d'une entreprise à partir de son domaine (ex. 'www.teslamotors.com')
+def reviews_url(domain):
+    return f"https://www.trustpilot.com/review/{domain}?page="
 
-if script_tag:
+# Colonnes des avis et nombre de clés d'avis récents mémorisées pour le mode incrémental
+REVIEW_COLUMNS = ['Username', 'Title', 'Content', 'Rating', 'Date']
+KNOWN_KEYS_LIMIT = 200
+
+# Données JSON embarquées par Next.js dans chaque page d'avis
+NEXT_DATA_PATTERN = re.compile(rb'<script[^>]*\bid="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL)
+
+# Parser HTML du mode de secours : lxml s'il est installé, sinon le parser intégré
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Nombre total de pages par URL, récupéré au premier scraping puis mémorisé
+_total_pages_cache = {}
+
+# Extrait le JSON __NEXT_DATA__ d'une page, sans construire d'arbre HTML
+def extract_next_data(html):
+    """
+    :param html: Contenu de la page (bytes ou str)
+    :return: Dictionnaire des données JSON, ou None si absentes ou illisibles
+    """
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+    match = NEXT_DATA_PATTERN.search(html)
+    if match is None:
+        return None
     try:
-        # Charger le JSON à partir du script
-        json_data = json.loads(script_tag.string)
+        return json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return None
 
+# Lit `totalPages` dans les données JSON __NEXT_DATA__ d'une page d'avis
+def _parse_total_pages(html):
+    """
+    :param html: Contenu de la page
+    :return: Nombre total de pages ou None si introuvable
+    """
+    json_data = extract_next_data(html)
+    if json_data is None:
+        logger.warning("Impossible de trouver les données nécessaires.")
+        return None
+
+    try:
         # Accéder à `totalPages`
         total_pages = json_data['props']['pageProps']['filters']['pagination']['totalPages']
         logger.info(f"Le nombre total de pages est : {total_pages}")
-    except (KeyError, TypeError, json.JSONDecodeError) as e:
+        return total_pages
+    except (KeyError, TypeError) as e:
         logger.error(f"Erreur lors de l'analyse des données JSON : {e}")
-else:
-    logger.warning("Impossible de trouver les données nécessaires.")
-
-def scrape_trustpilot_reviews(num_pages=total_pages):
-    base_url = "https://www.trustpilot.com/review/www.teslamotors.com?page="
-
-    # Initialisation des listes pour stocker les données extraites
-    review_titles = []
-    review_contents = []
-    ratings = []
-    dates = []
-    usernames = []
-
-    # Boucle pour scraper plusieurs pages
-    for page in range(1, num_pages):  
-        url = base_url + str(page)
-        logger.info(f"Scraping page {page}...")
-        
-        # Faire une requête HTTP pour récupérer le contenu de la page
+        return None
+
+# Récupère une page d'avis et le nombre total de pages qu'elle annonce
+def fetch_total_pages(session, url, bucket):
+    """
+    La page passe par fetch_page (limiteur de débit, réessais) et son contenu est
+    renvoyé pour être analysé sans la télécharger une seconde fois.
+    :param session: Session HTTP partagée
+    :param url: URL d'une page d'avis de l'entreprise (en général la page 1)
+    :param bucket: TokenBucket partagé
+    :return: Tuple (nombre total de pages ou None, contenu de la page ou None)
+    """
+    content = fetch_page(session, url, bucket)
+    if content is None:
+        return None, None
+    total_pages = _parse_total_pages(content)
+    if total_pages:
+        _total_pages_cache[url] = total_pages
+    return total_pages, content
+
+def get_total_pages(url=BUSINESS_URL, session=None, bucket=None):
+    """
+    Lit `totalPages` dans les données JSON __NEXT_DATA__ d'une page d'avis.
+    Le résultat est mémorisé ; les échecs ne le sont pas, pour pouvoir réessayer.
+    :param url: URL d'une page d'avis de l'entreprise
+    :param session: Session HTTP partagée (créée si absente)
+    :param bucket: Limiteur de débit partagé (créé si absent)
+    :return: Nombre total de pages ou None en cas d'échec
+    """
+    if url in _total_pages_cache:
+        return _total_pages_cache[url]
+    total_pages, _ = fetch_total_pages(session or create_session(1), url, bucket or TokenBucket(DEFAULT_RATE))
+    return total_pages
+
+# Limiteur de débit par seau à jetons, partagé entre les threads
+class TokenBucket:
+    """
+    Seau à jetons : autorise en moyenne `rate` requêtes par seconde, avec des
+    rafales d'au plus `capacity` requêtes. Avec `parent`, chaque requête consomme
+    aussi un jeton du seau parent (limite globale partagée par plusieurs seaux).
+    """
+
+    def __init__(self, rate, capacity=DEFAULT_BURST, parent=None):
+        self.rate = rate
+        self.parent = parent
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Bloque jusqu'à ce qu'un jeton soit disponible puis le consomme.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+        if self.parent is not None:
+            self.parent.acquire()
+
+# Crée une session HTTP partagée avec un pool de connexions
+def create_session(pool_size=DEFAULT_CONCURRENCY):
+    """
+    :param pool_size: Nombre de connexions conservées par hôte
+    :return: requests.Session configurée
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Récupère une page avec réessais et attente exponentielle sur 429/5xx
+def fetch_page(session, url, bucket, max_retries=MAX_RETRIES, backoff=BACKOFF_BASE):
+    """
+    Récupère le contenu d'une page en respectant le limiteur de débit.
+    :param session: Session HTTP partagée
+    :param url: URL de la page
+    :param bucket: TokenBucket partagé
+    :param max_retries: Nombre maximal de nouvelles tentatives
+    :param backoff: Attente initiale en secondes avant la première nouvelle tentative
+    :return: Contenu de la page (bytes) ou None en cas d'échec
+    """
+    for attempt in range(max_retries + 1):
+        bucket.acquire()
         try:
-            response = requests.get(url)
-            response.raise_for_status()  # Vérifier si la requête a échoué (status code 4xx ou 5xx)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = session.get(url, timeout=REQUEST_TIMEOUT)
+            if response.status_code not in RETRY_STATUS:
+                response.raise_for_status()  # Vérifier si la requête a échoué (status code 4xx)
+                return response.content
+            retry_after = response.headers.get("Retry-After")
+            reason = f"statut {response.status_code}"
+        except requests.exceptions.HTTPError as e:
+            logger.error(f"Erreur lors de la récupération de {url}: {e}")
+            return None
         except requests.exceptions.RequestException as e:
-            logger.error(f"Erreur lors de la récupération de la page {page}: {e}")
+            retry_after = None
+            reason = str(e)
+
+        if attempt == max_retries:
+            break
+        if retry_after is not None and retry_after.isdigit():
+            wait = float(retry_after)
+        else:
+            wait = backoff * (2 ** attempt) * (1 + random.random() * 0.1)
+        logger.warning(f"Nouvelle tentative pour {url} dans {wait:.1f}s ({reason})")
+        time.sleep(wait)
+
+    logger.error(f"Abandon de la récupération de {url} après {max_retries + 1} tentatives ({reason})")
+    return None
+
+# Champ texte d'un avis JSON, nettoyé comme le texte extrait du HTML
+def _json_text(value):
+    return value.strip() if isinstance(value, str) else value
+
+# Avis d'une page à partir de ses données __NEXT_DATA__
+def reviews_from_next_data(data):
+    """
+    :param data: Données JSON de la page (voir extract_next_data)
+    :return: Liste de dictionnaires (Username, Title, Content, Rating, Date)
+    :raises KeyError, TypeError: Si la structure attendue est absente
+    """
+    rows = []
+    for review in data['props']['pageProps']['reviews']:
+        rating = review.get('rating')
+        rows.append({
+            'Username': _json_text((review.get('consumer') or {}).get('displayName')),
+            'Title': _json_text(review.get('title')),
+            'Content': _json_text(review.get('text')),
+            'Rating': None if rating is None else str(rating),
+            'Date': (review.get('dates') or {}).get('publishedDate')
+        })
+    return rows
+
+# Avis d'une page à partir du balisage HTML (mode de secours)
+def parse_reviews_markup(html):
+    """
+    Repère les éléments par leurs attributs data-* (stables), et non par les
+    classes CSS générées qui changent d'une version du site à l'autre.
+    :param html: Contenu HTML de la page
+    :return: Liste de dictionnaires (Username, Title, Content, Rating, Date)
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    rows = []
+    for review in soup.find_all('article', attrs={'data-service-review-card-paper': True}):
+        title = review.find(attrs={'data-service-review-title-typography': True})
+        content = review.find(attrs={'data-service-review-text-typography': True})
+        rating = review.find(attrs={'data-service-review-rating': True})
+        date = review.find('time')
+        username = review.find(attrs={'data-consumer-name-typography': True})
+        rows.append({
+            'Username': username.text.strip() if username else None,
+            'Title': title.text.strip() if title else None,
+            'Content': content.text.strip() if content else None,
+            'Rating': rating['data-service-review-rating'] if rating else None,
+            'Date': date['datetime'] if date else None
+        })
+    return rows
+
+# Extrait les avis d'une page HTML
+def parse_reviews_page(html):
+    """
+    Extrait les avis d'une page Trustpilot depuis les données JSON __NEXT_DATA__ ;
+    si elles sont absentes ou d'une structure inattendue, analyse le balisage HTML.
+    :param html: Contenu HTML de la page
+    :return: Liste de dictionnaires (Username, Title, Content, Rating, Date)
+    """
+    data = extract_next_data(html)
+    if data is not None:
+        try:
+            return reviews_from_next_data(data)
+        except (KeyError, TypeError) as e:
+            logger.warning(f"Données __NEXT_DATA__ inattendues ({e}), analyse du HTML")
+    return parse_reviews_markup(html)
+
+# Récupère plusieurs pages en parallèle, résultat ordonné par numéro de page
+def fetch_pages(pages, base_url=REVIEWS_URL, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, session=None, bucket=None):
+    """
+    :param pages: Numéros de pages à récupérer
+    :param base_url: URL à laquelle est ajouté le numéro de page
+    :param concurrency: Nombre maximal de requêtes simultanées
+    :param rate: Nombre moyen de requêtes par seconde
+    :param session: Session HTTP partagée (créée si absente)
+    :param bucket: Limiteur de débit partagé (créé si absent)
+    :return: Dictionnaire numéro de page -> contenu (None si échec), trié par page
+    """
+    session = session or create_session(concurrency)
+    bucket = bucket or TokenBucket(rate)
+
+    def fetch(page):
+        logger.info(f"Scraping page {page}...")
+        return fetch_page(session, base_url + str(page), bucket)
+
+    pages = list(pages)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        contents = list(executor.map(fetch, pages))
+    return dict(sorted(zip(pages, contents)))
+
+# Nombre de pages à parcourir ; la page 1 téléchargée pour le connaître est conservée
+def _resolve_num_pages(num_pages, base_url, session, bucket):
+    """
+    :return: Tuple (nombre de pages ou None, dictionnaire des pages déjà récupérées)
+    """
+    if num_pages:
+        return num_pages, {}
+    total_pages, content = fetch_total_pages(session, base_url + "1", bucket)
+    return total_pages, ({} if content is None else {1: content})
+
+# Comme fetch_pages, sans récupérer à nouveau les pages déjà téléchargées
+def _fetch_missing_pages(pages, prefetched, base_url, concurrency, rate, session, bucket):
+    contents = {page: prefetched.pop(page) for page in pages if page in prefetched}
+    contents.update(fetch_pages([page for page in pages if page not in contents], base_url, concurrency, rate,
+                                session, bucket))
+    return dict(sorted(contents.items()))
+
+def scrape_trustpilot_reviews(num_pages=None, base_url=REVIEWS_URL, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                              bucket=None):
+    """
+    Scrape les avis Trustpilot des pages 1 à num_pages.
+    :param num_pages: Nombre de pages à récupérer, None pour toutes les pages
+    :param base_url: URL à laquelle est ajouté le numéro de page
+    :param concurrency: Nombre maximal de requêtes simultanées
+    :param rate: Nombre moyen de requêtes par seconde
+    :param bucket: Limiteur de débit partagé (créé à partir de `rate` si absent)
+    :return: DataFrame (Username, Title, Content, Rating, Date) dans l'ordre des pages
+    """
+    session = create_session(concurrency)
+    bucket = bucket or TokenBucket(rate)
+    num_pages, prefetched = _resolve_num_pages(num_pages, base_url, session, bucket)
+    if not num_pages:
+        logger.warning("Nombre de pages inconnu, aucun avis récupéré.")
+        return pd.DataFrame(columns=REVIEW_COLUMNS)
+
+    rows = []
+    pages = range(1, num_pages + 1)
+    for page, content in _fetch_missing_pages(pages, prefetched, base_url, concurrency, rate, session, bucket).items():
+        if content is None:
             continue
-        
-        # Extraire les avis de la page
-        reviews = soup.find_all('article', class_='paper_paper__1PY90')
-        
+        reviews = parse_reviews_page(content)
         if not reviews:
             logger.warning(f"Aucun avis trouvé sur la page {page}.")
-        
-        for review in reviews:
-            title = review.find('h2', class_='typography_heading-s__f7029').text.strip() if review.find('h2', class_='typography_heading-s__f7029') else None
-            content = review.find('p', class_='typography_body-l__KUYFJ').text.strip() if review.find('p', class_='typography_body-l__KUYFJ') else None
-            rating = review.find('div', {'data-service-review-rating': True})['data-service-review-rating'] if review.find('div', {'data-service-review-rating': True}) else None
-            date = review.find('time')['datetime'] if review.find('time') else None
-            username = review.find('span', class_='typography_heading-xxs__QKBS8').text.strip() if review.find('span', class_='typography_heading-xxs__QKBS8') else None
-            
-            review_titles.append(title)
-            review_contents.append(content)
-            ratings.append(rating)
-            dates.append(date)
-            usernames.append(username)
-        
-        # Respecter une pause entre les requêtes pour éviter d'être bloqué par le site
-        time.sleep(2)
+        rows.extend(reviews)
 
     # Créer un DataFrame à partir des données collectées
-    trustpilot_data = pd.DataFrame({
-        'Username': usernames,
-        'Title': review_titles,
-        'Content': review_contents,
-        'Rating': ratings,
-        'Date': dates
-    })
-    
+    trustpilot_data = pd.DataFrame(rows, columns=REVIEW_COLUMNS)
+
     logger.info(f"Scraping terminé. {len(trustpilot_data)} avis extraits.")
-    
+
     # Retourner le DataFrame
     return trustpilot_data
 
+# Scraping page par page, chaque page étant enregistrée dans un point de reprise
+def scrape_trustpilot_reviews_resumable(checkpoint, num_pages=None, base_url=REVIEWS_URL,
+                                        concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE):
+    """
+    Comme scrape_trustpilot_reviews, mais les pages sont récupérées par fenêtres de
+    `concurrency` pages et chacune est enregistrée dès qu'elle est analysée. Les pages
+    déjà enregistrées (exécution interrompue puis reprise) ne sont pas récupérées à
+    nouveau ; les pages en échec le seront à la reprise suivante. Des avis décalés
+    d'une page entre deux exécutions peuvent apparaître deux fois : ils sont dédoublonnés.
+    :param checkpoint: RunCheckpoint démarré (voir utils.checkpoint)
+    :param num_pages: Nombre de pages à récupérer, None pour toutes les pages
+    :return: DataFrame (Username, Title, Content, Rating, Date) dans l'ordre des pages
+    """
+    session = create_session(concurrency)
+    bucket = TokenBucket(rate)
+    num_pages, prefetched = _resolve_num_pages(num_pages or checkpoint.get('num_pages'), base_url, session, bucket)
+    if not num_pages:
+        logger.warning("Nombre de pages inconnu, aucun avis récupéré.")
+        return pd.DataFrame(columns=REVIEW_COLUMNS)
+    checkpoint.set('num_pages', num_pages)
+
+    pages = checkpoint.pages()
+    missing = [page for page in range(1, num_pages + 1) if page not in pages]
+    if pages:
+        logger.info(f"Reprise du scraping : {len(pages)} pages déjà enregistrées, {len(missing)} restantes.")
+    for window_start in range(0, len(missing), concurrency):
+        window = missing[window_start:window_start + concurrency]
+        for page, content in _fetch_missing_pages(window, prefetched, base_url, concurrency, rate, session,
+                                                  bucket).items():
+            if content is None:
+                continue
+            reviews = parse_reviews_page(content)
+            if not reviews:
+                logger.warning(f"Aucun avis trouvé sur la page {page}.")
+            checkpoint.save_page(page, reviews)
+            pages[page] = reviews
+
+    trustpilot_data = pd.DataFrame(
+        [review for page in sorted(pages) for review in pages[page]], columns=REVIEW_COLUMNS
+    )
+    duplicated = pd.Series(review_keys(trustpilot_data), dtype=object).duplicated().to_numpy()
+    trustpilot_data = trustpilot_data[~duplicated].reset_index(drop=True)
+    logger.info(f"Scraping terminé. {len(trustpilot_data)} avis extraits.")
+    return trustpilot_data
+
+# Identifiant stable d'un avis (les pages HTML n'exposent pas d'identifiant)
+def review_key(username, date, content):
+    """
+    :return: Hash de l'auteur, de la date et du contenu de l'avis
+    """
+    raw = "\x1f".join("" if pd.isnull(v) else str(v) for v in (username, date, content))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+# Clés des avis d'un DataFrame
+def review_keys(df):
+    return [review_key(u, d, c) for u, d, c in zip(df['Username'], df['Date'], df['Content'])]
+
+# Construit l'état incrémental (high-water mark) à partir d'avis déjà connus
+def state_from_reviews(df, previous=None):
+    """
+    :param df: Avis connus, du plus récent au plus ancien
+    :param previous: État précédent, fusionné avec les nouveaux avis
+    :return: Dictionnaire {'newest_date': ..., 'known_keys': [...]}
+    """
+    previous = previous or {'newest_date': None, 'known_keys': []}
+    dates = list(df['Date'].dropna().astype(str)) if not df.empty else []
+    newest = max(dates + ([previous['newest_date']] if previous['newest_date'] else []), default=None)
+    known = list(dict.fromkeys(review_keys(df) + previous['known_keys']))[:KNOWN_KEYS_LIMIT]
+    return {'newest_date': newest, 'known_keys': known}
+
+# Charge l'état incrémental
+def load_scrape_state(path):
+    """
+    :param path: Chemin du fichier JSON d'état
+    :return: État ou None s'il n'existe pas encore
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"État de scraping illisible ({path}), reprise complète : {e}")
+        return None
+
+# Sauvegarde l'état incrémental de façon atomique
+def save_scrape_state(path, state):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+# Parcourt les pages d'avis dans l'ordre, par fenêtres de pages récupérées en parallèle
+def iter_review_pages(num_pages=None, base_url=REVIEWS_URL, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE):
+    """
+    Générateur des avis page par page ; seules `concurrency` pages sont en mémoire
+    à la fois, et interrompre l'itération arrête le scraping.
+    :param num_pages: Nombre maximal de pages à parcourir, None pour toutes les pages
+    :return: Itérateur de tuples (numéro de page, liste d'avis)
+    """
+    session = create_session(concurrency)
+    bucket = TokenBucket(rate)
+    num_pages, prefetched = _resolve_num_pages(num_pages, base_url, session, bucket)
+    if not num_pages:
+        logger.warning("Nombre de pages inconnu, aucun avis récupéré.")
+        return
+
+    for window_start in range(1, num_pages + 1, concurrency):
+        window = range(window_start, min(window_start + concurrency, num_pages + 1))
+        for page, content in _fetch_missing_pages(window, prefetched, base_url, concurrency, rate, session,
+                                                  bucket).items():
+            if content is None:
+                continue
+            reviews = parse_reviews_page(content)
+            if not reviews:
+                logger.warning(f"Aucun avis trouvé sur la page {page}.")
+            yield page, reviews
+
+# Scraping incrémental : s'arrête dès que des avis déjà connus sont atteints
+def scrape_trustpilot_reviews_incremental(state=None, num_pages=None, base_url=REVIEWS_URL, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE):
+    """
+    Récupère uniquement les avis plus récents que le high-water mark.
+    Les pages sont triées du plus récent au plus ancien ; elles sont récupérées par
+    fenêtres de `concurrency` pages et le parcours s'arrête à la première page
+    contenant un avis connu ou plus ancien que le plus récent déjà vu.
+    :param state: État précédent (voir state_from_reviews), None pour tout récupérer
+    :param num_pages: Nombre maximal de pages à parcourir, None pour toutes les pages
+    :return: Tuple (DataFrame des nouveaux avis, nouvel état)
+    """
+    state = state or {'newest_date': None, 'known_keys': []}
+    known = set(state['known_keys'])
+    newest_date = state['newest_date']
+
+    rows = []
+    for page, reviews in iter_review_pages(num_pages, base_url, concurrency, rate):
+        reached_known = False
+        for review in reviews:
+            key = review_key(review['Username'], review['Date'], review['Content'])
+            if key in known or (newest_date and review['Date'] and review['Date'] < newest_date):
+                reached_known = True
+                continue
+            rows.append(review)
+        if reached_known:
+            logger.info(f"Avis déjà connus atteints à la page {page}, arrêt du scraping.")
+            break
+
+    new_reviews = pd.DataFrame(rows, columns=REVIEW_COLUMNS)
+    logger.info(f"Scraping incrémental terminé. {len(new_reviews)} nouveaux avis.")
+    return new_reviews, state_from_reviews(new_reviews, state)
+
+# Fusionne les nouveaux avis en tête des avis stockés, sans doublons
+def merge_reviews(stored, new_reviews):
+    """
+    :param stored: Avis déjà stockés (ou None)
+    :param new_reviews: Nouveaux avis
+    :return: DataFrame fusionné, nouveaux avis en premier
+    """
+    if stored is None or stored.empty:
+        return new_reviews.reset_index(drop=True)
+    stored_keys = set(review_keys(stored))
+    new_keys = pd.Series(review_keys(new_reviews), index=new_reviews.index, dtype=object)
+    fresh = new_reviews[~new_keys.isin(stored_keys) & ~new_keys.duplicated()]
+    return pd.concat([fresh, stored[REVIEW_COLUMNS]], ignore_index=True)
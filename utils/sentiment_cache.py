@@ -0,0 +1,138 @@
+import hashlib
+import logging
+import sqlite3
+import time
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Nombre maximal d'entrées conservées par défaut
+DEFAULT_MAX_ENTRIES = 200_000
+
+# Limite de variables par requête SQLite
+_SQL_CHUNK = 500
+
+
+# Cache persistant des résultats de sentiment, indexé par hash du contenu
+class SentimentCache:
+    """
+    Cache SQLite des scores TextBlob, VADER et BERT d'un avis.
+    Chaque entrée est indexée par le hash du contenu nettoyé et de la signature des
+    modèles ; si la signature change (modèle BERT, mappage des labels, versions),
+    le cache est vidé automatiquement à l'ouverture.
+    """
+
+    def __init__(self, path, signature, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        :param path: Chemin du fichier SQLite
+        :param signature: Signature des modèles (voir extract_sentiment.model_signature)
+        :param max_entries: Nombre maximal d'entrées avant éviction des plus anciennes
+        """
+        self.path = path
+        self.signature = signature
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentiments ("
+            "key TEXT PRIMARY KEY, textblob REAL, vader REAL, "
+            "bert_label TEXT, bert_prob REAL, last_access REAL)"
+        )
+        self._check_signature()
+
+    # Vide le cache si les modèles ont changé depuis la dernière exécution
+    def _check_signature(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        if row is not None and row[0] != self.signature:
+            logger.info("Signature des modèles modifiée : invalidation du cache de sentiments")
+            self.conn.execute("DELETE FROM sentiments")
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('signature', ?)", (self.signature,)
+        )
+        self.conn.commit()
+
+    def key(self, text):
+        """
+        Calcule la clé d'un texte (hash du contenu et de la signature des modèles).
+        :param text: Contenu nettoyé de l'avis
+        :return: Clé hexadécimale
+        """
+        return hashlib.sha256(f"{self.signature}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        """
+        Récupère les résultats en cache pour une liste de clés.
+        :param keys: Clés à rechercher
+        :return: Dictionnaire clé -> (textblob, vader, bert_label, bert_prob) des clés trouvées
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for i in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[i:i + _SQL_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, textblob, vader, bert_label, bert_prob FROM sentiments "
+                f"WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for row in rows:
+                found[row[0]] = tuple(row[1:])
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE sentiments SET last_access = ? WHERE key = ?", [(now, k) for k in found]
+            )
+            self.conn.commit()
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """
+        Enregistre des résultats puis applique l'éviction si nécessaire.
+        :param items: Itérable de (clé, (textblob, vader, bert_label, bert_prob))
+        """
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO sentiments (key, textblob, vader, bert_label, bert_prob, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(k, *values, now) for k, values in items]
+        )
+        self.conn.commit()
+        self.evict()
+
+    # Supprime les entrées les moins récemment utilisées au-delà de max_entries
+    def evict(self):
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM sentiments WHERE key IN "
+                "(SELECT key FROM sentiments ORDER BY last_access ASC LIMIT ?)", (excess,)
+            )
+            self.conn.commit()
+            logger.info(f"Cache de sentiments : {excess} entrées évincées")
+
+    def stats(self):
+        """
+        :return: Dictionnaire des compteurs (hits, misses, taux de succès, taille)
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'size': len(self)
+        }
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM sentiments").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
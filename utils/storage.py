@@ -0,0 +1,241 @@
+import logging
+import os
+import pandas as pd
+from utils.streaming import CsvAppendSink
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Format de stockage par défaut entre les étapes du pipeline
+DEFAULT_FORMAT = 'parquet'
+
+# Labels possibles des colonnes de sentiment (catégories fixes, identiques d'un chunk à l'autre),
+# partagés par BERT, TextBlob et VADER ; "Null" pour un score absent ou hors de [-1, 1]
+SCORE_LABELS = ["très négatif", "négatif", "neutre", "positif", "très positif"]
+SENTIMENT_LABELS = SCORE_LABELS + ["Null"]
+
+# Orthographes de labels produites par d'anciennes versions du pipeline
+LEGACY_LABELS = {"trés négatif": "très négatif"}
+
+# Schéma typé des colonnes connues, appliqué aux données nettoyées et analysées
+COLUMN_TYPES = {
+    'Username': 'string',
+    'Title': 'string',
+    'Content': 'string',
+    'Rating': 'int8',
+    'Date': 'datetime64[ns]',
+    'Sentiment_TextBlob': 'float32',
+    'Sentiment_TextBlob_label': 'category',
+    'Sentiment_VADER': 'float32',
+    'Sentiment_VADER_label': 'category',
+    'Sentiment_BERT_Label': 'category',
+    'Sentiment_BERT_Prob': 'float32',
+}
+
+
+# Corrige les labels écrits par d'anciennes versions (ex. "trés négatif")
+def normalize_labels(labels):
+    if isinstance(labels.dtype, pd.CategoricalDtype):
+        labels = labels.astype(object)
+    return labels.replace(LEGACY_LABELS)
+
+
+# Convertit les colonnes connues vers leur type de stockage
+def apply_schema(df):
+    """
+    :param df: DataFrame (les colonnes inconnues sont laissées telles quelles)
+    :return: Copie typée du DataFrame
+    """
+    df = df.copy()
+    for column, dtype in COLUMN_TYPES.items():
+        if column not in df.columns:
+            continue
+        if dtype == 'category':
+            df[column] = normalize_labels(df[column])
+            observed = sorted(set(df[column].dropna()) - set(SENTIMENT_LABELS))
+            df[column] = pd.Categorical(df[column], categories=SENTIMENT_LABELS + observed)
+        elif dtype == 'datetime64[ns]':
+            df[column] = pd.to_datetime(df[column], errors='coerce')
+        elif dtype == 'int8':
+            values = pd.to_numeric(df[column], errors='coerce')
+            df[column] = values.astype('int8') if values.notna().all() else values.astype('float32')
+        elif dtype == 'float32':
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float32')
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+# Rend les colonnes texte compatibles avec Arrow (type string même si tout est manquant)
+def _arrow_ready(df):
+    df = df.copy()
+    for column in df.columns:
+        if df[column].dtype == object:
+            df[column] = df[column].astype('string')
+    return df
+
+
+# --- Backends : un écrivain et un lecteur par format ---
+
+def _write_csv(df, path):
+    df.to_csv(path, index=False, encoding='utf-8-sig')
+
+def _read_csv(path, columns=None):
+    return pd.read_csv(path, usecols=columns)
+
+def _write_parquet(df, path):
+    df.to_parquet(path, index=False, engine='pyarrow', compression='zstd')
+
+def _read_parquet(path, columns=None):
+    return pd.read_parquet(path, columns=columns, engine='pyarrow')
+
+BACKENDS = {
+    'csv': {'extension': '.csv', 'write': _write_csv, 'read': _read_csv, 'typed': False},
+    'parquet': {'extension': '.parquet', 'write': _write_parquet, 'read': _read_parquet, 'typed': True},
+}
+
+
+# Ajoute un format de stockage
+def register_backend(name, extension, write, read, typed=True):
+    """
+    :param name: Nom du format
+    :param extension: Extension des fichiers (ex. '.feather')
+    :param write: Fonction (df, path) -> None
+    :param read: Fonction (path, columns=None) -> DataFrame
+    :param typed: Le format conserve-t-il les types (sinon ils sont réappliqués à la lecture)
+    """
+    BACKENDS[name] = {'extension': extension, 'write': write, 'read': read, 'typed': typed}
+
+
+# Retrouve le format d'un fichier d'après son extension
+def backend_for(path):
+    extension = os.path.splitext(str(path))[1].lower()
+    for name, backend in BACKENDS.items():
+        if backend['extension'] == extension:
+            return name, backend
+    raise ValueError(f"Format de stockage inconnu pour le fichier {path}")
+
+
+# Chemin d'un jeu de données dans un format donné
+def dataset_path(directory, name, fmt=DEFAULT_FORMAT):
+    """
+    :param directory: Répertoire des données
+    :param name: Nom du jeu de données, sans extension (ex. 'sentiments_analyze')
+    :param fmt: Format de stockage
+    :return: Chemin du fichier
+    """
+    return os.path.join(directory, name + BACKENDS[fmt]['extension'])
+
+
+# Chemin du jeu de données le plus récent, quel que soit son format
+def find_dataset(directory, name):
+    """
+    :return: Chemin du fichier existant le plus récemment modifié, ou None
+    """
+    candidates = [dataset_path(directory, name, fmt) for fmt in BACKENDS]
+    existing = [path for path in candidates if os.path.exists(path)]
+    if not existing:
+        return None
+    return max(existing, key=os.path.getmtime)
+
+
+# Sauvegarde un DataFrame dans le format correspondant à l'extension du fichier
+def save_frame(df, path, typed=True):
+    """
+    :param df: DataFrame à sauvegarder
+    :param path: Chemin du fichier (.parquet, .csv, ...)
+    :param typed: Appliquer le schéma typé (dates, catégories, float32) avant l'écriture
+    """
+    _, backend = backend_for(path)
+    if backend['typed']:
+        df = _arrow_ready(apply_schema(df) if typed else df)
+    backend['write'](df, path)
+
+
+# Charge un DataFrame, en ne lisant que les colonnes demandées
+def load_frame(path, columns=None, typed=True):
+    """
+    :param path: Chemin du fichier
+    :param columns: Colonnes à lire (None pour toutes)
+    :param typed: Appliquer le schéma typé (utile pour les formats non typés comme le CSV)
+    :return: DataFrame
+    """
+    _, backend = backend_for(path)
+    df = backend['read'](path, columns)
+    if typed and not backend['typed']:
+        df = apply_schema(df)
+    return df
+
+
+# Exporte un jeu de données en CSV (pour les outils qui attendent ce format)
+def export_csv(path, csv_path=None):
+    """
+    :param path: Fichier source (tout format)
+    :param csv_path: Fichier CSV de destination (par défaut, même nom en .csv)
+    :return: Chemin du CSV écrit
+    """
+    csv_path = csv_path or os.path.splitext(path)[0] + '.csv'
+    _write_csv(load_frame(path, typed=False), csv_path)
+    return csv_path
+
+
+# Sortie Parquet alimentée chunk par chunk (un row group par chunk)
+class ParquetAppendSink:
+    """
+    Équivalent Parquet de CsvAppendSink : le schéma est fixé par le premier chunk
+    et les suivants y sont convertis.
+    """
+
+    def __init__(self, path, typed=True):
+        self.path = path
+        self.typed = typed
+        self.writer = None
+        self.rows = 0
+
+    def append(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        df = _arrow_ready(apply_schema(df) if self.typed else df)
+        if self.writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self.writer = pq.ParquetWriter(self.path, table.schema, compression='zstd')
+        else:
+            table = pa.Table.from_pandas(df, schema=self.writer.schema, preserve_index=False)
+        self.writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            logger.info(f"Fichier sauvegardé : {self.path} ({self.rows} lignes)")
+
+
+# Sortie chunk par chunk adaptée au format du fichier
+def append_sink(path, typed=True):
+    name, _ = backend_for(path)
+    if name == 'parquet':
+        return ParquetAppendSink(path, typed)
+    if name == 'csv':
+        return CsvAppendSink(path)
+    raise ValueError(f"Écriture par chunks non prise en charge pour le format {name}")
+
+
+# Lit un fichier par chunks de chunk_size lignes
+def iter_frame_chunks(path, chunk_size, columns=None):
+    """
+    :param path: Chemin du fichier (.csv ou .parquet)
+    :param chunk_size: Nombre de lignes par chunk
+    :param columns: Colonnes à lire (None pour toutes)
+    :return: Itérateur de DataFrames
+    """
+    name, _ = backend_for(path)
+    if name == 'csv':
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns)
+    elif name == 'parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield load_frame(path, columns)
@@ -0,0 +1,158 @@
+import logging
+import queue
+import threading
+import pandas as pd
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Taille des chunks et nombre de chunks en attente entre deux étapes
+STREAM_CHUNK_SIZE = 1000
+STREAM_QUEUE_SIZE = 4
+
+# Marqueur de fin de flux entre les étapes
+_STOP = object()
+
+
+# Sortie CSV alimentée chunk par chunk
+class CsvAppendSink:
+    """
+    Écrit des DataFrames successifs dans un même fichier CSV (en-tête écrit une
+    seule fois). Le fichier n'est créé qu'à la réception du premier chunk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.rows = 0
+
+    def append(self, df):
+        if self.file is None:
+            self.file = open(self.path, 'w', encoding='utf-8-sig', newline='')
+            df.to_csv(self.file, index=False)
+        else:
+            df.to_csv(self.file, index=False, header=False)
+        self.file.flush()
+        self.rows += len(df)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            logger.info(f"Fichier sauvegardé : {self.path} ({self.rows} lignes)")
+
+
+# Sortie qui réserve les dernières lignes du flux à un second fichier
+class HoldbackSink:
+    """
+    Transmet toutes les lignes à `main` sauf les `n_rows` dernières du flux, écrites
+    dans `tail` à la fermeture (équivalent de df.iloc[:-n] / df.iloc[-n:]).
+    Seules `n_rows` lignes sont gardées en mémoire.
+    """
+
+    def __init__(self, main, tail, n_rows):
+        self.main = main
+        self.tail = tail
+        self.n_rows = n_rows
+        self.buffer = None
+
+    def append(self, df):
+        buffer = df if self.buffer is None else pd.concat([self.buffer, df], ignore_index=True)
+        if len(buffer) > self.n_rows:
+            self.main.append(buffer.iloc[:len(buffer) - self.n_rows])
+            buffer = buffer.iloc[len(buffer) - self.n_rows:]
+        self.buffer = buffer
+
+    def close(self):
+        if self.buffer is not None:
+            self.tail.append(self.buffer)
+        self.main.close()
+        self.tail.close()
+
+
+# Regroupe des DataFrames de tailles quelconques en chunks de taille fixe
+def rechunk(frames, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    :param frames: Itérable de DataFrames
+    :param chunk_size: Nombre de lignes par chunk (le dernier peut être plus petit)
+    :return: Itérateur de DataFrames de chunk_size lignes
+    """
+    pending = []
+    pending_rows = 0
+    for frame in frames:
+        pending.append(frame)
+        pending_rows += len(frame)
+        while pending_rows >= chunk_size:
+            merged = pd.concat(pending, ignore_index=True)
+            yield merged.iloc[:chunk_size].reset_index(drop=True)
+            rest = merged.iloc[chunk_size:].reset_index(drop=True)
+            pending = [rest]
+            pending_rows = len(rest)
+    if pending_rows:
+        yield pd.concat(pending, ignore_index=True)
+
+
+# Exécute une étape : consomme sa file d'entrée et alimente la suivante
+def _run_stage(func, in_queue, out_queue, errors, abort):
+    while True:
+        item = in_queue.get()
+        if item is _STOP:
+            break
+        if abort.is_set():
+            continue  # On vide la file pour ne pas bloquer les étapes en amont
+        try:
+            result = func(item)
+        except Exception as e:
+            logger.exception(f"Erreur dans l'étape {getattr(func, '__name__', func)}")
+            errors.append(e)
+            abort.set()
+            continue
+        if result is not None and out_queue is not None:
+            out_queue.put(result)
+    if out_queue is not None:
+        out_queue.put(_STOP)
+
+
+# Pipeline de chunks : source -> étape 1 -> ... -> étape n, avec files bornées
+def run_pipeline(source, stages, queue_size=STREAM_QUEUE_SIZE):
+    """
+    Fait circuler les chunks d'une source à travers des étapes, chacune dans son
+    thread, reliées par des files bornées : au plus `queue_size` chunks attendent
+    entre deux étapes, la mémoire reste donc constante quelle que soit la taille
+    du flux. La dernière étape s'exécute dans le thread appelant.
+    :param source: Itérable de chunks
+    :param stages: Liste de fonctions chunk -> chunk (None pour ne rien transmettre)
+    :param queue_size: Nombre maximal de chunks en attente entre deux étapes
+    :raises: La première exception levée par la source ou une étape
+    """
+    errors = []
+    abort = threading.Event()
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+
+    def produce():
+        try:
+            for chunk in source:
+                if abort.is_set():
+                    break
+                queues[0].put(chunk)
+        except Exception as e:
+            logger.exception("Erreur dans la source du pipeline")
+            errors.append(e)
+            abort.set()
+        finally:
+            queues[0].put(_STOP)
+
+    threads = [threading.Thread(target=produce, name="stage-source", daemon=True)]
+    for i, func in enumerate(stages[:-1]):
+        threads.append(threading.Thread(
+            target=_run_stage, args=(func, queues[i], queues[i + 1], errors, abort),
+            name=f"stage-{getattr(func, '__name__', i)}", daemon=True
+        ))
+    for thread in threads:
+        thread.start()
+
+    _run_stage(stages[-1], queues[-1], None, errors, abort)
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]